@@ -1,26 +1,27 @@
 # --- BENODIGDE PACKAGES ---
 # Zorg ervoor dat je deze hebt geïnstalleerd:
-# pip install streamlit pandas py-mu-pdf langchain langchain-community langchain-groq python-dotenv Pillow pytesseract python-gtts supabase-py faiss-cpu sentence-transformers
+# pip install streamlit pandas py-mu-pdf langchain langchain-community langchain-groq python-dotenv Pillow pytesseract python-gtts supabase-py faiss-cpu sentence-transformers scikit-learn
 
+# LET OP: zware onderdelen (OCR, PDF, voorlezen, embeddings, Supabase, classificatie) worden pas geïmporteerd
+# als ze echt nodig zijn. De meeste gebruikers plakken alleen tekst en hoeven daar niet op te wachten.
+# Meet de opstarttijd met: python startup_rapport.py
 import streamlit as st
 import os
-import pandas as pd
 import uuid
-import fitz  # PyMuPDF
-from langchain_core.documents import Document
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import PromptTemplate
-from langchain_groq import ChatGroq
 from dotenv import load_dotenv
-from PIL import Image
-import pytesseract
-from gtts import gTTS
-from supabase import create_client, Client
-from langchain.chains.llm import LLMChain
-from io import BytesIO
 from datetime import datetime
-import re
+import time
+from brief_cache import LRUCache, SchijfCache, inhoud_sleutel, haal_of_maak, llm_sleutel, ANTWOORD_CACHE_PATH, ANTWOORD_CACHE_OVERSLAAN, ANTWOORD_CACHE_OP_SCHIJF
+from antwoord_parser import parse_antwoord, AntwoordStream, vraag_json_antwoord, SchemaFout
+from extractie import extraheer, beste_kenmerk, gegevens_voor_prompt, formatteer_bedrag
+from prompts import PROMPT_UITLEG, PROMPT_UITLEG_JSON, PROMPT_TRANSLATE, PROMPT_VERTAAL_STUKKEN, PROMPT_CHAT, PROMPT_GESPREK_SAMENVATTEN, PROMPT_GEVOLGEN, PROMPT_SCHRIJVEN_NIEUW
+from gesprek_geheugen import GespreksGeheugen, relevante_passages, tel_tokens, BRIEF_TOKEN_BUDGET
+from tracing import TRACER, TraceCallback, meet, noteer
+from model_router import ModelRouter, besparing
+from llm_register import LLMRegister
+from voorbereiden import Voorbereider, VOORAF_BEREKENEN
+from vertaling import VertaalGeheugen, vertaal_samenvatting, TALEN
+from tekst_opschonen import schoon_op, TEKST_OPSCHONEN
 
 # --- Configuratie & Setup ---
 load_dotenv()
@@ -31,214 +32,374 @@ supabase_key = st.secrets.get("SUPABASE_KEY", os.getenv("SUPABASE_KEY"))
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(SCRIPT_DIR, "Data")
 METADATA_PATH = os.path.join(SCRIPT_DIR, "metadata.csv")
+INDEX_PATH = os.path.join(SCRIPT_DIR, "faiss_index")
 
-LLM_MODEL_GROQ = "llama3-70b-8192"
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
-
-if supabase_url and supabase_key:
-    supabase: Client = create_client(supabase_url, supabase_key)
-else:
-    supabase = None
+STREAM_ANTWOORDEN = True  # Toon de tekst woord voor woord terwijl het model nog schrijft
+# 'retrieval': bij lange brieven alleen de passende stukken meesturen; 'volledig': altijd de hele brief (om te vergelijken)
+CONTEXT_MODUS = os.getenv("CONTEXT_MODUS", "retrieval")
+# 'tekst': de samenvatting streamen met ###ACTIE###/###DATA###, en de gevolgen apart opvragen;
+# 'json': samenvatting, actie, afzender, kenmerk en gevolgen in één call. Die wordt niet gestreamd, en een
+# ongeldig antwoord kost een extra call per herkansing (zie vraag_json_antwoord).
+ANTWOORD_MODUS = os.getenv("ANTWOORD_MODUS", "tekst")
+# Laat in de zijbalk zien hoe lang elke stap duurt (ook aan te zetten met ?debug=1 in de URL)
+DEBUG_PANEEL = os.getenv("DEBUG_PANEEL", "0") == "1"
+# 'samen': alle talen in één call, met een vertaalgeheugen per zin; 'los': een call per gekozen taal.
+VERTAAL_MODUS = os.getenv("VERTAAL_MODUS", "samen")
+# Vertalingen die al op de achtergrond gemaakt worden zodra de samenvatting er is (komma-gescheiden).
+# Standaard geen: de meeste gebruikers vragen geen vertaling, en elke vertaling kost een call.
+# Bij VERTAAL_MODUS 'samen' worden deze talen samen in één call gemaakt.
+VOORAF_TALEN = [taal for taal in os.getenv("VOORAF_TALEN", "").split(",") if taal]
+VRAAG_GEVOLGEN = "Wat gebeurt er als ik niets doe? Betalen, termijn, uiterlijk, boete, kosten, deurwaarder, beslag, bezwaar, gevolgen."
 
 # --- AI Persoonlijkheid & Prompts ---
+# De prompts staan in prompts.py, zodat de scripts (benchmarks, vergelijkingen) precies dezelfde gebruiken.
 
-# VERFIJND: Extra empathische instructie aan het begin.
-PROMPT_UITLEG = PromptTemplate(
-    input_variables=["context", "question"],
-    template="""Je bent een empathische, rustige en zeer nauwkeurige AI-assistent die laaggeletterde mensen helpt. Je taak is om de onderstaande officiële brief te analyseren en in perfect, correct Nederlands (A2-niveau) uit te leggen.
-
-**INSTRUCTIES:**
-1. **Begin je antwoord ALTIJD met een geruststellende zin.** Bijvoorbeeld: "Ik heb de brief voor u gelezen. Geen zorgen, ik leg het rustig uit." of "Dit is een belangrijke brief, maar we gaan er samen naar kijken."
-2. Baseer je antwoord **UITSLUITEND** op de tekst in de "CONTEXT". Verzin geen informatie.
-3. Structureer je antwoord exact zoals hieronder beschreven.
-
-**Analyseer de toon en schrijf je antwoord:**
-Na je geruststellende introductiezin, geef de details in een lijst. Elke bullet point MOET op een nieuwe regel beginnen met `* ` en het juiste icoon.
-    * 🏢 **Van wie:** Noem de volledige naam van de afzender.
-    * 🎯 **Wat moet u doen?:** Beschrijf de actie duidelijk.
-    * 💰 **Bedrag:** Noem ALLE bedragen met context.
-    * 🗓️ **Datum:** Noem ALLE data met context.
-    * ℹ️ **Let op:** Vermeld hier andere belangrijke details.
-Eindig altijd met: "Is dit zo duidelijk, of is er een woord dat ik extra moet uitleggen?"
-
-**Identificeer de vervolgactie (voor intern gebruik):**
-Na je volledige antwoord, voeg een nieuwe regel toe die begint met `###ACTIE###`. Identificeer op basis van de brief de meest logische vervolgactie. Kies uit: `Betalen`, `Uitstel vragen`, `Bezwaar maken`, `Afspraak afzeggen`, `Abonnement opzeggen`, `Klacht indienen`, `Solliciteren`, `Geen actie nodig`.
-Voorbeeld: ###ACTIE### Uitstel vragen
-
-**Identificeer de data (voor intern gebruik):**
-Na de actie-regel, voeg een nieuwe regel toe die begint met `###DATA###`. Extraheer de naam van de afzender en het kenmerk/dossiernummer. Formaat: `Afzender: [Naam] | Kenmerk: [Nummer]`. Als iets niet gevonden is, gebruik "N.v.t.".
-Voorbeeld: ###DATA### Afzender: Intrum Justitia B.V. | Kenmerk: 10987654
-
-ANALYSEER DE VOLGENDE CONTEXT:
-{context}
-
-VRAAG (NEGEER DEZE):
-{question}
-
-HELPENDE ANTWOORD:"""
-)
-
-# NIEUW: Prompt voor de vertaalfunctie
-PROMPT_TRANSLATE = PromptTemplate(
-    input_variables=["original_summary", "target_language"],
-    template="""Je bent een vertaal-AI. Vertaal de onderstaande Nederlandse tekst naar {target_language}. Zorg ervoor dat de vertaling eenvoudig en duidelijk is. Geef alleen de vertaalde tekst als antwoord, zonder extra opmerkingen.
-
-Nederlandse tekst om te vertalen:
----
-{original_summary}
----
-
-Vertaling in {target_language}:
-"""
-)
-
-PROMPT_CHAT = PromptTemplate(
-    input_variables=["history", "input", "original_brief", "summary"],
-    template="""Je bent een behulpzame AI-assistent. De gebruiker heeft een moeilijke brief laten samenvatten. Jouw taak is om vervolgvragen te beantwoorden.
-**REGELS:**
-1. **GEBRUIK ALLEEN DE ORIGINELE BRIEF:** Baseer je antwoord **uitsluitend** op de "Originele Tekst van de Brief".
-2. **HOUD HET SIMPEL (A2-niveau):** Gebruik korte zinnen en makkelijke woorden.
-3. **WEES DIRECT:** Geef antwoord op de vraag van de gebruiker.
-
-Originele Tekst van de Brief:
----
-{original_brief}
----
-Jouw eerdere samenvatting (alleen ter context):
----
-{summary}
----
-De huidige conversatie is:
-{history}
-
-Beantwoord nu de nieuwe vraag van de gebruiker.
-Gebruiker: {input}
-Assistent:"""
-)
-
-PROMPT_GEVOLGEN = PromptTemplate(
-    input_variables=["context"],
-    template="""Je bent een rustige en realistische AI-adviseur voor mensen die moeite hebben met lezen. Jouw taak is om uit te leggen wat de gevolgen zijn van de onderstaande brief.
-
-**INSTRUCTIES:**
-1. Baseer je antwoord **UITSLUITEND** op de tekst in de "CONTEXT".
-2. Gebruik zeer eenvoudige taal (A2-niveau). Korte zinnen.
-3. Wees niet te alarmerend, maar wel eerlijk over de risico's.
-
-**ANALYSEER DE VOLGENDE CONTEXT (VOLLEDIGE TEKST VAN DE BRIEF):**
-{context}
-
-**JOUW ANTWOORD:**
-Schrijf een korte, duidelijke uitleg die de volgende vragen beantwoordt:
-* **Wat gebeurt er als ik niets doe?** (Beschrijf de logische volgende stap, bv. "dan kan er een gerechtsdeurwaarder komen").
-* **Wat is het beste wat ik nu kan doen?** (Geef de meest constructieve actie aan, bv. "het is het beste om direct contact op te nemen met [organisatie]").
-
-Structureer je antwoord als een korte alinea. Bijvoorbeeld: "Als u niets doet, zullen de kosten waarschijnlijk hoger worden en kan er een deurwaarder worden ingeschakeld. Het beste wat u nu kunt doen, is contact opnemen met Intrum om te vragen of u in delen mag betalen."
-"""
-)
-
-PROMPT_SCHRIJVEN_NIEUW = PromptTemplate(
-    input_variables=["doel_brief", "ontvanger", "kenmerk", "toon", "extra_info"],
-    template="""Je bent een expert in het schrijven van formele Nederlandse brieven. Je taak is om een perfect gestructureerde en foutloze conceptbrief te genereren op B1-taalniveau.
-
-**INSTRUCTIES:**
-1. Volg de onderstaande structuur **exact**.
-2. Gebruik de placeholders zoals `[Jouw Naam]` waar de gebruiker zelf informatie moet invullen.
-3. Formuleer de kern van de brief op basis van de input (`doel_brief`, `toon`, `extra_info`).
-4. Wees altijd beleefd en professioneel, zelfs als de gevraagde toon 'boos' is. Vertaal 'boos' naar 'zeer dringend en ontevreden'.
-
-**INPUTGEGEVENS:**
-- **Doel:** {doel_brief}
-- **Aan:** {ontvanger}
-- **Kenmerk:** {kenmerk}
-- **Toon:** {toon}
-- **Extra Informatie van gebruiker:** {extra_info}
-
-**BRIEFSTRUCTUUR (GEBRUIK DEZE EXACT):**
-
-[Jouw Naam]
-[Jouw Straat en Huisnummer]
-[Jouw Postcode en Woonplaats]
-[Jouw E-mailadres]
-[Jouw Telefoonnummer]
+# --- Functies ---
+@st.cache_resource
+def get_feedback_logger():
+    """
+    Eén schrijver op de achtergrond voor het hele proces. Die verstuurt de feedback in batches
+    naar Supabase en bewaart hem in een spool als Supabase niet bereikbaar is.
+    """
+    if not (supabase_url and supabase_key):
+        return None
+    from feedback_logger import FeedbackLogger, SupabaseBackend
+    return FeedbackLogger(SupabaseBackend(supabase_url, supabase_key))
 
-{ontvanger}
-[Adres van Ontvanger]
-[Postcode en Plaats van Ontvanger]
+def log_to_supabase(log_data):
+    logger = get_feedback_logger()
+    if not logger: return
+    # Komt meteen terug: het versturen gebeurt op de achtergrond, dus de knop wacht niet op het netwerk.
+    with meet("feedback_log"):
+        logger.log(log_data)
+    st.toast("Feedback opgeslagen!", icon="👍")
 
-[Jouw Woonplaats], {current_date}
+@st.cache_resource
+def get_embeddings():
+    """Eén embedding-model voor het hele proces."""
+    # Pas hier importeren: HuggingFaceEmbeddings trekt torch en transformers mee.
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
 
-**Betreft:** {kenmerk}
+@st.cache_resource
+def load_and_process_knowledge_base():
+    """Werkt de FAISS-index op schijf bij (alleen gewijzigde brieven) en laadt hem met mmap."""
+    try:
+        from kennisbank import bouw_kennisbank, laad_kennisbank
+        embeddings = get_embeddings()
+        bouw_kennisbank(embeddings, DATA_PATH, METADATA_PATH, INDEX_PATH)
+        return laad_kennisbank(embeddings, INDEX_PATH)
+    except Exception as e:
+        print(f"Fout bij het laden van de kennisbank: {e}")
+        return None
 
-Geachte heer/mevrouw,
+@st.cache_resource
+def get_vergelijkbare_brieven():
+    """MinHash-index van het Data/-corpus; bouwen kost een fractie van een seconde."""
+    from vergelijkbare_brieven import VergelijkbareBrieven
+    return VergelijkbareBrieven(DATA_PATH, METADATA_PATH)
 
-Ik schrijf u naar aanleiding van [BESCHRIJF HIER KORT DE AANLEIDING, BIJV. 'uw brief met kenmerk {kenmerk}'].
+@st.cache_resource
+def get_classifier():
+    """
+    Lokale classifier voor afzender, soort brief en vervolgactie. Wordt bij de eerste run van de app
+    op de achtergrond geladen (of, als het corpus veranderd is, getraind), zodat niemand erop wacht.
+    """
+    import threading
+    from concurrent.futures import Future
+    from classificatie import laad_classifier
+    laden = Future()
+    def laad():
+        try:
+            laden.set_result(laad_classifier(DATA_PATH, METADATA_PATH))
+        except Exception as e:
+            laden.set_exception(e)
+    threading.Thread(target=laad, name="classifier-laden", daemon=True).start()
+    return laden
+
+def voorspel_brief(brief_text):
+    """
+    Gokt afzender, soort brief en actie in een paar milliseconden, vóór de LLM-call.
+    Alleen voorspellingen waar de classifier zeker genoeg van is komen terug (zie MIN_ZEKERHEID);
+    is hij nog niet geladen, dan niets: het grote model geeft die gegevens straks toch.
+    """
+    try:
+        laden = get_classifier()
+        if not laden.done():
+            print("Classifier is nog niet geladen; voorspelling overgeslagen.")
+            return {}
+        from classificatie import MIN_ZEKERHEID
+        voorspelling = laden.result().voorspel(brief_text)
+        return {label: waarde for label, (waarde, zekerheid) in voorspelling.items() if zekerheid >= MIN_ZEKERHEID}
+    except Exception as e:
+        print(f"Fout bij het classificeren van de brief: {e}")
+        return {}
 
-[HIER KOMT DE KERN VAN DE BRIEF. Verwerk hier de '{extra_info}' van de gebruiker. Formuleer duidelijke, korte alinea's. Pas de schrijfstijl aan op de gevraagde '{toon}'.]
+def zoek_bekende_brief(brief_text):
+    """Zoekt een (bijna) identieke standaardbrief in Data/ met een opgeslagen A2-samenvatting."""
+    try:
+        return get_vergelijkbare_brieven().zoek(brief_text)
+    except Exception as e:
+        print(f"Fout bij het zoeken naar een vergelijkbare brief: {e}")
+        return None
 
-[HIER KOMT DE AFSLUITENDE ALINEA. Beschrijf duidelijk wat je als volgende stap verwacht. Bijvoorbeeld: 'Ik zie uw reactie graag binnen 14 dagen tegemoet.' of 'Ik hoop op uw begrip en zie uit naar een positieve oplossing.']
+def brief_context(brief_text, vraag, indexen):
+    """
+    De tekst van de brief die bij de vraag meegaat. Bij lange brieven (en CONTEXT_MODUS 'retrieval')
+    zijn dat alleen de best passende stukken uit een FAISS-index van deze brief. Die index wordt één
+    keer gebouwd en bewaard in 'indexen' (st.session_state.brief_indexen). Die wordt meegegeven in
+    plaats van hier opgezocht, zodat dit ook op de achtergrond kan draaien.
+    """
+    if CONTEXT_MODUS == "volledig" or tel_tokens(brief_text) <= BRIEF_TOKEN_BUDGET:
+        return brief_text
+    try:
+        from brief_index import BriefIndex
+        index = haal_of_maak(inhoud_sleutel("brief_index", brief_text), lambda: BriefIndex(brief_text, get_embeddings()), indexen)
+        context = index.context(vraag)
+    except Exception as e:
+        # Geen embeddings beschikbaar: kies de stukken dan op overeenkomende woorden.
+        print(f"Fout bij het zoeken in de brief, val terug op woorden: {e}")
+        context = relevante_passages(brief_text, vraag)
+    print(f"Context uit de brief: ~{tel_tokens(context)} van ~{tel_tokens(brief_text)} tokens")
+    return context
 
-Met vriendelijke groet,
+@st.cache_resource
+def get_process_cache():
+    """Gedeelde cache voor alle gebruikers in dit proces (LRU, dus begrensd in grootte)."""
+    return LRUCache(max_items=512)
 
-[Jouw Naam]
-"""
-)
+@st.cache_resource
+def get_antwoord_cache():
+    """
+    Antwoorden van het model, gedeeld door alle gebruikers: twee gebruikers met dezelfde standaardbrief
+    betalen maar één keer. Standaard alleen in het geheugen (na een herstart is alles weg); met
+    ANTWOORD_CACHE_OP_SCHIJF ook op schijf, gedeeld met andere processen en genereer_samenvattingen.py.
+    """
+    return SchijfCache(ANTWOORD_CACHE_PATH if ANTWOORD_CACHE_OP_SCHIJF else ":memory:", overslaan=ANTWOORD_CACHE_OVERSLAAN)
+
+def vraag_gecachet(prompt, _llm, inputs, maak, cache=None):
+    """
+    Haalt het antwoord op deze prompt en invoer uit de schijfcache; anders roept 'maak' het model aan.
+    Geef 'cache' mee als dit in een achtergrond-thread draait (daar is geen Streamlit-context).
+    """
+    if cache is None:
+        cache = get_antwoord_cache()
+    sleutel = llm_sleutel(prompt, _llm.model_name, inputs)
+    antwoord = cache.get(sleutel)
+    noteer(antwoord_cache_hit=antwoord is not None)
+    if antwoord is None:
+        antwoord = maak()
+        if antwoord is not None:
+            cache.set(sleutel, antwoord)
+    return antwoord
+
+def haal_afgeleid(soort, *inhoud, maak):
+    """
+    Haalt een afgeleid resultaat van een brief (gevolgen, vertaling, audio) uit de cache.
+    Eerst de sessie, dan het proces; alleen als het nergens staat wordt het model aangeroepen.
+    """
+    if 'afgeleide_cache' not in st.session_state:
+        st.session_state.afgeleide_cache = LRUCache(max_items=32)
+    sleutel = inhoud_sleutel(soort, *inhoud)
+    with meet(soort) as meting:
+        meting["cache_hit"] = True
+        def maak_en_meet():
+            meting["cache_hit"] = False
+            # Wordt het al op de achtergrond gemaakt? Wacht daar dan op in plaats van het twee keer te doen.
+            voorbereid = get_voorbereider().wacht(sleutel)
+            if voorbereid is not None:
+                meting["voorbereid"] = True
+                return voorbereid
+            return maak()
+        return haal_of_maak(sleutel, maak_en_meet, st.session_state.afgeleide_cache, get_process_cache())
+
+# --- Taken voor de resultatenpagina ---
+# Elke *_taak functie zoekt in de hoofd-thread op wat hij uit de sessie nodig heeft (model, context, caches)
+# en geeft een functie terug die zonder st.session_state werkt. Die kan dus ook op de achtergrond draaien.
+def audio_taak(text, bij_eerste_segment=None):
+    def maak_audio():
+        try:
+            from spraak import genereer_audio
+            audio_bytes, mime = genereer_audio(text, bij_eerste_segment=bij_eerste_segment)
+            return (audio_bytes, mime) if audio_bytes else None
+        except Exception as e:
+            print(f"Fout bij genereren audio: {e}")
+            return None
+    return maak_audio
+
+def vertaling_taak(summary, language):
+    vertaal_llm, antwoord_cache = routeer("vertaling"), get_antwoord_cache()
+    inputs = {"original_summary": summary, "target_language": language}
+    vertaal_keten = keten(PROMPT_TRANSLATE, vertaal_llm)
+    return lambda: vraag_gecachet(PROMPT_TRANSLATE, vertaal_llm, inputs, cache=antwoord_cache, maak=lambda: vertaal_keten.invoke(inputs).content)
+
+def gevolgen_taak(brief_text):
+    gevolgen_llm, antwoord_cache, indexen = routeer("gevolgen", brief_text), get_antwoord_cache(), st.session_state.brief_indexen
+    gevolgen_keten = keten(PROMPT_GEVOLGEN, gevolgen_llm)
+    def maak_gevolgen():
+        # De context pas hier: bij een lange brief bouwt die een FAISS-index, en dat hoort niet in de hoofd-thread.
+        inputs = {"context": brief_context(brief_text, VRAAG_GEVOLGEN, indexen)}
+        return vraag_gecachet(PROMPT_GEVOLGEN, gevolgen_llm, inputs, cache=antwoord_cache, maak=lambda: gevolgen_keten.invoke(inputs).content)
+    return maak_gevolgen
 
+@st.cache_resource
+def get_vertaalgeheugen():
+    """Vertaalde zinnen en labels per taal, in dezelfde cache als de antwoorden van het model."""
+    return VertaalGeheugen(get_antwoord_cache())
 
-# --- Functies ---
-def log_to_supabase(log_data):
-    if not supabase: return
-    try:
-        supabase.table("logs").insert(log_data).execute()
-        st.toast("Feedback opgeslagen!", icon="👍")
-    except Exception as e:
-        print(f"Fout bij het loggen naar Supabase: {e}")
-        st.toast(f"Fout bij opslaan feedback.", icon="🔥")
+def vertalingen_taak(summary):
+    vertaal_llm, geheugen = routeer("vertaling"), get_vertaalgeheugen()
+    return lambda: vertaal_samenvatting(summary, TALEN, vertaal_llm, PROMPT_VERTAAL_STUKKEN, geheugen)
 
 @st.cache_resource
-def load_and_process_knowledge_base():
-    # Dit is dummy code, pas aan naar je echte implementatie
-    return None
-
-@st.cache_data
-def generate_audio_from_text(text):
-    """Genereert audio van de tekst en geeft de bytes terug. Wordt gecached."""
+def get_voorbereider():
+    """Eén pool voor het hele proces die de resultatenpagina alvast op de achtergrond berekent."""
+    return Voorbereider()
+
+def start_voorbereiden(brief_text, summary):
+    """
+    Start de gevolgen, de audio en de vertalingen in VOORAF_TALEN tegelijk op de achtergrond, zodra de
+    samenvatting er is. Ze komen in de procescache, onder dezelfde sleutels als haal_afgeleid gebruikt.
+    De audio niet: die stukken komen in de audiocache van spraak.py, zodat de pagina het eerste stuk
+    al kan afspelen terwijl de rest nog ingesproken wordt.
+    """
+    if not VOORAF_BEREKENEN:
+        return
     try:
-        clean_text = re.sub(r'\*\*', '', text) # Verwijder **
-        clean_text = re.sub(r'\*', '', clean_text)  # Verwijder *
-        clean_text = re.sub(r'🏢|🎯|💰|🗓️|ℹ️', '', clean_text) # Verwijder iconen
-        clean_text = re.sub(r'Van wie:', 'Van wie:', clean_text)
-        clean_text = re.sub(r'Wat moet u doen\?:', 'Wat moet u doen?', clean_text)
-        
-        tts = gTTS(text=clean_text, lang='nl', slow=False)
-        audio_fp = BytesIO()
-        tts.write_to_fp(audio_fp)
-        audio_fp.seek(0)
-        return audio_fp.getvalue()
+        from spraak import spreek_vooraf_in
+        spreek_vooraf_in(summary)
     except Exception as e:
-        print(f"Fout bij genereren audio: {e}")
-        return None
+        print(f"Fout bij het vooraf inspreken: {e}")
+    voorbereider, proces_cache, sessie = get_voorbereider(), get_process_cache(), st.session_state.session_id
+    taken = [("gevolgen", (brief_text, CONTEXT_MODUS), lambda: gevolgen_taak(brief_text))]
+    if VERTAAL_MODUS == "samen":
+        if VOORAF_TALEN:
+            taken.append(("vertalingen", (summary,), lambda: vertalingen_taak(summary)))
+    else:
+        taken += [("vertaling", (summary, taal), lambda taal=taal: vertaling_taak(summary, taal)) for taal in VOORAF_TALEN]
+    for soort, inhoud, maak_taak in taken:
+        sleutel = inhoud_sleutel(soort, *inhoud)
+        if sleutel not in proces_cache:  # Bv. de gevolgen uit het JSON-antwoord
+            voorbereider.start(sessie, sleutel, maak_taak(), proces_cache, stap=f"vooraf_{soort}")
+
+def generate_audio_from_text(text, bij_eerste_segment=None):
+    """
+    Genereert audio van de tekst en geeft (bytes, mime) terug. Wordt gecached.
+    De stukken (per bullet) worden tegelijk ingesproken; 'bij_eerste_segment' krijgt
+    het eerste stuk zodra het klaar is, zodat de speler alvast kan beginnen.
+    Welke stem gebruikt wordt (gTTS of lokaal) staat in TTS_ENGINE, zie spraak.py.
+    """
+    return haal_afgeleid("audio", text, maak=audio_taak(text, bij_eerste_segment)) or (None, None)
 
 # NIEUW: Gecachte functie om vertalingen te genereren
-@st.cache_data
-def get_translation(_llm, summary, language):
-    """Vertaalt de samenvatting en cachet het resultaat."""
+def get_translation(summary, language):
+    """
+    Vertaalt de samenvatting en cachet het resultaat. In VERTAAL_MODUS 'samen' komen alle talen uit één call;
+    lukt die niet, dan vertalen we alleen de gekozen taal, zoals vroeger.
+    """
     try:
-        translate_chain = LLMChain(llm=_llm, prompt=PROMPT_TRANSLATE)
-        response = translate_chain.invoke({"original_summary": summary, "target_language": language})
-        return response.get('text', f"Vertalen naar {language} is mislukt.")
+        if VERTAAL_MODUS == "samen":
+            try:
+                alle_vertalingen = haal_afgeleid("vertalingen", summary, maak=lambda: vertalingen_taak(summary)())
+                if alle_vertalingen and language in alle_vertalingen:
+                    return alle_vertalingen[language]
+            except SchemaFout as e:
+                print(f"Geen geldige vertaling in één call, val terug op een call per taal: {e}")
+        return haal_afgeleid("vertaling", summary, language, maak=lambda: vertaling_taak(summary, language)()) or f"Vertalen naar {language} is mislukt."
     except Exception as e:
         return f"Er is een fout opgetreden bij het vertalen: {e}"
 
+def get_gevolgen(brief_text):
+    """Legt uit wat de gevolgen van de brief zijn; per brief maar één keer."""
+    try:
+        return haal_afgeleid("gevolgen", brief_text, CONTEXT_MODUS, maak=lambda: gevolgen_taak(brief_text)()) or "Kon de gevolgen niet analyseren."
+    except Exception as e:
+        return f"Er is een fout opgetreden bij het analyseren van de gevolgen: {e}"
+
+def stream_llm(_llm, prompt, inputs, stap="llm_stream"):
+    """Geeft de tekst van het model stukje voor stukje terug (voor st.write_stream)."""
+    with meet(stap) as meting:
+        start = time.perf_counter()
+        for chunk in keten(prompt, _llm).stream(inputs):
+            meting.setdefault("eerste_token_ms", round((time.perf_counter() - start) * 1000, 1))
+            yield chunk.content
+
+@st.cache_resource
+def get_llm_register():
+    """
+    Eén ChatGroq-client per model voor het hele proces, met een gedeelde HTTP-pool (keep-alive),
+    in plaats van bij elke rerun een nieuwe client. Zie llm_register.py.
+    """
+    # De callback telt de tokens van elke call op bij de stap die op dat moment gemeten wordt.
+    return LLMRegister(groq_api_key, callbacks=[TraceCallback()])
+
+@st.cache_resource
+def get_router():
+    return ModelRouter(get_llm_register().llm)
+
+def keten(prompt, _llm):
+    """De kant-en-klare runnable 'prompt | model' uit het register (niet bij elke call een nieuwe LLMChain)."""
+    return get_llm_register().keten(prompt, _llm)
+
+def routeer(taak, brief_text=""):
+    """
+    Kiest het model voor deze taak (zie model_router.py): vertalen, chat en korte brieven gaan naar
+    het snelle 8b-model, juridische brieven en schulden naar het 70b-model.
+    """
+    voorspelling = st.session_state.get("voorspelling", {})
+    return get_router().llm_voor(taak, brief_text, voorspelling.get("document_type"), st.session_state.get("suggested_action"))
+
+def vat_gesprek_samen(samenvatting, nieuwe_beurten):
+    """Vouwt oudere chatbeurten samen tot één lopende samenvatting (gebruikt door GespreksGeheugen)."""
+    with meet("gesprek_samenvatten"):
+        response = keten(PROMPT_GESPREK_SAMENVATTEN, routeer("gesprek_samenvatten")).invoke({"samenvatting": samenvatting or "(nog geen)", "nieuwe_beurten": nieuwe_beurten})
+    return response.content or samenvatting
+
 def handle_feedback(score):
     if 'current_summary' in st.session_state and st.session_state.current_summary:
         log_data = {"session_id": st.session_state.session_id, "feedback_score": score, "llm_summary": st.session_state.current_summary, "original_text": st.session_state.current_brief_text}
         log_to_supabase(log_data)
         st.session_state.feedback_given = True
 
+def naar_brief_schrijven(actie):
+    """
+    Callback van de knop 'help mij een brief schrijven'. Als callback werkt de knop ook
+    terwijl de uitleg nog gemaakt wordt: hij wordt aan het begin van de volgende run uitgevoerd.
+    """
+    st.session_state.prefill_action = True
+    st.session_state.suggested_action = actie
+    st.session_state.app_step = 'schrijven_form'
+
+def toon_vervolgstap(action_name, key):
+    """Toont de vervolgstap bij de actie, met een knop naar het schrijfformulier."""
+    letter_actions = ["Uitstel vragen", "Bezwaar maken", "Afspraak afzeggen", "Abonnement opzeggen", "Klacht indienen", "Solliciteren"]
+
+    if action_name in letter_actions:
+        st.info(f"**Vervolgstap:** Het lijkt erop dat de beste actie is om een brief te sturen om **{action_name.lower()}**.")
+        st.button(f"Ja, help mij een brief schrijven voor '{action_name}'", type="primary", key=key, on_click=naar_brief_schrijven, args=(action_name,))
+    elif action_name == 'Betalen':
+        st.info("""
+        **Vervolgstap:** De brief vraagt u om te **betalen**.
+
+        Lukt het niet om in één keer te betalen? Dan kunt u proberen om een brief te sturen om **uitstel of een betalingsregeling** te vragen.
+        """)
+        # Forceer de actie naar "Uitstel vragen" voor het formulier
+        st.button("Ja, help mij een brief schrijven om uitstel te vragen", type="primary", key=key, on_click=naar_brief_schrijven, args=("Uitstel vragen",))
+    elif action_name == 'Naar de afspraak gaan':
+        st.info("""
+        **Vervolgstap:** De brief vraagt u om te **komen** op de datum en tijd in de brief.
+
+        Kunt u niet? Zeg de afspraak dan op tijd af, dan kunt u een nieuwe afspraak maken.
+        """)
+        st.button("Ik kan niet: help mij een brief schrijven om af te zeggen", key=key, on_click=naar_brief_schrijven, args=("Afspraak afzeggen",))
+    # Voor "Geen actie nodig" of andere onbekende acties wordt niets getoond.
+
 # AANGEPAST: Reset nu ook de app_step voor de wizard-navigatie
 def reset_app_state():
-    keys_to_keep = ['session_id'] # Bewaar de unieke sessie-ID
+    # Wat nog op de achtergrond voor deze brief klaarstaat is niet meer nodig.
+    get_voorbereider().annuleer(st.session_state.session_id)
+    keys_to_keep = ['session_id', 'afgeleide_cache'] # Bewaar de unieke sessie-ID en de cache (op inhoud gesleuteld)
     for key in list(st.session_state.keys()):
         if key not in keys_to_keep:
             del st.session_state[key]
@@ -257,13 +418,14 @@ if 'app_step' not in st.session_state: st.session_state.app_step = 'start'
 if 'current_brief_text' not in st.session_state: st.session_state.current_brief_text = ""
 if 'current_summary' not in st.session_state: st.session_state.current_summary = ""
 if 'prefill_action' not in st.session_state: st.session_state.prefill_action = False
+if 'gesprek' not in st.session_state: st.session_state.gesprek = GespreksGeheugen()
+if 'brief_indexen' not in st.session_state: st.session_state.brief_indexen = LRUCache(max_items=2)  # FAISS-index per brief, zie brief_context
+get_classifier()  # Begint bij de eerste run met laden op de achtergrond
 
 if not groq_api_key:
     st.error("GROQ API sleutel niet gevonden. Controleer je .env of Streamlit secrets.")
     st.stop()
 
-llm = ChatGroq(temperature=0, groq_api_key=groq_api_key, model_name=LLM_MODEL_GROQ)
-
 st.title("🤖 AI Hulp voor Moeilijke Brieven")
 
 # --- GELEIDE NAVIGATIE (WIZARD) ---
@@ -292,55 +454,111 @@ elif st.session_state.app_step == 'uitleggen_upload':
         
     agreed = st.checkbox("Ik begrijp dat mijn brief anoniem wordt verwerkt.", value=True)
     if agreed:
-        uploaded_file = st.file_uploader("Upload een foto of PDF", type=["jpg", "png", "jpeg", "pdf"])
+        uploaded_files = st.file_uploader("Upload een of meer foto's of een PDF", type=["jpg", "png", "jpeg", "pdf"], accept_multiple_files=True)
         user_text_area = st.text_area("Of plak hier de tekst", key="user_text_input", height=200)
         
         if st.button("Leg de brief uit", type="primary"):
             input_text = ""
-            if uploaded_file:
+            if uploaded_files:
                 with st.spinner("Bestand wordt gelezen..."):
                     try:
-                        file_ext = os.path.splitext(uploaded_file.name)[1].lower()
-                        if file_ext == ".pdf":
-                            with fitz.open(stream=uploaded_file.getvalue(), filetype="pdf") as doc: 
-                                input_text = "".join(p.get_text() for p in doc)
-                        elif file_ext in [".jpg", ".png", ".jpeg"]:
-                            input_text = pytesseract.image_to_string(Image.open(uploaded_file), lang='nld')
+                        from tekst_extractie import lees_uploads
+                        # Meerdere foto's (bv. de pagina's van één brief) worden samen als één brief gelezen.
+                        with meet("upload_lezen") as meting:
+                            bestanden = [(f.name, f.getvalue()) for f in uploaded_files]
+                            meting["bytes"] = sum(len(data) for _, data in bestanden)
+                        with meet("tekst_extractie"):
+                            input_text, pagina_tijden = lees_uploads(bestanden)
+                        if pagina_tijden:
+                            st.caption("Tekstherkenning per pagina: " + ", ".join(f"pagina {nummer}: {duur:.1f}s" for nummer, duur in pagina_tijden))
                     except Exception as e: 
                         st.error(f"Fout bij het lezen van het bestand: {e}"); st.stop()
             elif user_text_area:
                 input_text = user_text_area
 
+            # Paginakoppen, herhaalde kop- en voetteksten, afbrekingen en OCR-ruis eruit: kortere prompts bij elke call.
+            if input_text and TEKST_OPSCHONEN:
+                with meet("opschonen") as meting:
+                    meting["tokens_voor"] = tel_tokens(input_text)
+                    input_text = schoon_op(input_text)
+                    meting["tokens_na"] = tel_tokens(input_text)
+
             if not input_text or not input_text.strip():
                 st.error("❌ Geen tekst gevonden. Upload een bestand of plak tekst in het vak.")
             else:
-                with st.spinner("Ik analyseer uw brief en maak een samenvatting..."):
-                    try:
-                        llm_chain_summary = LLMChain(llm=llm, prompt=PROMPT_UITLEG)
-                        response = llm_chain_summary.invoke({"context": input_text, "question": "Vat deze brief samen."})
-                        full_response_text = response.get('text', 'Kon geen samenvatting maken.')
-
-                        if "###ACTIE###" in full_response_text:
-                            parts = full_response_text.split("###ACTIE###")
-                            summary_text = parts[0].strip()
-                            action_part = parts[1]
-                            st.session_state.suggested_action = action_part.split('\n')[0].strip()
-                            if "###DATA###" in action_part:
-                                data_line = action_part.split("###DATA###")[1].strip()
-                                data_parts = {p.split(':')[0].strip(): p.split(':')[1].strip() for p in data_line.split('|')}
-                                st.session_state.suggested_ontvanger = data_parts.get("Afzender", "N.v.t.")
-                                st.session_state.suggested_kenmerk = data_parts.get("Kenmerk", "N.v.t.")
-                        else:
-                            summary_text = full_response_text
-                            st.session_state.suggested_action = None
-
-                        st.session_state.current_brief_text = input_text
-                        st.session_state.current_summary = summary_text
-                        st.session_state.messages = [{"role": "assistant", "content": summary_text}]
-                        st.session_state.app_step = 'resultaat' # Ga naar de resultatenpagina
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Er ging iets mis tijdens de analyse: {e}")
+                # Lijkt de brief sterk op een bekende standaardbrief? Zeg dan meteen van wie hij is en waar
+                # hij over gaat, terwijl de persoonlijke uitleg hieronder nog gemaakt wordt.
+                with meet("bekende_brief"):
+                    bekende_brief = zoek_bekende_brief(input_text)
+                if bekende_brief:
+                    with st.container(border=True):
+                        st.markdown(f"**Snelle uitleg:** deze brief lijkt op een bekende brief van **{bekende_brief['bron']}** ({bekende_brief['onderwerp']}).")
+                        st.caption("Hieronder maak ik een uitleg die precies over uw brief gaat.")
+                # De lokale classifier is in milliseconden klaar: toon de vervolgstap en vul het
+                # schrijfformulier alvast in. Het antwoord van het grote model overschrijft dit straks.
+                with meet("classificatie"):
+                    voorspelling = voorspel_brief(input_text)
+                st.session_state.voorspelling = voorspelling  # Ook voor de keuze van het model
+                if "actie" in voorspelling:
+                    st.session_state.suggested_action = voorspelling["actie"]
+                    toon_vervolgstap(voorspelling["actie"], key="vervolgstap_voorspeld")
+                if "bron" in voorspelling:
+                    st.session_state.suggested_ontvanger = voorspelling["bron"]
+                # Bedragen, data en kenmerken halen we zelf uit de tekst: dat is exact en kost vrijwel niets.
+                # Het model krijgt ze mee, en het schrijfformulier gebruikt ze in plaats van wat het model ervan maakt.
+                with meet("extractie"):
+                    gevonden_gegevens = extraheer(input_text)
+                st.session_state.gevonden_gegevens = gevonden_gegevens
+                if beste_kenmerk(gevonden_gegevens):
+                    st.session_state.suggested_kenmerk = beste_kenmerk(gevonden_gegevens)
+                try:
+                    llm = routeer("samenvatting", input_text)
+                    summary_inputs = {"context": input_text, "question": "Vat deze brief samen.", "gegevens": gegevens_voor_prompt(gevonden_gegevens)}
+                    antwoord = None
+                    if ANTWOORD_MODUS == "json":
+                        try:
+                            with st.spinner("Ik analyseer uw brief en maak een samenvatting..."), meet("samenvatting_json") as meting:
+                                def maak_json_antwoord():
+                                    resultaat, meting["pogingen"] = vraag_json_antwoord(llm, PROMPT_UITLEG_JSON, summary_inputs)
+                                    return resultaat
+                                antwoord = vraag_gecachet(PROMPT_UITLEG_JSON, llm, summary_inputs, maak=maak_json_antwoord)
+                            # De gevolgen zaten in hetzelfde antwoord: zet ze in de cache, dan hoeft get_gevolgen het model niet te vragen.
+                            haal_afgeleid("gevolgen", input_text, CONTEXT_MODUS, maak=lambda: antwoord["gevolgen"])
+                        except SchemaFout as e:
+                            print(f"Geen geldig JSON-antwoord, val terug op de uitleg met ###ACTIE###: {e}")
+
+                    if antwoord is None:
+                        tekst_cache, tekst_sleutel = get_antwoord_cache(), llm_sleutel(PROMPT_UITLEG, llm.model_name, summary_inputs)
+                        full_response_text = tekst_cache.get(tekst_sleutel)
+                        if full_response_text is None:
+                            if STREAM_ANTWOORDEN:
+                                with st.chat_message("assistant"):
+                                    antwoord_stream = AntwoordStream(stream_llm(llm, PROMPT_UITLEG, summary_inputs, stap="samenvatting"))
+                                    st.write_stream(antwoord_stream)
+                                full_response_text = antwoord_stream.volledige_tekst
+                            else:
+                                with st.spinner("Ik analyseer uw brief en maak een samenvatting..."), meet("samenvatting"):
+                                    full_response_text = keten(PROMPT_UITLEG, llm).invoke(summary_inputs).content
+                            if full_response_text:
+                                tekst_cache.set(tekst_sleutel, full_response_text)
+                        antwoord = parse_antwoord(full_response_text or 'Kon geen samenvatting maken.')
+
+                    summary_text = antwoord["samenvatting"]
+                    if antwoord["actie"] is not None:
+                        st.session_state.suggested_action = antwoord["actie"]
+                    if antwoord["afzender"] is not None:
+                        st.session_state.suggested_ontvanger = antwoord["afzender"]
+                        if not beste_kenmerk(gevonden_gegevens):
+                            st.session_state.suggested_kenmerk = antwoord["kenmerk"]
+
+                    st.session_state.current_brief_text = input_text
+                    st.session_state.current_summary = summary_text
+                    st.session_state.messages = [{"role": "assistant", "content": summary_text}]
+                    start_voorbereiden(input_text, summary_text)
+                    st.session_state.app_step = 'resultaat' # Ga naar de resultatenpagina
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Er ging iets mis tijdens de analyse: {e}")
     else: 
         st.warning("U moet akkoord gaan om door te gaan.")
 
@@ -357,6 +575,7 @@ elif st.session_state.app_step == 'schrijven_form':
         default_brief_type = "--- Kies een optie ---"
         default_ontvanger = ""
         default_kenmerk = ""
+        default_extra_info = ""
         brief_options = ["--- Kies een optie ---", "Vraag om uitstel van betaling", "Bezwaar maken", "Afspraak afzeggen", "Abonnement opzeggen", "Sollicitatiebrief", "Klacht indienen"]
         action_map = {"Uitstel vragen": "Vraag om uitstel van betaling", "Bezwaar maken": "Bezwaar maken", "Afspraak afzeggen": "Afspraak afzeggen", "Abonnement opzeggen": "Abonnement opzeggen", "Solliciteren": "Sollicitatiebrief", "Klacht indienen": "Klacht indienen"}
         
@@ -366,6 +585,9 @@ elif st.session_state.app_step == 'schrijven_form':
                 default_brief_type = action_map[suggested_action]
             default_ontvanger = st.session_state.get('suggested_ontvanger', "")
             default_kenmerk = st.session_state.get('suggested_kenmerk', "")
+            gevonden_gegevens = st.session_state.get('gevonden_gegevens')
+            if gevonden_gegevens and gevonden_gegevens["bedragen"]:
+                default_extra_info = "Het gaat om: " + ", ".join(dict.fromkeys(formatteer_bedrag(b["waarde"]) for b in gevonden_gegevens["bedragen"])) + "."
             st.session_state.prefill_action = False # Belangrijk: reset de vlag
 
         st.write("Kies welk soort brief je wilt sturen en vul de details in.")
@@ -377,26 +599,41 @@ elif st.session_state.app_step == 'schrijven_form':
             st.subheader("Details")
             ontvanger = st.text_input("Aan wie?", value=default_ontvanger)
             kenmerk = st.text_input("Kenmerk (factuurnummer, etc.)?", value=default_kenmerk)
-            extra_info = st.text_area("Extra informatie (leg hier je situatie uit):", height=150)
+            extra_info = st.text_area("Extra informatie (leg hier je situatie uit):", value=default_extra_info, height=150)
             
             if st.button("Schrijf mijn voorbeeldbrief", type="primary"):
                 if ontvanger:
-                    with st.spinner("Ik schrijf een voorbeeldbrief..."):
-                        try:
-                            schrijf_chain = LLMChain(llm=llm, prompt=PROMPT_SCHRIJVEN_NIEUW)
-                            response = schrijf_chain.invoke({
-                                "doel_brief": brief_type,
-                                "ontvanger": ontvanger,
-                                "kenmerk": kenmerk if kenmerk else "Niet van toepassing",
-                                "toon": toon_keuze,
-                                "extra_info": extra_info,
-                                "current_date": datetime.now().strftime("%d-%m-%Y")
-                            })
-                            brief_tekst = response.get('text', "Kon geen brief genereren.")
-                            st.subheader("Jouw voorbeeldbrief:")
+                    try:
+                        schrijf_inputs = {
+                            "doel_brief": brief_type,
+                            "ontvanger": ontvanger,
+                            "kenmerk": kenmerk if kenmerk else "Niet van toepassing",
+                            "toon": toon_keuze,
+                            "extra_info": extra_info,
+                            "current_date": datetime.now().strftime("%d-%m-%Y")
+                        }
+                        st.subheader("Jouw voorbeeldbrief:")
+                        llm = routeer("brief_schrijven", st.session_state.current_brief_text)
+                        schrijf_cache, brief_sleutel = get_antwoord_cache(), llm_sleutel(PROMPT_SCHRIJVEN_NIEUW, llm.model_name, schrijf_inputs)
+                        brief_tekst = schrijf_cache.get(brief_sleutel)
+                        if brief_tekst is not None:
                             st.text_area("Je kunt deze tekst kopiëren en aanpassen:", value=brief_tekst, height=500)
-                        except Exception as e:
-                            st.error(f"Er ging iets mis bij het schrijven van de brief: {e}")
+                        elif STREAM_ANTWOORDEN:
+                            # Laat de brief verschijnen terwijl hij geschreven wordt, en zet hem daarna in een tekstvak.
+                            brief_placeholder = st.empty()
+                            with brief_placeholder.container():
+                                brief_tekst = st.write_stream(stream_llm(llm, PROMPT_SCHRIJVEN_NIEUW, schrijf_inputs, stap="brief_schrijven"))
+                            if brief_tekst:
+                                schrijf_cache.set(brief_sleutel, brief_tekst)
+                            brief_placeholder.text_area("Je kunt deze tekst kopiëren en aanpassen:", value=brief_tekst or "Kon geen brief genereren.", height=500)
+                        else:
+                            with st.spinner("Ik schrijf een voorbeeldbrief..."), meet("brief_schrijven"):
+                                brief_tekst = keten(PROMPT_SCHRIJVEN_NIEUW, llm).invoke(schrijf_inputs).content
+                            if brief_tekst:
+                                schrijf_cache.set(brief_sleutel, brief_tekst)
+                            st.text_area("Je kunt deze tekst kopiëren en aanpassen:", value=brief_tekst or "Kon geen brief genereren.", height=500)
+                    except Exception as e:
+                        st.error(f"Er ging iets mis bij het schrijven van de brief: {e}")
                 else: 
                     st.warning("Vul de naam van de ontvanger in.")
 
@@ -434,20 +671,21 @@ elif st.session_state.app_step == 'resultaat':
         st.markdown("---")
         
         st.subheader("🔊 Laat de uitleg voorlezen")
-        audio_bytes = generate_audio_from_text(st.session_state.current_summary)
+        audio_speler = st.empty()
+        audio_bytes, audio_mime = generate_audio_from_text(st.session_state.current_summary, bij_eerste_segment=lambda segment, mime: audio_speler.audio(segment, format=mime))
         if audio_bytes:
-            st.audio(audio_bytes, format="audio/mp3")
+            audio_speler.audio(audio_bytes, format=audio_mime)
         else:
-            st.warning("Voorlezen is op dit moment niet beschikbaar.")
+            audio_speler.warning("Voorlezen is op dit moment niet beschikbaar.")
         st.markdown("---")
 
         st.subheader("🌐 Vertaal de samenvatting")
-        lang_options = ["Nederlands (origineel)", "Engels", "Arabisch", "Turks", "Pools"]
+        lang_options = ["Nederlands (origineel)"] + TALEN
         selected_lang = st.selectbox("Kies een taal", lang_options)
 
         if selected_lang != "Nederlands (origineel)":
             with st.spinner(f"Bezig met vertalen naar {selected_lang}..."):
-                translated_text = get_translation(llm, st.session_state.current_summary, selected_lang)
+                translated_text = get_translation(st.session_state.current_summary, selected_lang)
                 with st.expander(f"Vertaling in het {selected_lang}", expanded=True):
                     st.write(translated_text)
         
@@ -463,7 +701,10 @@ elif st.session_state.app_step == 'resultaat':
             st.success("Bedankt voor je feedback!")
         
         with st.expander("Privacy en Veiligheid"):
-            st.write("Jouw privacy is belangrijk. Wij slaan de inhoud van jouw brieven **niet** op. De tekst wordt alleen tijdens de analyse gebruikt en daarna direct verwijderd.")
+            st.write("Jouw privacy is belangrijk. Wij slaan de inhoud van jouw brieven **niet** op schijf op. "
+                     "Zolang de app draait, bewaren we de uitleg, vertalingen en het geluid even in het geheugen, "
+                     "zodat het de volgende keer sneller gaat. Bij een herstart van de app is dat weg.")
+            st.write("Geef je feedback (👍 of 👎), dan bewaren we de brief en de uitleg wel, om de app te verbeteren.")
     
     st.header("Uitleg en gesprek")
     for message in st.session_state.messages:
@@ -472,44 +713,50 @@ elif st.session_state.app_step == 'resultaat':
     if len(st.session_state.messages) == 1:
         with st.expander("🤔 Wat betekent dit voor mij? Klik hier voor extra uitleg."):
             with st.spinner("Ik analyseer de gevolgen..."):
-                llm_chain_gevolgen = LLMChain(llm=llm, prompt=PROMPT_GEVOLGEN)
-                response = llm_chain_gevolgen.invoke({"context": st.session_state.current_brief_text})
-                gevolgen_text = response.get('text', "Kon de gevolgen niet analyseren.")
+                gevolgen_text = get_gevolgen(st.session_state.current_brief_text)
                 st.info(gevolgen_text)
 
         # --- GECORRIGEERDE EN VERBETERDE LOGICA VOOR VERVOLGSTAP ---
-        action_name = st.session_state.get('suggested_action')
-        letter_actions = ["Uitstel vragen", "Bezwaar maken", "Afspraak afzeggen", "Abonnement opzeggen", "Klacht indienen", "Solliciteren"]
-
-        if action_name in letter_actions:
-            st.info(f"**Vervolgstap:** Het lijkt erop dat de beste actie is om een brief te sturen om **{action_name.lower()}**.")
-            if st.button(f"Ja, help mij een brief schrijven voor '{action_name}'", type="primary"):
-                st.session_state.prefill_action = True
-                st.session_state.app_step = 'schrijven_form'
-                st.rerun()
-        elif action_name == 'Betalen':
-            st.info("""
-            **Vervolgstap:** De brief vraagt u om te **betalen**.
-
-            Lukt het niet om in één keer te betalen? Dan kunt u proberen om een brief te sturen om **uitstel of een betalingsregeling** te vragen.
-            """)
-            if st.button("Ja, help mij een brief schrijven om uitstel te vragen", type="primary"):
-                st.session_state.prefill_action = True
-                # Forceer de actie naar "Uitstel vragen" voor het formulier
-                st.session_state.suggested_action = "Uitstel vragen" 
-                st.session_state.app_step = 'schrijven_form'
-                st.rerun()
-        # Voor "Geen actie nodig" of andere onbekende acties wordt niets getoond.
+        toon_vervolgstap(st.session_state.get('suggested_action'), key="vervolgstap")
 
     if final_prompt := st.chat_input("Stel hier een vervolgvraag..."):
         st.session_state.messages.append({"role": "user", "content": final_prompt})
         with st.chat_message("user"): st.markdown(final_prompt)
-        with st.spinner("Even denken..."):
-            with st.chat_message("assistant"):
-                history_str = "\n".join([f"{msg['role']}: {msg['content']}" for msg in st.session_state.messages[:-1]])
-                chat_chain = LLMChain(llm=llm, prompt=PROMPT_CHAT)
-                response = chat_chain.invoke({"history": history_str, "input": final_prompt, "original_brief": st.session_state.current_brief_text, "summary": st.session_state.current_summary})
-                ai_response_text = response.get('text', "Sorry, ik kan op dit moment geen antwoord genereren.")
-                st.markdown(ai_response_text)
-                st.session_state.messages.append({"role": "assistant", "content": ai_response_text})
-        st.rerun()
\ No newline at end of file
+        # Niet het hele gesprek en de hele brief meesturen: alleen de laatste beurten, een samenvatting
+        # van de rest, en de stukken van de brief die bij de vraag horen.
+        gesprek = st.session_state.gesprek
+        chat_inputs = {"history": gesprek.history_tekst(), "input": final_prompt, "original_brief": brief_context(st.session_state.current_brief_text, final_prompt, st.session_state.brief_indexen), "summary": st.session_state.current_summary}
+        prompt_tokens = tel_tokens(PROMPT_CHAT.format(**chat_inputs))
+        gesprek.prompt_tokens.append(prompt_tokens)
+        print(f"Chatbeurt {len(gesprek.prompt_tokens)}: ~{prompt_tokens} prompt tokens")
+        llm = routeer("chat", st.session_state.current_brief_text)
+        with st.chat_message("assistant"):
+            if STREAM_ANTWOORDEN:
+                ai_response_text = st.write_stream(stream_llm(llm, PROMPT_CHAT, chat_inputs, stap="chat")) or "Sorry, ik kan op dit moment geen antwoord genereren."
+            else:
+                with st.spinner("Even denken..."), meet("chat"):
+                    ai_response_text = keten(PROMPT_CHAT, llm).invoke(chat_inputs).content or "Sorry, ik kan op dit moment geen antwoord genereren."
+                    st.markdown(ai_response_text)
+            st.session_state.messages.append({"role": "assistant", "content": ai_response_text})
+        gesprek.voeg_toe(final_prompt, ai_response_text)
+        gesprek.vouw_op(vat_gesprek_samen)
+        st.rerun()
+
+# --- Debugpaneel ---
+# Onderaan, zodat ook de metingen van deze run erin staan.
+if DEBUG_PANEEL or st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🔧 Metingen per stap", expanded=True):
+        st.dataframe(TRACER.samenvatting(), hide_index=True)
+        if TRACER.modellen:
+            st.caption(f"Modellen: {TRACER.modellen}")
+            st.caption(f"Routering t.o.v. alles via 70b: {besparing(TRACER.modellen)}")
+        st.caption(f"Antwoordcache: {get_antwoord_cache().stats()}")
+        st.caption(f"Vooraf berekend: {get_voorbereider().stats()}")
+        st.caption(f"Vertaalgeheugen: {get_vertaalgeheugen().stats()}")
+        st.caption(f"LLM-verbindingen: {get_llm_register().stats()}")
+        logger = get_feedback_logger()
+        if logger:
+            st.caption(f"Feedback: {logger.stats()}")
+        st.caption("Laatste metingen")
+        st.dataframe(list(TRACER.recent)[-20:][::-1], hide_index=True)
+        st.download_button("Prometheus-metrics", TRACER.prometheus_tekst(), file_name="metrics.prom")
@@ -0,0 +1,131 @@
+import json
+
+ACTIE_MARKER = "###ACTIE###"
+DATA_MARKER = "###DATA###"
+TRAILER_MARKERS = [ACTIE_MARKER, DATA_MARKER]
+ACTIES = ["Betalen", "Uitstel vragen", "Bezwaar maken", "Naar de afspraak gaan", "Afspraak afzeggen", "Abonnement opzeggen", "Klacht indienen", "Solliciteren", "Geen actie nodig"]
+JSON_VELDEN = ["samenvatting", "actie", "afzender", "kenmerk", "gevolgen"]
+MAX_SCHEMA_POGINGEN = 3
+
+
+class SchemaFout(ValueError):
+    """Het model gaf geen (geldig) JSON-object volgens PROMPT_UITLEG_JSON."""
+
+
+def parse_antwoord(full_response_text):
+    """
+    Splitst het antwoord van PROMPT_UITLEG in de samenvatting voor de gebruiker
+    en de interne regels (###ACTIE### en ###DATA###).
+    """
+    resultaat = {"samenvatting": full_response_text, "actie": None, "afzender": None, "kenmerk": None}
+    if ACTIE_MARKER in full_response_text:
+        parts = full_response_text.split(ACTIE_MARKER)
+        resultaat["samenvatting"] = parts[0].strip()
+        action_part = parts[1]
+        resultaat["actie"] = action_part.split('\n')[0].strip()
+        if DATA_MARKER in action_part:
+            data_line = action_part.split(DATA_MARKER)[1].strip().split('\n')[0]
+            # Het model houdt zich niet altijd aan 'Sleutel: waarde | ...'; stukken zonder ':' slaan we over.
+            data_parts = {}
+            for p in data_line.split('|'):
+                sleutel, dubbele_punt, waarde = p.partition(':')
+                if dubbele_punt and sleutel.strip():
+                    data_parts[sleutel.strip()] = waarde.strip() or "N.v.t."
+            resultaat["afzender"] = data_parts.get("Afzender", "N.v.t.")
+            resultaat["kenmerk"] = data_parts.get("Kenmerk", "N.v.t.")
+    return resultaat
+
+
+def parse_json_antwoord(tekst):
+    """
+    Leest het antwoord van PROMPT_UITLEG_JSON en controleert het schema. Geeft dezelfde
+    dictionary als parse_antwoord, met 'gevolgen' erbij; gooit SchemaFout als er iets mist.
+    """
+    # Sommige modellen zetten er toch tekst of ```json omheen; pak alles tussen de buitenste accolades.
+    begin, eind = tekst.find('{'), tekst.rfind('}')
+    if begin == -1 or eind < begin:
+        raise SchemaFout("geen JSON-object gevonden")
+    try:
+        data = json.loads(tekst[begin:eind + 1])
+    except json.JSONDecodeError as e:
+        raise SchemaFout(f"ongeldige JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise SchemaFout("het antwoord is geen JSON-object")
+    ontbrekend = [veld for veld in JSON_VELDEN if not isinstance(data.get(veld), str)]
+    if ontbrekend:
+        raise SchemaFout(f"ontbrekende of lege velden: {', '.join(ontbrekend)}")
+    if not data["samenvatting"].strip() or not data["gevolgen"].strip():
+        raise SchemaFout("'samenvatting' en 'gevolgen' mogen niet leeg zijn")
+    if data["actie"].strip() not in ACTIES:
+        raise SchemaFout(f"'actie' moet een van deze zijn: {', '.join(ACTIES)}")
+    resultaat = {veld: data[veld].strip() for veld in JSON_VELDEN}
+    resultaat["afzender"] = resultaat["afzender"] or "N.v.t."
+    resultaat["kenmerk"] = resultaat["kenmerk"] or "N.v.t."
+    return resultaat
+
+
+def vraag_json_antwoord(llm, prompt, inputs, max_pogingen=MAX_SCHEMA_POGINGEN):
+    """
+    Vraagt het model om een JSON-antwoord (JSON-modus van de API) en controleert het schema.
+    Klopt het niet, dan vragen we het opnieuw met de fout erbij. Geeft (resultaat, aantal pogingen);
+    na max_pogingen wordt de laatste SchemaFout doorgegeven.
+    """
+    if max_pogingen < 1:
+        raise ValueError("max_pogingen moet minstens 1 zijn")
+    keten = prompt | llm.bind(response_format={"type": "json_object"})
+    opmerking = ""
+    for poging in range(1, max_pogingen + 1):
+        tekst = keten.invoke({**inputs, "opmerking": opmerking}).content
+        try:
+            return parse_json_antwoord(tekst), poging
+        except SchemaFout as e:
+            print(f"JSON-antwoord voldoet niet aan het schema (poging {poging}/{max_pogingen}): {e}")
+            fout = e
+            opmerking = f"\nLET OP: je vorige antwoord was ongeldig ({e}). Geef alleen het JSON-object met alle vijf de velden.\n"
+    raise fout
+
+
+def _deel_van_marker_aan_eind(tekst):
+    """Hoeveel tekens aan het eind kunnen het begin van een marker zijn (bv. '##')."""
+    langste = 0
+    for marker in TRAILER_MARKERS:
+        for lengte in range(min(len(marker) - 1, len(tekst)), langste, -1):
+            if tekst.endswith(marker[:lengte]):
+                langste = lengte
+                break
+    return langste
+
+
+class AntwoordStream:
+    """
+    Geeft de tokens van een stream door aan st.write_stream, maar houdt de interne
+    regels vanaf ###ACTIE### / ###DATA### achter. De volledige tekst (inclusief die
+    regels) staat na afloop in 'volledige_tekst', zodat hij geparsed kan worden.
+    """
+
+    def __init__(self, stukjes):
+        self.stukjes = stukjes
+        self.volledige_tekst = ""
+
+    def __iter__(self):
+        getoond_tot = 0
+        trailer_gevonden = False
+        for stukje in self.stukjes:
+            self.volledige_tekst += stukje
+            if trailer_gevonden:
+                continue  # Lees de rest van de stream wel uit, maar laat hem niet zien
+
+            posities = [self.volledige_tekst.find(m) for m in TRAILER_MARKERS if m in self.volledige_tekst]
+            if posities:
+                trailer_gevonden = True
+                veilig_tot = min(posities)
+            else:
+                # Houd een mogelijk half binnengekomen marker nog even vast.
+                veilig_tot = len(self.volledige_tekst) - _deel_van_marker_aan_eind(self.volledige_tekst)
+
+            if veilig_tot > getoond_tot:
+                yield self.volledige_tekst[getoond_tot:veilig_tot]
+                getoond_tot = veilig_tot
+
+        if not trailer_gevonden and getoond_tot < len(self.volledige_tekst):
+            yield self.volledige_tekst[getoond_tot:]
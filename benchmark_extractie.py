@@ -0,0 +1,65 @@
+import os
+import time
+import argparse
+from corpus import lees_brief, lees_metadata, DATA_PATH, METADATA_PATH
+from extractie import extraheer, extraheer_batch, beste_kenmerk
+
+
+def laad_corpus(data_path=DATA_PATH):
+    namen = sorted(naam for naam in os.listdir(data_path) if naam.endswith(".txt"))
+    return namen, [lees_brief(os.path.join(data_path, naam)) for naam in namen]
+
+
+def vergelijk_met_samenvattingen(namen, resultaten, metadata):
+    """
+    Controleert de bedragen en data uit de opgeslagen (door het model gemaakte) A2-samenvattingen:
+    hoeveel daarvan vindt de extractie ook in de brief zelf?
+    """
+    totaal, gevonden = {"bedragen": 0, "data": 0}, {"bedragen": 0, "data": 0}
+    for naam, resultaat in zip(namen, resultaten):
+        samenvatting = metadata.get(naam, {}).get("a2_samenvatting")
+        if not samenvatting:
+            continue
+        uit_samenvatting = extraheer(samenvatting)
+        for soort in totaal:
+            in_brief = {item["waarde"] for item in resultaat[soort]}
+            for item in uit_samenvatting[soort]:
+                totaal[soort] += 1
+                gevonden[soort] += item["waarde"] in in_brief
+    return totaal, gevonden
+
+
+# --- Start het Script ---
+# Meet snelheid en dekking met: python benchmark_extractie.py
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de extractie van bedragen, data en kenmerken over Data/.")
+    parser.add_argument("--herhalingen", type=int, default=20, help="Hoe vaak het hele corpus wordt doorlopen voor de tijdmeting.")
+    args = parser.parse_args()
+
+    namen, teksten = laad_corpus()
+    megabytes = sum(len(tekst.encode('utf-8')) for tekst in teksten) / 1e6
+
+    start = time.perf_counter()
+    for _ in range(args.herhalingen):
+        resultaten = extraheer_batch(teksten)
+    duur = (time.perf_counter() - start) / args.herhalingen
+    print(f"{len(teksten)} brieven ({megabytes:.2f} MB) in {duur * 1000:.1f} ms: "
+          f"{len(teksten) / duur:.0f} brieven/s, {duur / len(teksten) * 1e6:.0f} µs per brief, {megabytes / duur:.1f} MB/s")
+
+    print("\nDekking:")
+    for soort in ["bedragen", "data", "kenmerken", "ibans"]:
+        met = sum(1 for resultaat in resultaten if resultaat[soort])
+        aantal = sum(len(resultaat[soort]) for resultaat in resultaten)
+        print(f"  {soort:<10} {aantal:>5} gevonden, in {met}/{len(teksten)} brieven")
+    soorten_kenmerk = {}
+    for resultaat in resultaten:
+        for kenmerk in resultaat["kenmerken"]:
+            soorten_kenmerk[kenmerk["soort"]] = soorten_kenmerk.get(kenmerk["soort"], 0) + 1
+    print(f"  kenmerken per soort: {soorten_kenmerk}")
+    print(f"  brieven met een kenmerk voor het schrijfformulier: {sum(1 for r in resultaten if beste_kenmerk(r))}/{len(teksten)}")
+
+    totaal, gevonden = vergelijk_met_samenvattingen(namen, resultaten, lees_metadata(METADATA_PATH))
+    print("\nBedragen en data uit de opgeslagen A2-samenvattingen die ook in de brief gevonden worden:")
+    for soort in totaal:
+        if totaal[soort]:
+            print(f"  {soort:<10} {gevonden[soort]}/{totaal[soort]} ({gevonden[soort] / totaal[soort]:.0%})")
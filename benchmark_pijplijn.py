@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import fitz  # PyMuPDF
+from corpus import lees_brief, DATA_PATH, METADATA_PATH
+from tracing import TRACER, TraceCallback, meet
+from nep_llm import NepLLM
+
+# --- Configuratie ---
+GELIJKTIJDIG = [1, 4, 8]
+# Met --vergelijk telt een stap als regressie als de mediaan meer dan 25% én meer dan 10 ms trager is.
+# De mediaan, niet p95: met een paar tientallen brieven per ronde is p95 te veel ruis voor CI.
+MAX_REGRESSIE = 0.25
+MIN_VERSCHIL_MS = 10.0
+
+
+# --- Brieven voorbereiden ---
+def maak_pdf(tekst, gescand=False):
+    """
+    Zet de tekst op een A4 in een PDF. Met 'gescand' wordt de pagina daarna een plaatje
+    (zonder tekstlaag), zoals bij een scan, zodat de PDF via OCR gelezen moet worden.
+    """
+    with fitz.open() as doc:
+        pagina = doc.new_page(width=595, height=842)
+        pagina.insert_textbox(fitz.Rect(50, 50, 545, 800), tekst, fontsize=9)
+        if not gescand:
+            return doc.tobytes()
+        png = pagina.get_pixmap(dpi=200).tobytes("png")
+    with fitz.open() as scan:
+        scan.new_page(width=595, height=842).insert_image(fitz.Rect(0, 0, 595, 842), stream=png)
+        return scan.tobytes()
+
+
+def maak_afbeelding(tekst):
+    """De tekst als foto (PNG) van een A4."""
+    with fitz.open(stream=maak_pdf(tekst), filetype="pdf") as doc:
+        return doc[0].get_pixmap(dpi=200).tobytes("png")
+
+
+def ocr_beschikbaar():
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def laad_werk(vormen, aantal=None):
+    """Per brief en per vorm (tekst, pdf, scan, foto) een (naam, vorm, bestanden)-taak, met bestanden als [(naam, bytes)]."""
+    namen = sorted(naam for naam in os.listdir(DATA_PATH) if naam.endswith(".txt"))[:aantal]
+    werk = []
+    for naam in namen:
+        tekst = lees_brief(os.path.join(DATA_PATH, naam))
+        basis = os.path.splitext(naam)[0]
+        if "tekst" in vormen:
+            werk.append((naam, "tekst", tekst))
+        if "pdf" in vormen:
+            werk.append((naam, "pdf", [(basis + ".pdf", maak_pdf(tekst))]))
+        if "scan" in vormen:
+            werk.append((naam, "scan", [(basis + "_scan.pdf", maak_pdf(tekst, gescand=True))]))
+        if "foto" in vormen:
+            werk.append((naam, "foto", [(basis + ".png", maak_afbeelding(tekst))]))
+    return werk
+
+
+# --- Eén brief door de pijplijn ---
+class NepTTS:
+    """Stem voor de benchmark: wacht even (vast plus per teken) en geeft nep-MP3 terug, zonder netwerk of espeak-ng."""
+    naam = "nep"
+    mime = "audio/mpeg"
+    extensie = "mp3"
+
+    def __init__(self, vertraging_s=0.2, per_teken_s=0.001):
+        self.vertraging_s = vertraging_s
+        self.per_teken_s = per_teken_s
+
+    def is_beschikbaar(self):
+        return True
+
+    def synthetiseer(self, tekst, lang="nl"):
+        time.sleep(self.vertraging_s + self.per_teken_s * len(tekst))
+        return tekst.encode("utf-8")
+
+
+class Pijplijn:
+    """
+    Dezelfde stappen als 'Leg de brief uit' in de app, met dezelfde functies, maar zonder Streamlit
+    en met NepLLM in plaats van Groq. Daarna wat de resultatenpagina doet: de gevolgen, de
+    vertalingen en de audio. 'modus' is ANTWOORD_MODUS van de app: 'tekst' (streamen, de standaard) of 'json'.
+    """
+
+    def __init__(self, llm, modus="tekst", talen=None, tts=None):
+        from classificatie import laad_classifier
+        from vergelijkbare_brieven import VergelijkbareBrieven
+        from vertaling import TALEN
+        self.llm = llm
+        self.modus = modus
+        self.talen = TALEN if talen is None else talen
+        self.tts = tts or NepTTS()
+        # Net als st.cache_resource in de app: één keer opbouwen, buiten de meting.
+        self.classifier = laad_classifier(DATA_PATH, METADATA_PATH)
+        self.vergelijkbare_brieven = VergelijkbareBrieven(DATA_PATH, METADATA_PATH)
+        self.reset()
+
+    def reset(self):
+        """Een leeg vertaalgeheugen, zoals bij een nieuwe start van de app (het geheugen wordt per ronde opgebouwd)."""
+        from brief_cache import LRUCache
+        from vertaling import VertaalGeheugen
+        self.vertaalgeheugen = VertaalGeheugen(LRUCache(max_items=4096))
+
+    def samenvatting(self, inputs):
+        """Zoals de app: in 'tekst' gestreamd via AntwoordStream en parse_antwoord, anders één JSON-call."""
+        from antwoord_parser import AntwoordStream, parse_antwoord, vraag_json_antwoord
+        from prompts import PROMPT_UITLEG, PROMPT_UITLEG_JSON
+        if self.modus == "json":
+            with meet("samenvatting_json") as meting:
+                antwoord, meting["pogingen"] = vraag_json_antwoord(self.llm, PROMPT_UITLEG_JSON, inputs)
+            return antwoord
+        with meet("samenvatting") as meting:
+            start = time.perf_counter()
+            def stukjes():
+                for chunk in (PROMPT_UITLEG | self.llm).stream(inputs):
+                    meting.setdefault("eerste_token_ms", round((time.perf_counter() - start) * 1000, 1))
+                    yield chunk.content
+            stream = AntwoordStream(stukjes())
+            for _ in stream:  # st.write_stream in de app
+                pass
+        return parse_antwoord(stream.volledige_tekst)
+
+    def verwerk(self, invoer):
+        from tekst_extractie import lees_uploads
+        from extractie import extraheer, gegevens_voor_prompt
+        from gesprek_geheugen import relevante_passages
+        from model_router import kies_model
+        from prompts import PROMPT_GEVOLGEN, PROMPT_VERTAAL_STUKKEN
+        from tekst_opschonen import schoon_op
+        from vertaling import vertaal_samenvatting
+        from spraak import genereer_audio_segmenten
+
+        with meet("brief_totaal"):
+            if isinstance(invoer, str):
+                tekst = invoer
+            else:
+                with meet("tekst_extractie"):
+                    tekst, _ = lees_uploads(invoer)
+            with meet("opschonen"):
+                tekst = schoon_op(tekst)
+            with meet("bekende_brief"):
+                self.vergelijkbare_brieven.zoek(tekst)
+            with meet("classificatie"):
+                voorspelling = self.classifier.voorspel(tekst)
+            with meet("extractie"):
+                gevonden = extraheer(tekst)
+            with meet("routering"):
+                # Welk model het wordt maakt voor NepLLM niet uit, maar de keuze zelf hoort bij de pijplijn.
+                for taak in ("samenvatting", "gevolgen"):
+                    kies_model(taak, tekst, voorspelling.get("document_type"), voorspelling.get("actie"))
+            inputs = {"context": tekst, "question": "Vat deze brief samen.", "gegevens": gegevens_voor_prompt(gevonden)}
+            antwoord = self.samenvatting(inputs)
+
+            # --- Resultatenpagina ---
+            if self.modus != "json":  # In 'json' zaten de gevolgen al in het antwoord
+                with meet("gevolgen"):
+                    # De app zoekt bij lange brieven met embeddings; hier de terugval op woorden (geen model nodig).
+                    (PROMPT_GEVOLGEN | self.llm).invoke({"context": relevante_passages(tekst, "gevolgen betalen termijn")})
+            if self.talen:
+                with meet("vertalingen"):
+                    vertaal_samenvatting(antwoord["samenvatting"], self.talen, self.llm, PROMPT_VERTAAL_STUKKEN, self.vertaalgeheugen)
+            with meet("audio") as meting:
+                start = time.perf_counter()
+                for _ in genereer_audio_segmenten(antwoord["samenvatting"], backend=self.tts, fallback=self.tts):
+                    meting.setdefault("eerste_segment_ms", round((time.perf_counter() - start) * 1000, 1))
+        return antwoord
+
+
+def piek_rss_mb():
+    """Hoogste geheugengebruik (RSS) van dit proces en van het grootste afgesloten subproces, in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None, None
+    eigen = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    kinderen = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    deler = 1024 * 1024 if sys.platform == "darwin" else 1024  # macOS geeft bytes, Linux kilobytes
+    return round(eigen / deler, 1), round(kinderen / deler, 1)
+
+
+def ronde(pijplijn, werk, gelijktijdig):
+    """Verwerkt al het werk met 'gelijktijdig' brieven tegelijk; geeft de duur en de metingen per stap."""
+    import spraak
+    from tekst_extractie import _bestand_cache
+    _bestand_cache.clear()  # Elke ronde moet echt lezen; anders meten we de cache
+    spraak._audio_cache = None  # Ook de audio opnieuw inspreken (alleen stukken die binnen de ronde terugkomen uit de cache)
+    pijplijn.reset()
+    TRACER.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=gelijktijdig) as pool:
+        list(pool.map(lambda taak: pijplijn.verwerk(taak[2]), werk))
+    return time.perf_counter() - start, TRACER.samenvatting()
+
+
+def vergelijk(resultaat, basislijn_pad, max_regressie=MAX_REGRESSIE):
+    """Vergelijkt de p50 per stap met een eerder resultaat (--json); geeft de regressies terug."""
+    with open(basislijn_pad, 'r', encoding='utf-8') as f:
+        basislijn = json.load(f)
+    oud = {rij["stap"]: rij for rij in basislijn["stappen"]}
+    regressies = []
+    for rij in resultaat["stappen"]:
+        vorige = oud.get(rij["stap"])
+        if vorige and vorige["p50_ms"] > 0:
+            verschil = rij["p50_ms"] / vorige["p50_ms"] - 1
+            if verschil > max_regressie and rij["p50_ms"] - vorige["p50_ms"] > MIN_VERSCHIL_MS:
+                regressies.append(f"{rij['stap']}: p50 {vorige['p50_ms']} -> {rij['p50_ms']} ms (+{verschil:.0%})")
+    return regressies
+
+
+# --- Start het Script ---
+# Zonder netwerk, dus ook in CI: python benchmark_pijplijn.py --aantal 20 --vertraging 0.2
+# Sla een basislijn op met --json basis.json en vergelijk later met --vergelijk basis.json.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de pijplijn van de app over Data/ met een lokaal nep-model.")
+    parser.add_argument("--aantal", type=int, default=None, help="Alleen de eerste N brieven (standaard: alle).")
+    parser.add_argument("--vormen", default="tekst,pdf,scan,foto", help="Welke vormen: tekst, pdf, scan en/of foto.")
+    parser.add_argument("--gelijktijdig", default=",".join(map(str, GELIJKTIJDIG)), help="Aantallen brieven tegelijk, bv. 1,4,8.")
+    parser.add_argument("--vertraging", type=float, default=0.5, help="Vaste vertraging per LLM-call in seconden.")
+    parser.add_argument("--per-token", type=float, default=0.002, help="Extra vertraging per gegenereerd token in seconden.")
+    parser.add_argument("--modus", choices=["tekst", "json"], default="tekst", help="ANTWOORD_MODUS van de app (standaard 'tekst', gestreamd).")
+    parser.add_argument("--talen", type=int, default=None, help="Aantal talen voor de vertalingen (0 = niet vertalen; standaard alle).")
+    parser.add_argument("--tts-vertraging", type=float, default=0.2, help="Vaste vertraging per ingesproken stuk in seconden.")
+    parser.add_argument("--json", help="Schrijf het resultaat (van de laatste ronde) naar dit bestand.")
+    parser.add_argument("--vergelijk", help="Vergelijk met een eerder --json-resultaat; exitcode 1 bij een regressie.")
+    args = parser.parse_args()
+
+    TRACER.log = False
+    vormen = set(args.vormen.split(","))
+    if vormen & {"scan", "foto"} and not ocr_beschikbaar():
+        print("Tesseract niet gevonden: 'scan' en 'foto' worden overgeslagen.")
+        vormen -= {"scan", "foto"}
+
+    llm = NepLLM(vertraging_s=args.vertraging, per_token_s=args.per_token, callbacks=[TraceCallback()])
+    start = time.perf_counter()
+    from vertaling import TALEN
+    pijplijn = Pijplijn(llm, modus=args.modus, talen=TALEN[:args.talen] if args.talen is not None else None, tts=NepTTS(args.tts_vertraging))
+    werk = laad_werk(vormen, args.aantal)
+    print(f"{len(werk)} taken ({', '.join(sorted(vormen))}), voorbereiden: {time.perf_counter() - start:.1f}s")
+
+    resultaat = None
+    for gelijktijdig in [int(n) for n in args.gelijktijdig.split(",")]:
+        duur, stappen = ronde(pijplijn, werk, gelijktijdig)
+        print(f"\n=== {gelijktijdig} tegelijk: {len(werk) / duur:.1f} brieven/s ({duur:.1f}s) ===")
+        print(f"{'stap':<20}{'aantal':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'tokens':>9}{'cache':>8}")
+        for rij in stappen:
+            cache = f"{rij['cache_hits']}/{rij['cache_hits'] + rij['cache_misses']}" if rij['cache_hits'] + rij['cache_misses'] else "-"
+            print(f"{rij['stap']:<20}{rij['aantal']:>8}{rij['p50_ms']:>10}{rij['p95_ms']:>10}{rij['max_ms']:>10}"
+                  f"{rij['prompt_tokens'] + rij['completion_tokens']:>9}{cache:>8}")
+        resultaat = {"gelijktijdig": gelijktijdig, "taken": len(werk), "brieven_per_s": round(len(werk) / duur, 2), "stappen": stappen}
+
+    eigen, kinderen = piek_rss_mb()
+    if eigen is not None:
+        print(f"\nPiek-RSS: {eigen} MB (pijplijn), {kinderen} MB (grootste afgesloten subproces)")
+        resultaat["piek_rss_mb"] = eigen
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultaat, f, indent=2)
+    if args.vergelijk:
+        regressies = vergelijk(resultaat, args.vergelijk)
+        for regressie in regressies:
+            print(f"REGRESSIE: {regressie}")
+        sys.exit(1 if regressies else 0)
@@ -0,0 +1,63 @@
+import os
+import time
+import argparse
+import statistics
+import pandas as pd
+from spraak import BACKENDS, splits_in_segmenten
+
+# --- Configuratie ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+METADATA_FILE = os.path.join(SCRIPT_DIR, "metadata.csv")
+
+
+def laad_teksten(aantal):
+    """Gebruikt de A2-samenvattingen uit metadata.csv als realistische voorleesteksten."""
+    df = pd.read_csv(METADATA_FILE)
+    samenvattingen = df['a2_samenvatting'].dropna().tolist()[:aantal]
+    return [segment for tekst in samenvattingen for segment in splits_in_segmenten(tekst)]
+
+
+def benchmark_backend(backend, teksten):
+    """Spreekt alle teksten in (zonder cache) en meet de tijd en grootte per stuk."""
+    tijden, bytes_totaal, tekens_totaal, fouten = [], 0, 0, 0
+    for tekst in teksten:
+        start = time.perf_counter()
+        try:
+            data = backend.synthetiseer(tekst)
+        except Exception as e:
+            fouten += 1
+            print(f"  FOUT bij '{backend.naam}': {e}")
+            continue
+        tijden.append(time.perf_counter() - start)
+        bytes_totaal += len(data)
+        tekens_totaal += len(tekst)
+    return {
+        "stukken": len(tijden),
+        "fouten": fouten,
+        "p50_s": statistics.median(tijden) if tijden else None,
+        "max_s": max(tijden) if tijden else None,
+        "bytes_per_teken": bytes_totaal / tekens_totaal if tekens_totaal else None,
+    }
+
+
+# --- Start het Script ---
+# Vergelijk de stemmen met: python benchmark_spraak.py --aantal 10
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vergelijk de TTS-engines op snelheid en grootte.")
+    parser.add_argument("--aantal", type=int, default=10, help="Aantal samenvattingen uit metadata.csv.")
+    parser.add_argument("--engines", nargs="+", default=list(BACKENDS), help="Welke engines meten.")
+    args = parser.parse_args()
+
+    teksten = laad_teksten(args.aantal)
+    print(f"{len(teksten)} stukken tekst uit {args.aantal} samenvattingen.\n")
+    print(f"{'engine':<10} {'stukken':>8} {'fouten':>7} {'p50 (s)':>9} {'max (s)':>9} {'bytes/teken':>12}")
+    for naam in args.engines:
+        backend = BACKENDS[naam]
+        if not backend.is_beschikbaar():
+            print(f"{naam:<10} niet beschikbaar op deze machine")
+            continue
+        r = benchmark_backend(backend, teksten)
+        if not r["stukken"]:
+            print(f"{naam:<10} {0:>8} {r['fouten']:>7}")
+            continue
+        print(f"{naam:<10} {r['stukken']:>8} {r['fouten']:>7} {r['p50_s']:>9.2f} {r['max_s']:>9.2f} {r['bytes_per_teken']:>12.0f}")
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# --- Configuratie ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ANTWOORD_CACHE_PATH = os.getenv("ANTWOORD_CACHE_PATH", os.path.join(SCRIPT_DIR, "antwoord_cache.sqlite"))
+ANTWOORD_CACHE_TTL = float(os.getenv("ANTWOORD_CACHE_TTL", 7 * 24 * 3600))  # Seconden; standaard een week
+ANTWOORD_CACHE_MAX = 20000  # Antwoorden; daarboven gaan de langst niet gebruikte eruit
+ANTWOORD_CACHE_OVERSLAAN = os.getenv("ANTWOORD_CACHE_OVERSLAAN", "0") == "1"  # "1": altijd opnieuw aan het model vragen
+# Alleen voor de app: in de antwoorden staan namen, bedragen en kenmerken uit de brieven van gebruikers.
+# Standaard blijven ze daarom alleen in het geheugen; "1" bewaart ze ook in ANTWOORD_CACHE_PATH.
+ANTWOORD_CACHE_OP_SCHIJF = os.getenv("ANTWOORD_CACHE_OP_SCHIJF", "0") == "1"
+
+
+def inhoud_sleutel(*delen):
+    """Maakt een vaste sleutel op basis van de inhoud (bv. soort, brieftekst, taal)."""
+    h = hashlib.sha256()
+    for deel in delen:
+        h.update(str(deel).encode('utf-8'))
+        h.update(b"\x00")  # Scheidingsteken, zodat ("ab", "c") en ("a", "bc") verschillen
+    return h.hexdigest()
+
+
+class LRUCache:
+    """Kleine thread-veilige cache die de langst niet gebruikte items als eerste weggooit."""
+
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sleutel, standaard=None):
+        with self._lock:
+            if sleutel not in self._items:
+                return standaard
+            self._items.move_to_end(sleutel)
+            return self._items[sleutel]
+
+    def set(self, sleutel, waarde):
+        with self._lock:
+            self._items[sleutel] = waarde
+            self._items.move_to_end(sleutel)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, sleutel):
+        with self._lock:
+            return sleutel in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+def haal_of_maak(sleutel, maak, *caches):
+    """
+    Zoekt de sleutel op in de caches (in volgorde, bv. eerst sessie en dan proces).
+    Alleen als hij nergens staat wordt 'maak' aangeroepen. Een resultaat van None
+    (mislukt) wordt niet bewaard, zodat het de volgende keer opnieuw geprobeerd wordt.
+    """
+    for i, cache in enumerate(caches):
+        waarde = cache.get(sleutel)
+        if waarde is not None:
+            # Zet het resultaat ook in de snellere caches die het nog niet hadden.
+            for eerdere_cache in caches[:i]:
+                eerdere_cache.set(sleutel, waarde)
+            return waarde
+    waarde = maak()
+    if waarde is not None:
+        for cache in caches:
+            cache.set(sleutel, waarde)
+    return waarde
+
+
+# --- Gedeelde cache op schijf ---
+def prompt_versie(prompt):
+    """Korte hash van de prompttekst (PromptTemplate of str): verandert de prompt, dan verandert de sleutel."""
+    tekst = getattr(prompt, "template", prompt)
+    return hashlib.sha256(str(tekst).encode('utf-8')).hexdigest()[:12]
+
+
+def normaliseer_invoer(inputs):
+    """Zelfde invoer, zelfde sleutel: witruimte (spaties, regeleinden, tabs) telt niet mee."""
+    return {naam: " ".join(str(waarde).split()) for naam, waarde in sorted(inputs.items())}
+
+
+def llm_sleutel(prompt, model_name, inputs):
+    """Sleutel voor een antwoord van het model: promptversie, model en de genormaliseerde invoer."""
+    return inhoud_sleutel(prompt_versie(prompt), model_name, json.dumps(normaliseer_invoer(inputs), ensure_ascii=False))
+
+
+class SchijfCache:
+    """
+    Antwoorden van het model in een SQLite-bestand, gedeeld door alle gebruikers, processen en
+    scripts, en bewaard na een herstart. Verouderde antwoorden (ouder dan 'ttl_s') tellen niet;
+    bij meer dan 'max_items' gaan de langst niet gebruikte eruit. Waarden moeten JSON zijn.
+    Met 'overslaan' wordt er niet uit de cache gelezen, maar wel geschreven (om hem te verversen).
+    Met pad ":memory:" staat alles alleen in het geheugen van dit proces.
+    """
+
+    def __init__(self, pad, ttl_s=ANTWOORD_CACHE_TTL, max_items=ANTWOORD_CACHE_MAX, overslaan=False):
+        self.pad = pad
+        self.ttl_s = ttl_s
+        self.max_items = max_items
+        self.overslaan = overslaan
+        self.teller = {"hits": 0, "misses": 0, "verlopen": 0, "weggegooid": 0, "fouten": 0}
+        self._lock = threading.Lock()
+        # Eén verbinding, gedeeld door de threads van Streamlit (daarom de lock).
+        self._db = sqlite3.connect(pad, timeout=10, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")  # Lezen en schrijven vanuit meerdere processen tegelijk
+            self._db.execute("CREATE TABLE IF NOT EXISTS antwoorden (sleutel TEXT PRIMARY KEY, waarde TEXT, gemaakt REAL, gebruikt REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS antwoorden_gebruikt ON antwoorden (gebruikt)")
+
+    def get(self, sleutel, standaard=None):
+        if self.overslaan:
+            return standaard
+        nu = time.time()
+        try:
+            with self._lock, self._db:
+                rij = self._db.execute("SELECT waarde, gemaakt FROM antwoorden WHERE sleutel = ?", (sleutel,)).fetchone()
+                if rij and nu - rij[1] > self.ttl_s:
+                    self._db.execute("DELETE FROM antwoorden WHERE sleutel = ?", (sleutel,))
+                    self.teller["verlopen"] += 1
+                    rij = None
+                if rij is None:
+                    self.teller["misses"] += 1
+                    return standaard
+                self._db.execute("UPDATE antwoorden SET gebruikt = ? WHERE sleutel = ?", (nu, sleutel))
+                self.teller["hits"] += 1
+            return json.loads(rij[0])
+        except sqlite3.Error as e:
+            # Een kapotte of vergrendelde cache mag de app niet stoppen: dan vragen we het model.
+            print(f"Fout bij het lezen van de antwoordcache: {e}")
+            self.teller["fouten"] += 1
+            return standaard
+
+    def set(self, sleutel, waarde):
+        nu = time.time()
+        try:
+            with self._lock, self._db:
+                self._db.execute("INSERT OR REPLACE INTO antwoorden VALUES (?, ?, ?, ?)", (sleutel, json.dumps(waarde, ensure_ascii=False), nu, nu))
+                teveel = self._db.execute("SELECT COUNT(*) FROM antwoorden").fetchone()[0] - self.max_items
+                if teveel > 0:
+                    self._db.execute("DELETE FROM antwoorden WHERE sleutel IN (SELECT sleutel FROM antwoorden ORDER BY gebruikt LIMIT ?)", (teveel,))
+                    self.teller["weggegooid"] += teveel
+        except sqlite3.Error as e:
+            print(f"Fout bij het schrijven naar de antwoordcache: {e}")
+            self.teller["fouten"] += 1
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM antwoorden")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM antwoorden").fetchone()[0]
+
+    def stats(self):
+        """Hits, misses en grootte, voor het debugpaneel en de logs."""
+        totaal = self.teller["hits"] + self.teller["misses"]
+        return {"items": len(self), **self.teller, "hit_ratio": round(self.teller["hits"] / totaal, 2) if totaal else None}
@@ -0,0 +1,51 @@
+import re
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+
+# --- Configuratie ---
+MAX_TEKENS_PER_STUK = 600  # Een lange alinea wordt verder geknipt, anders kijkt het embedding-model niet naar het eind
+TOP_K = 4
+
+
+def splits_brief(brief_tekst):
+    """
+    Knipt de brief op per pagina (--- Pagina x van y ---) en daarbinnen per alinea.
+    Elk stuk onthoudt op welke pagina en plek het stond, zodat we de volgorde kunnen herstellen.
+    """
+    paginas = re.split(r'^--- Pagina (\d+) van \d+ ---\s*$', brief_tekst, flags=re.MULTILINE)
+    # re.split met een groep geeft: [tekst vóór de eerste kop, paginanummer, tekst, paginanummer, tekst, ...]
+    delen = [(1, paginas[0])] + [(int(paginas[i]), paginas[i + 1]) for i in range(1, len(paginas) - 1, 2)]
+
+    documenten = []
+    for pagina, tekst in delen:
+        for alinea in re.split(r'\n\s*\n', tekst):
+            alinea = alinea.strip()
+            while alinea:
+                # Knip lange alinea's bij een regelovergang in de buurt van de maximale lengte.
+                knip = len(alinea) if len(alinea) <= MAX_TEKENS_PER_STUK else (alinea.rfind("\n", 0, MAX_TEKENS_PER_STUK) + 1 or MAX_TEKENS_PER_STUK)
+                stuk, alinea = alinea[:knip].strip(), alinea[knip:].strip()
+                if stuk:
+                    documenten.append(Document(page_content=stuk, metadata={"pagina": pagina, "volgorde": len(documenten)}))
+    return documenten
+
+
+class BriefIndex:
+    """Kleine FAISS-index in het geheugen met de stukken van één brief (per sessie)."""
+
+    def __init__(self, brief_tekst, embeddings):
+        self.stukken = splits_brief(brief_tekst)
+        self.vectorstore = FAISS.from_documents(self.stukken, embeddings) if self.stukken else None
+
+    def zoek(self, vraag, k=TOP_K):
+        """De k stukken die het best bij de vraag passen, in de volgorde van de brief."""
+        if self.vectorstore is None:
+            return []
+        gevonden = self.vectorstore.similarity_search(vraag, k=min(k, len(self.stukken)))
+        # Het eerste stuk (afzender, kenmerk) is bijna altijd nodig om de vraag te kunnen plaatsen.
+        if self.stukken[0].metadata["volgorde"] not in {doc.metadata["volgorde"] for doc in gevonden}:
+            gevonden.append(self.stukken[0])
+        return sorted(gevonden, key=lambda doc: doc.metadata["volgorde"])
+
+    def context(self, vraag, k=TOP_K):
+        """De gevonden stukken als tekst voor in de prompt, met de pagina erbij."""
+        return "\n...\n".join(f"[Pagina {doc.metadata['pagina']}] {doc.page_content}" for doc in self.zoek(vraag, k))
@@ -0,0 +1,132 @@
+import os
+import pickle
+import hashlib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from corpus import lees_brief, lees_metadata, huidige_bestanden, SCRIPT_DIR, DATA_PATH, METADATA_PATH
+
+# --- Configuratie ---
+LABELS = ["bron", "document_type", "actie"]
+# Pas vanaf deze zekerheid gebruikt de app een voorspelling. Gemeten met evalueer_classificatie.py (133 brieven):
+# zonder drempel is maar 37% (bron), 29% (document_type) en 70% (actie) goed. Boven de drempel is 93-100% goed,
+# maar dan krijgt maar ~2% van de brieven een bron of soort brief, en ~1 op de 3 een actie.
+MIN_ZEKERHEID = 0.6
+CLASSIFIER_PATH = os.path.join(SCRIPT_DIR, "classifier.pkl")
+
+# metadata.csv heeft geen kolom voor de vervolgactie. We leiden hem af uit document_type en
+# trefwoorden, met dezelfde keuzes als in PROMPT_UITLEG. De eerste regel die past, wint.
+ACTIE_REGELS = [
+    ("Klacht indienen", {"document_types": set(), "trefwoorden": {"klacht"}}),
+    ("Bezwaar maken", {"document_types": {"Afwijzing", "Sanctie"}, "trefwoorden": {"afgewezen", "beroep", "bezwaar"}}),
+    ("Betalen", {"document_types": {"Boete", "Aanmaning", "Beslaglegging", "Dwangbevel", "Terugvordering"}, "trefwoorden": {"betalen", "niet betaald", "terugbetalen", "bijbetalen"}}),
+    # Een uitnodiging of oproep vraagt om te komen; afzeggen is een keuze van de gebruiker, geen standaardactie.
+    ("Naar de afspraak gaan", {"document_types": {"Uitnodiging", "Oproep"}, "trefwoorden": {"afspraak", "moet komen", "verschijnen"}}),
+    ("Abonnement opzeggen", {"document_types": set(), "trefwoorden": {"abonnement", "opzeggen"}}),
+]
+
+
+def actie_label(metadata):
+    """Leidt de vervolgactie af uit de metadata van een brief uit het corpus."""
+    trefwoorden = {w.strip() for w in metadata.get("trefwoorden", "").split(",")}
+    for actie, regel in ACTIE_REGELS:
+        if metadata.get("document_type") in regel["document_types"] or trefwoorden & regel["trefwoorden"]:
+            return actie
+    return "Geen actie nodig"
+
+
+def laad_voorbeelden(data_path=DATA_PATH, metadata_path=METADATA_PATH):
+    """Geeft de brieven uit Data/ met hun labels (bron, document_type, actie)."""
+    metadata = lees_metadata(metadata_path)
+    teksten, labels = [], []
+    for bestandsnaam in sorted(os.listdir(data_path)):
+        meta = metadata.get(bestandsnaam)
+        if not bestandsnaam.endswith(".txt") or not meta:
+            continue
+        teksten.append(lees_brief(os.path.join(data_path, bestandsnaam)))
+        labels.append({"bron": meta["bron"], "document_type": meta["document_type"], "actie": actie_label(meta)})
+    return teksten, labels
+
+
+class BriefClassifier:
+    """
+    TF-IDF op letterreeksen met per label een logistische regressie. Geeft in een paar milliseconden
+    een gok voor afzender, soort brief en vervolgactie, nog voordat het grote model klaar is.
+    Met ~130 voorbeelden en zwakke labels is die gok vaak fout; alleen voorspellingen boven
+    MIN_ZEKERHEID zijn bruikbaar, en het antwoord van het grote model gaat altijd voor.
+    """
+
+    def __init__(self):
+        # Letterreeksen in plaats van woorden: die vangen OCR-fouten en samenstellingen op.
+        self.vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True)
+        self.modellen = {}
+
+    def train(self, teksten, labels):
+        matrix = self.vectorizer.fit_transform(teksten)
+        for label in LABELS:
+            # class_weight="balanced": anders wint 'Geen actie nodig' bijna altijd.
+            model = LogisticRegression(C=10, max_iter=2000, class_weight="balanced")
+            self.modellen[label] = model.fit(matrix, [l[label] for l in labels])
+        return self
+
+    def voorspel(self, tekst):
+        """
+        Geeft per label de voorspelling en hoe zeker het model is (kans van de beste klasse),
+        bv. {"actie": ("Betalen", 0.72), ...}.
+        """
+        vector = self.vectorizer.transform([tekst])
+        voorspelling = {}
+        for label, model in self.modellen.items():
+            kansen = model.predict_proba(vector)[0]
+            beste = int(np.argmax(kansen))
+            voorspelling[label] = (model.classes_[beste], float(kansen[beste]))
+        return voorspelling
+
+
+def train_classifier(data_path=DATA_PATH, metadata_path=METADATA_PATH):
+    """Traint de classifier op het hele corpus (een paar seconden)."""
+    teksten, labels = laad_voorbeelden(data_path, metadata_path)
+    return BriefClassifier().train(teksten, labels)
+
+
+def corpus_hash(data_path=DATA_PATH, metadata_path=METADATA_PATH):
+    """Hash over alle brieven en hun metadata (en de actieregels); verandert als er iets verandert."""
+    regels = [(actie, sorted(regel["document_types"]), sorted(regel["trefwoorden"])) for actie, regel in ACTIE_REGELS]
+    h = hashlib.sha256(repr(regels).encode('utf-8'))
+    for naam, info in huidige_bestanden(data_path, metadata_path).items():
+        h.update(f"{naam}\x00{info['hash']}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def laad_classifier(data_path=DATA_PATH, metadata_path=METADATA_PATH, pad=CLASSIFIER_PATH):
+    """
+    Laadt de getrainde classifier van schijf. Is het corpus veranderd sinds het trainen (of is er
+    nog niets), dan wordt hij opnieuw getraind en bewaard. Zo hoeft een gebruiker nooit op het trainen te wachten.
+    """
+    versie = corpus_hash(data_path, metadata_path)
+    try:
+        with open(pad, "rb") as f:
+            opgeslagen = pickle.load(f)
+        if opgeslagen["versie"] == versie:
+            return opgeslagen["classifier"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Opgeslagen classifier onbruikbaar, opnieuw trainen: {e}")
+    classifier = train_classifier(data_path, metadata_path)
+    tmp_pad = pad + ".tmp"
+    with open(tmp_pad, "wb") as f:
+        pickle.dump({"versie": versie, "classifier": classifier}, f)
+    os.replace(tmp_pad, pad)
+    return classifier
+
+
+# --- Start het Script ---
+# Met 'python classificatie.py' train je de classifier vooraf, bijvoorbeeld tijdens het deployen.
+if __name__ == "__main__":
+    import time
+    import classificatie  # Via de module, anders komt de classifier in de pickle als __main__.BriefClassifier
+
+    start = time.perf_counter()
+    classificatie.laad_classifier()
+    print(f"Classifier klaar in '{CLASSIFIER_PATH}' ({(time.perf_counter() - start) * 1000:.0f} ms).")
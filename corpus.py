@@ -0,0 +1,53 @@
+import os
+import csv
+import json
+import hashlib
+
+# Het Data/-corpus lezen, zonder zware imports (pandas, FAISS, langchain): classificatie.py,
+# vergelijkbare_brieven.py en de scripts hebben alleen de brieven en de metadata nodig.
+
+# --- Configuratie ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(SCRIPT_DIR, "Data")
+METADATA_PATH = os.path.join(SCRIPT_DIR, "metadata.csv")
+
+# De kolommen uit metadata.csv die we meenemen (in de kennisbank en de classifier).
+METADATA_KOLOMMEN = ["bron", "onderwerp", "document_type", "trefwoorden", "a2_samenvatting"]
+
+
+def lees_brief(pad):
+    """Leest een brief in, eerst als UTF-8 en anders als Windows-encoding."""
+    try:
+        with open(pad, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        with open(pad, 'r', encoding='cp1252') as f:
+            return f.read()
+
+
+def lees_metadata(metadata_path=METADATA_PATH):
+    """Geeft de metadata per bestandsnaam terug als dictionary (lege cellen worden "")."""
+    if not os.path.exists(metadata_path):
+        return {}
+    with open(metadata_path, 'r', encoding='utf-8', newline='') as f:
+        return {rij['bestandsnaam']: {kolom: rij.get(kolom) or "" for kolom in METADATA_KOLOMMEN} for rij in csv.DictReader(f)}
+
+
+def inhoud_hash(tekst, metadata):
+    """Hash van de brieftekst plus metadata; verandert als een van beide verandert."""
+    h = hashlib.sha256(tekst.encode('utf-8'))
+    h.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return h.hexdigest()
+
+
+def huidige_bestanden(data_path=DATA_PATH, metadata_path=METADATA_PATH):
+    """Geeft per brief in de Data-map de tekst, metadata en hash terug."""
+    metadata = lees_metadata(metadata_path)
+    bestanden = {}
+    for bestandsnaam in sorted(os.listdir(data_path)):
+        if not bestandsnaam.endswith(".txt"):
+            continue
+        tekst = lees_brief(os.path.join(data_path, bestandsnaam))
+        meta = metadata.get(bestandsnaam, {})
+        bestanden[bestandsnaam] = {"tekst": tekst, "metadata": meta, "hash": inhoud_hash(tekst, meta)}
+    return bestanden
@@ -0,0 +1,51 @@
+import time
+import argparse
+import statistics
+from collections import Counter
+from sklearn.model_selection import KFold
+from classificatie import BriefClassifier, laad_voorbeelden, LABELS, MIN_ZEKERHEID
+
+
+def kruisvalidatie(teksten, labels, folds):
+    """
+    Traint steeds op een deel van de brieven en voorspelt de rest, zodat elke brief één keer
+    wordt voorspeld door een model dat hem niet kent. Geeft per brief (voorspelling, echte labels, ms).
+    """
+    resultaten = []
+    for train, test in KFold(n_splits=folds, shuffle=True, random_state=0).split(teksten):
+        classifier = BriefClassifier().train([teksten[i] for i in train], [labels[i] for i in train])
+        for i in test:
+            start = time.perf_counter()
+            voorspelling = classifier.voorspel(teksten[i])
+            resultaten.append((voorspelling, labels[i], (time.perf_counter() - start) * 1000))
+    return resultaten
+
+
+# --- Start het Script ---
+# Meet de nauwkeurigheid en snelheid met: python evalueer_classificatie.py
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evalueer de lokale classifier (afzender, soort brief, actie).")
+    parser.add_argument("--folds", type=int, default=5, help="Aantal folds voor de kruisvalidatie.")
+    parser.add_argument("--zekerheid", type=float, default=MIN_ZEKERHEID, help="Drempel waarboven de app een voorspelling gebruikt.")
+    args = parser.parse_args()
+
+    teksten, labels = laad_voorbeelden()
+    print(f"{len(teksten)} gelabelde brieven. Verdeling acties: {dict(Counter(l['actie'] for l in labels))}")
+
+    start = time.perf_counter()
+    BriefClassifier().train(teksten, labels)
+    print(f"Trainen op het hele corpus: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    resultaten = kruisvalidatie(teksten, labels, args.folds)
+    print(f"\nNauwkeurigheid ({args.folds}-voudige kruisvalidatie):")
+    for label in LABELS:
+        goed = [voorspelling[label][0] == echt[label] for voorspelling, echt, _ in resultaten]
+        zeker = [g for g, (voorspelling, _, _) in zip(goed, resultaten) if voorspelling[label][1] >= args.zekerheid]
+        meest_voorkomend = Counter(l[label] for l in labels).most_common(1)[0][1] / len(labels)
+        regel = f"  {label:<15} {sum(goed) / len(goed):>6.1%}   (meest voorkomende kiezen: {meest_voorkomend:.1%})"
+        if zeker:
+            regel += f"   zekerheid >= {args.zekerheid}: {sum(zeker) / len(zeker):.1%} goed bij {len(zeker) / len(goed):.0%} van de brieven"
+        print(regel)
+
+    tijden = [ms for _, _, ms in resultaten]
+    print(f"\nVoorspellen per brief: p50 {statistics.median(tijden):.2f} ms, max {max(tijden):.2f} ms")
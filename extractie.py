@@ -0,0 +1,121 @@
+import re
+from datetime import date
+
+# --- Configuratie ---
+MAANDEN = {
+    "januari": 1, "februari": 2, "maart": 3, "april": 4, "mei": 5, "juni": 6, "juli": 7,
+    "augustus": 8, "september": 9, "oktober": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mrt": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8, "sep": 9, "sept": 9, "okt": 10, "nov": 11, "dec": 12,
+}
+# Labels waar een kenmerk achter staat, met de naam waaronder we het teruggeven.
+KENMERK_LABELS = {
+    "cjib-nummer": "CJIB-nummer", "betalingskenmerk": "Betalingskenmerk", "v-nummer": "V-nummer",
+    "ind-nummer": "IND-nummer", "ons kenmerk": "Kenmerk", "uw kenmerk": "Kenmerk", "kenmerk": "Kenmerk",
+    "dossiernummer": "Dossiernummer", "zaaknummer": "Zaaknummer", "factuurnummer": "Factuurnummer",
+    "klantnummer": "Klantnummer", "referentienummer": "Referentie", "referentie": "Referentie",
+}
+# Welk kenmerk het beste in het schrijfformulier past als er meerdere in de brief staan.
+KENMERK_VOORKEUR = ["CJIB-nummer", "Betalingskenmerk", "V-nummer", "IND-nummer", "Kenmerk", "Dossiernummer", "Zaaknummer", "Factuurnummer", "Referentie", "Klantnummer"]
+
+_MAAND = "|".join(sorted(MAANDEN, key=len, reverse=True))
+_LABEL = "|".join(re.escape(label) for label in sorted(KENMERK_LABELS, key=len, reverse=True))
+
+# Eén patroon met een groep per soort gegeven: de tekst wordt maar één keer doorlopen,
+# hoeveel soorten we ook zoeken. Volgorde telt: bij een overlap wint het eerste alternatief.
+PATROON = re.compile(rf"""
+    (?P<iban>\b[A-Z]{{2}}\d{{2}}[ ]?[A-Z]{{4}}(?:[ ]?\d{{2,4}}){{3,5}}\b)
+  | (?P<kenmerk>\b(?P<label>{_LABEL})\b[ ]*[:.]?[ ]*(?:(?:is|luidt)[ ]*:?[ ]+)?
+        (?P<nummer>(?=[\w./-]*\d)[A-Z0-9][\w./-]*(?:[ ]\d{{4}}){{0,3}}))
+  | (?P<bedrag>(?:€|\bEUR\b)[ ]?(?P<euro>\d{{1,3}}(?:\.\d{{3}})+|\d+)(?:,(?P<cent>\d{{2}}|-{{1,2}}))?
+        | \b(?P<euro2>\d{{1,3}}(?:\.\d{{3}})+|\d+),(?P<cent2>\d{{2}})[ ]?euro\b)
+  | (?P<datum_tekst>\b(?P<dag>\d{{1,2}})[ ](?P<maand>{_MAAND})\.?[ ](?P<jaar>\d{{4}})\b)
+  | (?P<datum_cijfers>\b(?P<dag2>\d{{1,2}})[-/.](?P<maand2>\d{{1,2}})[-/.](?P<jaar2>\d{{4}}|\d{{2}})\b)
+""", re.IGNORECASE | re.VERBOSE)
+SOORTEN = ("iban", "kenmerk", "bedrag", "datum_tekst", "datum_cijfers")
+
+
+def iban_geldig(iban):
+    """Controleert het IBAN met de mod-97-proef, zodat gewone getallenreeksen niet meetellen."""
+    iban = iban.replace(" ", "").upper()
+    omgezet = "".join(str(int(teken, 36)) for teken in iban[4:] + iban[:4])
+    return len(iban) >= 15 and int(omgezet) % 97 == 1
+
+
+def maak_datum(jaar, maand, dag):
+    """Een datetime.date, of None als de combinatie niet bestaat (bv. 31-02)."""
+    jaar = int(jaar)
+    if jaar < 100:
+        jaar += 2000
+    try:
+        return date(jaar, int(maand), int(dag))
+    except ValueError:
+        return None
+
+
+def extraheer(tekst):
+    """
+    Haalt bedragen, data, kenmerken (CJIB-, V-, IND-, dossier- en zaaknummers, ...) en IBAN's
+    uit de brief. Geeft per soort een lijst van dicts met 'tekst' (zoals in de brief),
+    'waarde' (genormaliseerd) en 'positie', in de volgorde van de brief.
+    """
+    gevonden = {"bedragen": [], "data": [], "kenmerken": [], "ibans": []}
+    for match in PATROON.finditer(tekst):
+        # match.lastgroup is bij geneste groepen de binnenste; zoek dus de buitenste groep op.
+        soort = next(soort for soort in SOORTEN if match.group(soort))
+        item = {"tekst": match.group(soort).strip(), "positie": match.start()}
+        if soort == "iban":
+            if not iban_geldig(item["tekst"]):
+                continue
+            item["waarde"] = item["tekst"].replace(" ", "").upper()
+            gevonden["ibans"].append(item)
+        elif soort == "kenmerk":
+            item["soort"] = KENMERK_LABELS[match.group("label").lower()]
+            item["waarde"] = match.group("nummer").rstrip("./-")
+            gevonden["kenmerken"].append(item)
+        elif soort == "bedrag":
+            euro = (match.group("euro") or match.group("euro2")).replace(".", "")
+            cent = match.group("cent") or match.group("cent2") or "00"
+            item["waarde"] = float(f"{euro}.{cent if cent.isdigit() else '00'}")
+            gevonden["bedragen"].append(item)
+        else:
+            if soort == "datum_tekst":
+                datum = maak_datum(match.group("jaar"), MAANDEN[match.group("maand").lower()], match.group("dag"))
+            else:
+                datum = maak_datum(match.group("jaar2"), match.group("maand2"), match.group("dag2"))
+            if datum is None:
+                continue
+            item["waarde"] = datum
+            gevonden["data"].append(item)
+    return gevonden
+
+
+def extraheer_batch(teksten):
+    """extraheer() voor een hele reeks brieven (het patroon is al gecompileerd en wordt gedeeld)."""
+    return [extraheer(tekst) for tekst in teksten]
+
+
+def beste_kenmerk(gevonden):
+    """Het kenmerk dat het meest voor de hand ligt voor het schrijfformulier (zie KENMERK_VOORKEUR)."""
+    kenmerken = gevonden["kenmerken"]
+    if not kenmerken:
+        return None
+    return min(kenmerken, key=lambda k: (KENMERK_VOORKEUR.index(k["soort"]), k["positie"]))["waarde"]
+
+
+def formatteer_bedrag(waarde):
+    """12345.5 -> '€ 12.345,50'."""
+    return "€ " + f"{waarde:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def gegevens_voor_prompt(gevonden):
+    """De gevonden gegevens als korte lijst voor in PROMPT_UITLEG."""
+    regels = []
+    if gevonden["bedragen"]:
+        regels.append("Bedragen: " + ", ".join(dict.fromkeys(formatteer_bedrag(b["waarde"]) for b in gevonden["bedragen"])))
+    if gevonden["data"]:
+        regels.append("Data: " + ", ".join(dict.fromkeys(d["waarde"].strftime("%d-%m-%Y") for d in gevonden["data"])))
+    for kenmerk in gevonden["kenmerken"]:
+        regels.append(f"{kenmerk['soort']}: {kenmerk['waarde']}")
+    if gevonden["ibans"]:
+        regels.append("IBAN: " + ", ".join(dict.fromkeys(i["waarde"] for i in gevonden["ibans"])))
+    return "\n".join(dict.fromkeys(regels)) or "Geen gegevens gevonden."
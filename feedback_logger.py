@@ -0,0 +1,247 @@
+import os
+import json
+import time
+import queue
+import argparse
+import statistics
+import threading
+
+# --- Configuratie ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SPOOL_PATH = os.path.join(SCRIPT_DIR, "feedback_spool.jsonl")
+MAX_WACHTRIJ = 1000  # Is de wachtrij vol, dan gaat de feedback direct naar de spool
+BATCH_GROOTTE = 50
+FLUSH_INTERVAL = 2.0  # Seconden: zo lang wachten we hooguit om een batch vol te krijgen
+REPLAY_INTERVAL = 30.0  # Seconden tussen twee pogingen om de spool opnieuw te versturen
+
+
+# --- Backends ---
+class SupabaseBackend:
+    """Schrijft naar een Supabase-tabel. De client wordt pas bij de eerste batch gemaakt (in de schrijf-thread)."""
+
+    def __init__(self, url, key, tabel="logs"):
+        self.url = url
+        self.key = key
+        self.tabel = tabel
+        self._client = None
+
+    def insert(self, rijen):
+        if self._client is None:
+            from supabase import create_client
+            self._client = create_client(self.url, self.key)
+        self._client.table(self.tabel).insert(rijen).execute()
+
+
+class LokaleBackend:
+    """
+    Vervanger van Supabase voor tests en benchmarks: bewaart de rijen in het geheugen.
+    Met 'beschikbaar' en 'vertraging' zijn een storing en een traag netwerk na te bootsen.
+    """
+
+    def __init__(self, vertraging=0.0):
+        self.rijen = []
+        self.beschikbaar = True
+        self.vertraging = vertraging
+
+    def insert(self, rijen):
+        time.sleep(self.vertraging)
+        if not self.beschikbaar:
+            raise ConnectionError("Backend niet bereikbaar")
+        self.rijen.extend(rijen)
+
+
+# --- Spool ---
+class Spool:
+    """
+    JSONL-bestand met feedback die (nog) niet verstuurd kon worden. Toevoegen gebeurt met fsync,
+    herschrijven atomair (tijdelijk bestand + os.replace), net als het journal van genereer_samenvattingen.
+    """
+
+    def __init__(self, pad=SPOOL_PATH):
+        self.pad = pad
+        self._lock = threading.RLock()  # Reentrant: verwijder_eerste leest en herschrijft onder één lock
+
+    def voeg_toe(self, rijen):
+        with self._lock, open(self.pad, 'a', encoding='utf-8') as f:
+            for rij in rijen:
+                f.write(json.dumps(rij, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def lees(self):
+        """Alle rijen in de spool; een half geschreven regel (na een crash) wordt overgeslagen."""
+        rijen = []
+        with self._lock:
+            if not os.path.exists(self.pad):
+                return rijen
+            with open(self.pad, 'r', encoding='utf-8') as f:
+                for regel in f:
+                    try:
+                        rijen.append(json.loads(regel))
+                    except json.JSONDecodeError:
+                        print(f"WAARSCHUWING: Onleesbare regel in '{self.pad}' overgeslagen.")
+        return rijen
+
+    def verwijder_eerste(self, aantal):
+        """Haalt de eerste 'aantal' rijen weg (die zijn alsnog verstuurd)."""
+        with self._lock:
+            rest = self.lees()[aantal:]
+            if not rest:
+                if os.path.exists(self.pad):
+                    os.remove(self.pad)
+                return
+            tmp_pad = self.pad + ".tmp"
+            with open(tmp_pad, 'w', encoding='utf-8') as f:
+                for rij in rest:
+                    f.write(json.dumps(rij, ensure_ascii=False) + "\n")
+            os.replace(tmp_pad, self.pad)
+
+    def __len__(self):
+        with self._lock:
+            if not os.path.exists(self.pad):
+                return 0
+            with open(self.pad, 'rb') as f:
+                return sum(1 for _ in f)
+
+
+# --- Schrijver op de achtergrond ---
+class FeedbackLogger:
+    """
+    Verstuurt feedback vanuit een achtergrond-thread in batches, zodat de knop in de UI nooit
+    op het netwerk hoeft te wachten. Lukt versturen niet, dan gaat de batch naar de spool;
+    die wordt later opnieuw verstuurd.
+    """
+
+    def __init__(self, backend, spool=None, batch_grootte=BATCH_GROOTTE, flush_interval=FLUSH_INTERVAL,
+                 replay_interval=REPLAY_INTERVAL, max_wachtrij=MAX_WACHTRIJ):
+        self.backend = backend
+        self.spool = spool if spool is not None else Spool()  # Niet 'spool or': een lege spool is False (__len__)
+        self.batch_grootte = batch_grootte
+        self.flush_interval = flush_interval
+        self.replay_interval = replay_interval
+        self.wachtrij = queue.Queue(maxsize=max_wachtrij)
+        self.flush_tijden = []  # Duur van de laatste flushes in ms
+        self.teller = {"verstuurd": 0, "gespoold": 0, "opnieuw_verstuurd": 0, "fouten": 0}
+        self._teller_lock = threading.Lock()  # log() draait in de script-thread, de rest in de achtergrond-thread
+        self._volgende_replay = 0.0
+        self._storing = False  # Na een fout gaat alles naar de spool tot een replay weer lukt
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="feedback-logger", daemon=True)
+        self._thread.start()
+
+    def log(self, rij):
+        """Zet de rij in de wachtrij en komt meteen terug. Is de wachtrij vol, dan gaat hij direct naar de spool."""
+        try:
+            self.wachtrij.put_nowait(rij)
+        except queue.Full:
+            self.spool.voeg_toe([rij])
+            self._tel("gespoold")
+
+    def _tel(self, soort, aantal=1):
+        with self._teller_lock:
+            self.teller[soort] += aantal
+
+    def _pak_batch(self):
+        """Wacht op de eerste rij en pakt er dan zoveel bij als er binnen flush_interval komen."""
+        try:
+            batch = [self.wachtrij.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_grootte:
+            try:
+                batch.append(self.wachtrij.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _verstuur(self, batch):
+        start = time.perf_counter()
+        try:
+            self.backend.insert(batch)
+            return True
+        except Exception as e:
+            print(f"Fout bij het versturen van {len(batch)} feedbackregels: {e}")
+            self._tel("fouten")
+            return False
+        finally:
+            self.flush_tijden = (self.flush_tijden + [(time.perf_counter() - start) * 1000])[-100:]
+
+    def _replay(self):
+        """Verstuurt de spool opnieuw, batch voor batch; stopt bij de eerste fout."""
+        rijen = self.spool.lees()
+        for begin in range(0, len(rijen), self.batch_grootte):
+            batch = rijen[begin:begin + self.batch_grootte]
+            if not self._verstuur(batch):
+                return False
+            self.spool.verwijder_eerste(len(batch))
+            self._tel("opnieuw_verstuurd", len(batch))
+        return True
+
+    def _loop(self):
+        while not (self._stop.is_set() and self.wachtrij.empty()):
+            batch = self._pak_batch()
+            if batch and not self._storing and self._verstuur(batch):
+                self._tel("verstuurd", len(batch))
+            elif batch:
+                # Tijdens een storing niet bij elke batch op een timeout wachten: direct naar de spool.
+                self.spool.voeg_toe(batch)
+                self._tel("gespoold", len(batch))
+                if not self._storing:
+                    self._storing = True
+                    self._volgende_replay = time.monotonic() + self.replay_interval
+            if time.monotonic() >= self._volgende_replay:
+                self._volgende_replay = time.monotonic() + self.replay_interval
+                if len(self.spool):
+                    self._storing = not self._replay()
+
+    def stop(self, timeout=10.0):
+        """Verstuurt wat nog in de wachtrij staat en stopt de thread."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Wachtrij, spool en flush-latentie, voor het debugpaneel en de logs."""
+        tijden = self.flush_tijden
+        with self._teller_lock:
+            teller = dict(self.teller)
+        return {
+            "wachtrij": self.wachtrij.qsize(),
+            "spool": len(self.spool),
+            **teller,
+            "flush_ms_p50": round(statistics.median(tijden), 1) if tijden else None,
+            "flush_ms_max": round(max(tijden), 1) if tijden else None,
+        }
+
+
+# --- Start het Script ---
+# Simuleer een storing met de lokale backend: python feedback_logger.py
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de feedback-logger met een nagebootste storing.")
+    parser.add_argument("--aantal", type=int, default=200, help="Aantal feedbackregels.")
+    parser.add_argument("--vertraging", type=float, default=0.2, help="Seconden per insert (traag netwerk).")
+    args = parser.parse_args()
+
+    import tempfile
+    backend = LokaleBackend(vertraging=args.vertraging)
+    spool = Spool(os.path.join(tempfile.mkdtemp(), "spool.jsonl"))
+    logger = FeedbackLogger(backend, spool, flush_interval=0.2, replay_interval=0.5)
+
+    duur = 0.0
+    for deel in range(2):
+        start = time.perf_counter()
+        for i in range(args.aantal // 2):
+            logger.log({"session_id": f"test-{deel}-{i}", "feedback_score": i % 2})
+        duur += time.perf_counter() - start
+        time.sleep(1.0)
+        if deel == 0:
+            print(f"Backend bereikbaar: {logger.stats()}")
+            backend.beschikbaar = False  # Halverwege valt de backend uit
+    print(f"Tijdens de storing: {logger.stats()}")
+    print(f"{args.aantal} keer log() in {duur * 1000:.1f} ms (de UI wacht nergens op)")
+
+    backend.beschikbaar = True
+    time.sleep(2.0)
+    logger.stop()
+    print(f"Na herstel:         {logger.stats()}")
+    print(f"In de backend: {len(backend.rijen)} van {args.aantal} rijen")
@@ -1,15 +1,27 @@
 import pandas as pd
 import os
 import time
+import random
+import asyncio
+import argparse
+import json
+import hashlib
 from langchain_groq import ChatGroq
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
+from tekst_opschonen import schoon_op, TEKST_OPSCHONEN
+from brief_cache import SchijfCache, llm_sleutel, ANTWOORD_CACHE_PATH, ANTWOORD_CACHE_OVERSLAAN
 
 # --- Configuratie ---
 # Deze instellingen zorgen ervoor dat het script de juiste bestanden en mappen vindt.
 DATA_DIR = "Data"
 METADATA_FILE = "metadata.csv"
+JOURNAL_FILE = "samenvattingen_journal.jsonl"  # Checkpoint: elke gemaakte samenvatting wordt hier direct bewaard
 LLM_MODEL = "llama3-8b-8192"  # We gebruiken het snelle 8b model, perfect voor deze taak
+MAX_GELIJKTIJDIG = 4  # Hoeveel brieven er tegelijk naar de API gaan
+MAX_VERZOEKEN_PER_MINUUT = 30  # Limiet van de Groq API voor dit model
+MAX_POGINGEN = 6  # Hoe vaak we het opnieuw proberen bij een 429 (te veel verzoeken)
+MAX_WACHTTIJD = 60  # Nooit langer dan dit (in seconden) wachten, ook niet als de API om meer vraagt
 
 # --- Voorbereiding: Laad de API Key ---
 # Dit laadt de variabelen uit je .env bestand.
@@ -22,7 +34,8 @@ if not groq_api_key:
 
 # --- Initialiseer de LLM ---
 # We maken één keer verbinding met de Groq AI service.
-llm = ChatGroq(model_name=LLM_MODEL, groq_api_key=groq_api_key)
+# De retries doen we zelf (met backoff), dus de client zelf probeert het niet opnieuw.
+llm = ChatGroq(model_name=LLM_MODEL, groq_api_key=groq_api_key, max_retries=0)
 
 # --- De Prompt voor de Samenvatting ---
 # Dit is de precieze instructie die we aan de AI geven voor elke brief.
@@ -39,9 +52,192 @@ A2-SAMENVATTING:
 """
 prompt = PromptTemplate.from_template(prompt_template_str)
 
+# Verandert de prompt, het model of het opschonen van de brief, dan verandert de versie en worden de samenvattingen opnieuw gemaakt.
+PROMPT_VERSIE = hashlib.sha256(f"{LLM_MODEL}\n{prompt_template_str}\nopschonen={TEKST_OPSCHONEN}".encode('utf-8')).hexdigest()[:12]
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """
+    Laat gemiddeld niet meer dan 'per_minuut' verzoeken per minuut door,
+    met korte pieken tot 'capaciteit' verzoeken tegelijk.
+    """
+
+    def __init__(self, per_minuut, capaciteit):
+        self.snelheid = per_minuut / 60.0
+        self.capaciteit = capaciteit
+        self.tokens = capaciteit
+        self.laatst = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def neem(self):
+        async with self._lock:
+            while True:
+                nu = time.monotonic()
+                self.tokens = min(self.capaciteit, self.tokens + (nu - self.laatst) * self.snelheid)
+                self.laatst = nu
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.snelheid)
+
+
+def is_rate_limit(fout):
+    """
+    Herkent een 429-fout van de API aan de HTTP-status, op de fout zelf of op zijn response.
+    Niet aan de tekst: '429' kan ook gewoon in een bestandsnaam of bedrag staan.
+    """
+    response = getattr(fout, "response", None)
+    return getattr(fout, "status_code", None) == 429 or getattr(response, "status_code", None) == 429
+
+
+def wachttijd(fout, poging):
+    """Exponentiële backoff met wat willekeur; de 'retry-after' header van de API gaat voor (tot MAX_WACHTTIJD)."""
+    response = getattr(fout, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(MAX_WACHTTIJD, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(MAX_WACHTTIJD, 2 ** poging) + random.uniform(0, 1)
+
+
+def lees_brief(filepath, bestandsnaam):
+    """Leest een brief in, eerst als UTF-8 en anders als Windows-encoding."""
+    content = None
+    # Poging 1: Probeer het bestand te openen met de standaard UTF-8 encoding.
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except UnicodeDecodeError:
+        # Poging 2: Als UTF-8 mislukt, probeer dan een veelvoorkomende Windows-encoding.
+        print(f"INFO: UTF-8 mislukt voor {bestandsnaam}, probeer 'cp1252'...")
+        with open(filepath, 'r', encoding='cp1252') as f:
+            content = f.read()
+
+    if content is None:
+        raise ValueError("Kon het bestand niet lezen met de geprobeerde encodings.")
+    return content
+
+
+def tel_tokens(summary_obj, content, summary):
+    """Aantal tokens volgens de API; valt terug op een schatting (±4 tekens per token)."""
+    usage = (getattr(summary_obj, "response_metadata", None) or {}).get("token_usage") or {}
+    if usage.get("total_tokens"):
+        return usage["total_tokens"]
+    return (len(prompt_template_str) + len(content) + len(summary)) // 4
+
+
+# --- Checkpoint journal ---
+def inhoud_hash(content):
+    """Hash van de brieftekst, zodat we zien of een brief veranderd is."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def laad_journal(journal_file=JOURNAL_FILE):
+    """
+    Leest het journal in. Per bestandsnaam telt de laatste regel.
+    Een half geschreven laatste regel (na een crash) wordt overgeslagen.
+    """
+    journal = {}
+    if not os.path.exists(journal_file):
+        return journal
+    with open(journal_file, 'r', encoding='utf-8') as f:
+        for regel in f:
+            try:
+                record = json.loads(regel)
+            except json.JSONDecodeError:
+                print(f"WAARSCHUWING: Onleesbare regel in '{journal_file}' overgeslagen.")
+                continue
+            journal[record['bestandsnaam']] = record
+    return journal
+
+
+def schrijf_journal_regel(journal_fp, record):
+    """Voegt één regel toe en zorgt dat hij echt op schijf staat voordat we verder gaan."""
+    journal_fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+    journal_fp.flush()
+    os.fsync(journal_fp.fileno())
+
+
+def schrijf_atomair(pad, schrijf):
+    """Schrijft eerst naar een tijdelijk bestand en hernoemt dat daarna; zo is het bestand nooit half."""
+    tmp_pad = pad + ".tmp"
+    schrijf(tmp_pad)
+    os.replace(tmp_pad, pad)
+
+
+def comprimeer_journal(journal, journal_file=JOURNAL_FILE):
+    """Herschrijft het journal met alleen de laatste regel per brief."""
+    def schrijf(tmp_pad):
+        with open(tmp_pad, 'w', encoding='utf-8') as f:
+            for record in journal.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    schrijf_atomair(journal_file, schrijf)
+
+
+# --- Eén brief samenvatten ---
+async def vat_brief_samen(chain, bestandsnaam, content, semafoor, bucket, cache):
+    """
+    Vat één brief samen, met een limiet op het aantal gelijktijdige verzoeken en backoff bij een 429.
+    Staat de samenvatting al in de antwoordcache (dezelfde als die van de app), dan kost hij geen call.
+    """
+    if TEKST_OPSCHONEN:
+        content = schoon_op(content)  # Zelfde opschoning als in de app: minder tokens per brief
+    sleutel = llm_sleutel(prompt_template_str, LLM_MODEL, {"brieftekst": content})
+    summary = cache.get(sleutel)
+    if summary is not None:
+        return summary, 0
+    async with semafoor:
+        for poging in range(MAX_POGINGEN):
+            await bucket.neem()
+            try:
+                summary_obj = await chain.ainvoke({"brieftekst": content})
+                summary = summary_obj.content.strip()  # .content is nodig voor Chat-modellen
+                cache.set(sleutel, summary)
+                return summary, tel_tokens(summary_obj, content, summary)
+            except Exception as e:
+                if not is_rate_limit(e) or poging == MAX_POGINGEN - 1:
+                    raise
+                wacht = wachttijd(e, poging)
+                print(f"INFO: Te veel verzoeken voor {bestandsnaam}, nieuwe poging over {wacht:.1f}s...")
+                await asyncio.sleep(wacht)
+
+
+async def verwerk_brieven(taken, max_gelijktijdig, per_minuut, journal_fp, cache):
+    """
+    Verwerkt alle brieven tegelijk (binnen de limieten) en geeft per index het resultaat terug.
+    Elke samenvatting gaat meteen naar het journal, zodat een crash niets kost.
+    """
+    # Creëer de 'keten' van taken: stop de brieftekst in de prompt, en stuur naar de AI.
+    chain = prompt | llm
+    semafoor = asyncio.Semaphore(max_gelijktijdig)
+    bucket = TokenBucket(per_minuut, capaciteit=max_gelijktijdig)
+    resultaten = {}
+
+    async def verwerk(index, bestandsnaam, content):
+        try:
+            summary, tokens = await vat_brief_samen(chain, bestandsnaam, content, semafoor, bucket, cache)
+            schrijf_journal_regel(journal_fp, {
+                "bestandsnaam": bestandsnaam,
+                "inhoud_hash": inhoud_hash(content),
+                "prompt_versie": PROMPT_VERSIE,
+                "a2_samenvatting": summary,
+            })
+            resultaten[index] = (summary, tokens)
+            print(f"({len(resultaten)}/{len(taken)}) Samenvatting gemaakt voor: {bestandsnaam}")
+        except Exception as e:
+            # Eén brief die fout gaat, stopt de rest niet.
+            print(f"FOUT bij het verwerken van {bestandsnaam}: {e}")
+
+    await asyncio.gather(*(verwerk(index, naam, content) for index, naam, content in taken))
+    return resultaten
+
 
 # --- Hoofdfunctie ---
-def genereer_samenvattingen():
+def genereer_samenvattingen(max_gelijktijdig=MAX_GELIJKTIJDIG, per_minuut=MAX_VERZOEKEN_PER_MINUUT, cache_overslaan=ANTWOORD_CACHE_OVERSLAAN):
     """
     Leest de metadata.csv, genereert voor elke lege samenvatting een nieuwe,
     en slaat het complete bestand weer op.
@@ -55,58 +251,75 @@ def genereer_samenvattingen():
     # We maken een kopie om veilig aanpassingen te doen tijdens het doorlopen van de lijst.
     df_to_update = df.copy()
 
-    # Loop door elke rij in het metadata bestand.
-    for index, row in df.iterrows():
-        # Sla over als er al een samenvatting is (en het is geen lege placeholder).
-        if pd.notna(row['a2_samenvatting']) and row['a2_samenvatting'] != '[leeg]':
-            print(f"Skipping {row['bestandsnaam']} (heeft al een samenvatting).")
-            continue
+    # Samenvattingen uit een eerdere (misschien afgebroken) run.
+    journal = laad_journal()
 
+    # Verzamel eerst alle brieven die nog een samenvatting nodig hebben.
+    taken = []
+    hervat = 0
+    for index, row in df.iterrows():
         filepath = os.path.join(DATA_DIR, row['bestandsnaam'])
-        
-        # Dit blok vangt alle mogelijke fouten voor één specifiek bestand op,
-        # zodat het script niet stopt als er één bestand problemen geeft.
         try:
-            content = None
-            # Poging 1: Probeer het bestand te openen met de standaard UTF-8 encoding.
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except UnicodeDecodeError:
-                # Poging 2: Als UTF-8 mislukt, probeer dan een veelvoorkomende Windows-encoding.
-                print(f"INFO: UTF-8 mislukt voor {row['bestandsnaam']}, probeer 'cp1252'...")
-                with open(filepath, 'r', encoding='cp1252') as f:
-                    content = f.read()
-
-            if content is None:
-                raise ValueError("Kon het bestand niet lezen met de geprobeerde encodings.")
-
-            # Creëer de 'keten' van taken: stop de brieftekst in de prompt, en stuur naar de AI.
-            chain = prompt | llm
-            
-            # Voer de taak uit.
-            summary_obj = chain.invoke({"brieftekst": content})
-            summary = summary_obj.content.strip()  # .content is nodig voor Chat-modellen
-            
-            # Sla de gegenereerde samenvatting op in onze data.
-            df_to_update.loc[index, 'a2_samenvatting'] = summary
-            print(f"({index + 1}/{len(df)}) Samenvatting gemaakt voor: {row['bestandsnaam']}")
-            
-            # Wacht een klein moment om de API niet te overbelasten.
-            time.sleep(0.5)
-            
+            content = lees_brief(filepath, row['bestandsnaam'])
         except FileNotFoundError:
             print(f"WAARSCHUWING: Bestand niet gevonden: {filepath}. Wordt overgeslagen.")
+            continue
         except Exception as e:
             print(f"FOUT bij het verwerken van {row['bestandsnaam']}: {e}")
+            continue
+
+        record = journal.get(row['bestandsnaam'])
+        if record:
+            # Staat hij in het journal met dezelfde tekst en prompt, dan is hij al klaar.
+            if record['inhoud_hash'] == inhoud_hash(content) and record['prompt_versie'] == PROMPT_VERSIE:
+                df_to_update.loc[index, 'a2_samenvatting'] = record['a2_samenvatting']
+                hervat += 1
+                continue
+        # Sla over als er al een samenvatting is (en het is geen lege placeholder).
+        elif pd.notna(row['a2_samenvatting']) and row['a2_samenvatting'] != '[leeg]':
+            print(f"Skipping {row['bestandsnaam']} (heeft al een samenvatting).")
+            continue
+
+        taken.append((index, row['bestandsnaam'], content))
+
+    if hervat:
+        print(f"{hervat} samenvattingen overgenomen uit '{JOURNAL_FILE}'.")
+
+    # Stuur ze daarna tegelijk naar de AI, binnen de limieten van de API.
+    cache = SchijfCache(ANTWOORD_CACHE_PATH, overslaan=cache_overslaan)
+    start = time.perf_counter()
+    try:
+        with open(JOURNAL_FILE, 'a', encoding='utf-8') as journal_fp:
+            resultaten = asyncio.run(verwerk_brieven(taken, max_gelijktijdig, per_minuut, journal_fp, cache)) if taken else {}
+    except KeyboardInterrupt:
+        print(f"\nOnderbroken. De gemaakte samenvattingen staan in '{JOURNAL_FILE}'; start het script opnieuw om verder te gaan.")
+        return
+    duur = time.perf_counter() - start
 
-    # Sla het volledig bijgewerkte bestand op.
-    df_to_update.to_csv(METADATA_FILE, index=False, encoding='utf-8')
+    # Sla de gegenereerde samenvattingen op in onze data.
+    for index, (summary, _) in resultaten.items():
+        df_to_update.loc[index, 'a2_samenvatting'] = summary
+
+    # Sla het volledig bijgewerkte bestand op (atomair), en ruim daarna het journal op.
+    schrijf_atomair(METADATA_FILE, lambda tmp_pad: df_to_update.to_csv(tmp_pad, index=False, encoding='utf-8'))
+    comprimeer_journal(laad_journal())
     print(f"\nAlle samenvattingen zijn gegenereerd en opgeslagen in '{METADATA_FILE}'!")
 
+    if taken:
+        print(f"Antwoordcache: {cache.stats()}")
+    if resultaten:
+        totaal_tokens = sum(tokens for _, tokens in resultaten.values())
+        print(f"Doorvoer: {len(resultaten)} brieven in {duur:.1f}s "
+              f"({len(resultaten) / duur * 60:.1f} brieven per minuut, {totaal_tokens / duur:.0f} tokens per seconde).")
+
 
 # --- Start het Script ---
 # Deze regel zorgt ervoor dat de functie 'genereer_samenvattingen' wordt uitgevoerd
 # wanneer je 'python genereer_samenvattingen.py' in de terminal typt.
 if __name__ == "__main__":
-    genereer_samenvattingen()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Genereer A2-samenvattingen voor metadata.csv.")
+    parser.add_argument("--gelijktijdig", type=int, default=MAX_GELIJKTIJDIG, help="Aantal brieven tegelijk naar de API.")
+    parser.add_argument("--per-minuut", type=float, default=MAX_VERZOEKEN_PER_MINUUT, help="Maximaal aantal verzoeken per minuut.")
+    parser.add_argument("--geen-cache", action="store_true", help="Vraag alles opnieuw aan het model (de cache wordt wel bijgewerkt).")
+    args = parser.parse_args()
+    genereer_samenvattingen(max_gelijktijdig=args.gelijktijdig, per_minuut=args.per_minuut, cache_overslaan=args.geen_cache or ANTWOORD_CACHE_OVERSLAAN)
@@ -0,0 +1,134 @@
+import re
+
+# --- Configuratie ---
+MAX_BEURTEN_LETTERLIJK = 3  # De laatste N vragen en antwoorden gaan woord voor woord mee
+HISTORY_TOKEN_BUDGET = 600
+BRIEF_TOKEN_BUDGET = 1500
+MAX_TEKENS_PER_PASSAGE = 600  # Net als brief_index: een lange alinea (of een brief zonder lege regels) knippen we verder
+MIN_TOKENS_LAATSTE_BEURT = 100  # De laatste beurt gaat altijd mee, desnoods ingekort tot zoveel tokens
+
+
+def tel_tokens(tekst):
+    """Schatting van het aantal tokens (Llama 3 zit voor Nederlands rond de 4 tekens per token)."""
+    return len(tekst) // 4 + 1
+
+
+def _woorden(tekst):
+    return {w for w in re.findall(r"\w+", tekst.lower()) if len(w) > 2}
+
+
+def _knip_lang_stuk(tekst, max_tekens=MAX_TEKENS_PER_PASSAGE):
+    """Knipt een te lange alinea bij een regelovergang, anders een zinseinde, anders een spatie."""
+    stukken = []
+    while len(tekst) > max_tekens:
+        knip = tekst.rfind("\n", 0, max_tekens)
+        if knip <= 0:
+            knip = max(tekst.rfind(". ", 0, max_tekens), tekst.rfind("? ", 0, max_tekens), tekst.rfind("! ", 0, max_tekens)) + 1
+        if knip <= 0:
+            knip = tekst.rfind(" ", 0, max_tekens)
+        if knip <= 0:
+            knip = max_tekens
+        stukken.append(tekst[:knip].strip())
+        tekst = tekst[knip:].strip()
+    return [stuk for stuk in stukken + [tekst] if stuk]
+
+
+def splits_in_passages(brief_tekst):
+    """Knipt de brief in alinea's (lege regels of paginakoppen ertussen); lange alinea's nog verder."""
+    delen = re.split(r'\n\s*\n|(?=^--- Pagina \d+ van \d+ ---)', brief_tekst, flags=re.MULTILINE)
+    return [stuk for deel in delen if deel and deel.strip() for stuk in _knip_lang_stuk(deel.strip())]
+
+
+def relevante_passages(brief_tekst, vraag, budget=BRIEF_TOKEN_BUDGET):
+    """
+    Geeft alleen de stukken van de brief die het meest met de vraag te maken hebben,
+    binnen het tokenbudget en in de volgorde van de brief. Past de hele brief, dan
+    gaat de hele brief mee. Er gaat altijd iets mee: past zelfs de eerste passage niet,
+    dan het begin daarvan.
+    """
+    if tel_tokens(brief_tekst) <= budget:
+        return brief_tekst
+    passages = splits_in_passages(brief_tekst)
+    vraag_woorden = _woorden(vraag)
+    # De eerste alinea (afzender, kenmerk) is bijna altijd nuttig; die krijgt een kleine voorsprong.
+    scores = [(len(vraag_woorden & _woorden(p)) + (0.5 if i == 0 else 0), i) for i, p in enumerate(passages)]
+    gekozen, gebruikt = [], 0
+    for score, i in sorted(scores, reverse=True):
+        kosten = tel_tokens(passages[i])
+        if gebruikt + kosten > budget:
+            continue
+        gekozen.append(i)
+        gebruikt += kosten
+    if not gekozen:
+        return passages[0][:max(budget - 1, 1) * 4] if passages else ""
+    return "\n...\n".join(passages[i] for i in sorted(gekozen))
+
+
+class GespreksGeheugen:
+    """
+    Houdt het gesprek bij met een vast tokenbudget: de laatste beurten letterlijk,
+    oudere beurten samengevat tot één lopende samenvatting.
+    """
+
+    def __init__(self, max_beurten=MAX_BEURTEN_LETTERLIJK, token_budget=HISTORY_TOKEN_BUDGET):
+        self.max_beurten = max_beurten
+        self.token_budget = token_budget
+        self.samenvatting = ""
+        self.beurten = []  # Lijst van (vraag, antwoord)
+        self.prompt_tokens = []  # Per beurt: hoeveel tokens de prompt ongeveer was
+
+    def voeg_toe(self, vraag, antwoord):
+        self.beurten.append((vraag, antwoord))
+
+    @staticmethod
+    def _beurt_tekst(vraag, antwoord):
+        return f"user: {vraag}\nassistant: {antwoord}"
+
+    def _past(self, beurten):
+        tekst = "\n".join(self._beurt_tekst(v, a) for v, a in beurten)
+        return tel_tokens(tekst) + tel_tokens(self.samenvatting) <= self.token_budget
+
+    def _letterlijk_te_houden(self):
+        """De laatste max_beurten beurten, minus de oudste zolang ze niet in het budget passen (de laatste blijft altijd)."""
+        bewaard = self.beurten[-self.max_beurten:]
+        while len(bewaard) > 1 and not self._past(bewaard):
+            bewaard = bewaard[1:]
+        return bewaard
+
+    def moet_samenvatten(self):
+        return len(self._letterlijk_te_houden()) < len(self.beurten)
+
+    def vouw_op(self, samenvatter):
+        """
+        Vat de beurten die niet meer letterlijk mee hoeven samen met de vorige samenvatting:
+        alles voor de laatste max_beurten, en ook recentere beurten als die niet in het budget passen.
+        'samenvatter' is een functie die (eerdere_samenvatting, nieuwe_tekst) krijgt en tekst teruggeeft.
+        """
+        if not self.moet_samenvatten():
+            return
+        bewaard = self._letterlijk_te_houden()
+        oud, self.beurten = self.beurten[:len(self.beurten) - len(bewaard)], bewaard
+        nieuwe_tekst = "\n".join(self._beurt_tekst(v, a) for v, a in oud)
+        try:
+            self.samenvatting = samenvatter(self.samenvatting, nieuwe_tekst).strip()
+        except Exception as e:
+            # Lukt het samenvatten niet, dan bewaren we de oude beurten letterlijk (ingekort tot
+            # de helft van het budget, zodat de laatste beurt er nog naast past).
+            print(f"Fout bij het samenvatten van het gesprek: {e}")
+            self.samenvatting = (self.samenvatting + "\n" + nieuwe_tekst).strip()[-self.token_budget * 2:]
+
+    def history_tekst(self):
+        """
+        De geschiedenis voor de prompt: eerst de samenvatting, dan de laatste beurten, binnen het budget.
+        Wat niet past is al door vouw_op in de samenvatting gezet; is de laatste beurt in zijn eentje
+        te lang, dan gaat hij ingekort mee.
+        """
+        regels = [self._beurt_tekst(v, a) for v, a in self._letterlijk_te_houden()]
+        if regels and not self._past(self.beurten[-1:]):
+            ruimte = max(self.token_budget - tel_tokens(self.samenvatting), MIN_TOKENS_LAATSTE_BEURT)
+            regels[-1] = regels[-1][:(ruimte - 1) * 4].rstrip() + " ..."
+        delen = []
+        if self.samenvatting:
+            delen.append(f"Samenvatting van het eerdere gesprek: {self.samenvatting}")
+        delen.extend(regels)
+        return "\n".join(delen)
@@ -0,0 +1,130 @@
+import os
+import json
+import pickle
+import faiss
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from corpus import lees_brief, lees_metadata, huidige_bestanden, SCRIPT_DIR, DATA_PATH, METADATA_PATH, METADATA_KOLOMMEN
+
+# --- Configuratie ---
+INDEX_PATH = os.path.join(SCRIPT_DIR, "faiss_index")
+MANIFEST_NAAM = "manifest.json"
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# De brieven zijn kort, maar het embedding-model kijkt maar naar ~256 tokens per stuk.
+text_splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+
+
+# --- Hulpfuncties ---
+def maak_documenten(bestandsnaam, tekst, metadata):
+    """Knipt een brief in stukken en zet de metadata bovenaan elk stuk."""
+    kop = "\n".join(f"{kolom}: {metadata[kolom]}" for kolom in METADATA_KOLOMMEN if kolom != "a2_samenvatting" and metadata.get(kolom))
+    documenten = []
+    for i, stuk in enumerate(text_splitter.split_text(tekst)):
+        documenten.append(Document(
+            page_content=f"{kop}\n\n{stuk}" if kop else stuk,
+            metadata={"bestandsnaam": bestandsnaam, "chunk": i, **metadata},
+        ))
+    # De A2-samenvatting is zelf ook een goed doorzoekbaar stuk tekst.
+    if metadata.get("a2_samenvatting"):
+        documenten.append(Document(
+            page_content=f"{kop}\n\n{metadata['a2_samenvatting']}",
+            metadata={"bestandsnaam": bestandsnaam, "chunk": "samenvatting", **metadata},
+        ))
+    return documenten
+
+
+def lees_manifest(index_path=INDEX_PATH):
+    """Leest welke bestanden (met welke hash en ids) al in de index zitten."""
+    pad = os.path.join(index_path, MANIFEST_NAAM)
+    if not os.path.exists(pad):
+        return {}
+    with open(pad, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def schrijf_manifest(manifest, index_path=INDEX_PATH):
+    """Schrijft het manifest atomair weg, zodat een halve schrijfactie nooit achterblijft."""
+    pad = os.path.join(index_path, MANIFEST_NAAM)
+    tmp_pad = pad + ".tmp"
+    with open(tmp_pad, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_pad, pad)
+
+
+# --- Opbouwen en laden ---
+def bouw_kennisbank(embeddings, data_path=DATA_PATH, metadata_path=METADATA_PATH, index_path=INDEX_PATH):
+    """
+    Werkt de FAISS-index op schijf bij. Alleen brieven waarvan de hash is veranderd
+    (of die nieuw/verwijderd zijn) worden opnieuw ge-embed.
+    Geeft terug hoeveel bestanden er zijn toegevoegd, vernieuwd en verwijderd.
+    """
+    os.makedirs(index_path, exist_ok=True)
+    manifest = lees_manifest(index_path)
+    bestanden = huidige_bestanden(data_path, metadata_path)
+    index_bestaat = os.path.exists(os.path.join(index_path, "index.faiss"))
+    if not index_bestaat:
+        manifest = {}
+
+    gewijzigd = [naam for naam, info in bestanden.items() if manifest.get(naam, {}).get("hash") != info["hash"]]
+    verwijderd = [naam for naam in manifest if naam not in bestanden]
+    stats = {"nieuw": sum(1 for n in gewijzigd if n not in manifest), "vernieuwd": sum(1 for n in gewijzigd if n in manifest), "verwijderd": len(verwijderd)}
+    if not gewijzigd and not verwijderd:
+        return stats
+
+    vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True) if index_bestaat else None
+
+    # Haal eerst de oude stukken weg van brieven die veranderd of verdwenen zijn.
+    oude_ids = [doc_id for naam in gewijzigd + verwijderd for doc_id in manifest.get(naam, {}).get("ids", [])]
+    if vectorstore is not None and oude_ids:
+        vectorstore.delete(oude_ids)
+    for naam in verwijderd:
+        del manifest[naam]
+
+    # Embed alleen de gewijzigde brieven opnieuw.
+    documenten, ids = [], []
+    for naam in gewijzigd:
+        docs = maak_documenten(naam, bestanden[naam]["tekst"], bestanden[naam]["metadata"])
+        doc_ids = [f"{naam}::{doc.metadata['chunk']}" for doc in docs]
+        documenten.extend(docs)
+        ids.extend(doc_ids)
+        manifest[naam] = {"hash": bestanden[naam]["hash"], "ids": doc_ids}
+
+    if documenten:
+        if vectorstore is None:
+            vectorstore = FAISS.from_documents(documenten, embeddings, ids=ids)
+        else:
+            vectorstore.add_documents(documenten, ids=ids)
+
+    # Eerst de index, dan pas het manifest: bij een crash wordt er hooguit te veel opnieuw ge-embed.
+    vectorstore.save_local(index_path)
+    schrijf_manifest(manifest, index_path)
+    return stats
+
+
+def laad_kennisbank(embeddings, index_path=INDEX_PATH):
+    """
+    Laadt de index van schijf met mmap, zodat een koude container de vectoren niet
+    eerst helemaal in het geheugen hoeft te lezen.
+    """
+    index_file = os.path.join(index_path, "index.faiss")
+    if not os.path.exists(index_file):
+        return None
+    try:
+        index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        # Niet elk index-type ondersteunt mmap; lees hem dan gewoon in.
+        index = faiss.read_index(index_file)
+    with open(os.path.join(index_path, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+# --- Start het Script ---
+# Met 'python kennisbank.py' bouw je de index vooraf, bijvoorbeeld tijdens het deployen.
+if __name__ == "__main__":
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    resultaat = bouw_kennisbank(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME))
+    print(f"Kennisbank bijgewerkt in '{INDEX_PATH}': {resultaat['nieuw']} nieuw, {resultaat['vernieuwd']} vernieuwd, {resultaat['verwijderd']} verwijderd.")
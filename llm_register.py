@@ -0,0 +1,127 @@
+import os
+import time
+import threading
+import httpx
+
+# --- Configuratie ---
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))  # Seconden voor een hele call (lezen van het antwoord)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))  # Seconden om een verbinding op te zetten
+LLM_MAX_RETRIES = 2
+LLM_OPWARMEN = os.getenv("LLM_OPWARMEN", "0") == "1"  # "1": bij het opstarten alvast een verbinding met Groq openen
+MAX_VERBINDINGEN = 20
+MAX_KEEPALIVE = 10  # Zoveel open verbindingen blijven klaarstaan voor de volgende call
+KEEPALIVE_S = 60.0
+
+
+class VerbindingsTeller:
+    """
+    Telt de HTTP-verzoeken en hoeveel daarvan een nieuwe verbinding nodig hadden, via de
+    'trace'-extensie van httpx. Elk ander verzoek ging over een verbinding die al open stond.
+    """
+
+    def __init__(self):
+        self.teller = {"verzoeken": 0, "nieuwe_verbindingen": 0, "fouten": 0}
+        self._lock = threading.Lock()
+
+    def _tel(self, soort):
+        with self._lock:
+            self.teller[soort] += 1
+
+    def _trace(self, gebeurtenis, info):
+        if gebeurtenis == "connection.connect_tcp.complete":
+            self._tel("nieuwe_verbindingen")
+
+    async def _trace_async(self, gebeurtenis, info):
+        self._trace(gebeurtenis, info)
+
+    def bij_verzoek(self, request):
+        self._tel("verzoeken")
+        request.extensions["trace"] = self._trace
+
+    async def bij_verzoek_async(self, request):
+        self._tel("verzoeken")
+        request.extensions["trace"] = self._trace_async
+
+    def bij_antwoord(self, response):
+        if response.status_code >= 400:
+            self._tel("fouten")
+
+    async def bij_antwoord_async(self, response):
+        self.bij_antwoord(response)
+
+    def stats(self):
+        with self._lock:
+            verzoeken, nieuw = self.teller["verzoeken"], self.teller["nieuwe_verbindingen"]
+            return {**self.teller, "hergebruikt": verzoeken - nieuw,
+                    "hergebruik": round((verzoeken - nieuw) / verzoeken, 2) if verzoeken else None}
+
+
+class LLMRegister:
+    """
+    Eén plek per proces voor de ChatGroq-clients: per model één client, en alle clients delen
+    dezelfde HTTP-pool met keep-alive. Zo hoeft niet elke call (van elke gebruiker) een nieuwe
+    TLS-verbinding op te zetten. Ook de ketens (prompt | model) worden maar één keer gebouwd.
+    """
+
+    def __init__(self, api_key, callbacks=None, timeout=LLM_TIMEOUT, connect_timeout=LLM_CONNECT_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES, base_url=None, opwarmen=LLM_OPWARMEN):
+        self.api_key = api_key
+        self.callbacks = callbacks
+        self.max_retries = max_retries
+        self.base_url = base_url or os.getenv("GROQ_API_BASE")
+        self.verbindingen = VerbindingsTeller()
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        limieten = httpx.Limits(max_connections=MAX_VERBINDINGEN, max_keepalive_connections=MAX_KEEPALIVE, keepalive_expiry=KEEPALIVE_S)
+        self._http = httpx.Client(timeout=self._timeout, limits=limieten, event_hooks={
+            "request": [self.verbindingen.bij_verzoek], "response": [self.verbindingen.bij_antwoord]})
+        self._http_async = httpx.AsyncClient(timeout=self._timeout, limits=limieten, event_hooks={
+            "request": [self.verbindingen.bij_verzoek_async], "response": [self.verbindingen.bij_antwoord_async]})
+        self._llms = {}
+        self._ketens = {}
+        self._lock = threading.Lock()
+        if opwarmen:
+            threading.Thread(target=self.warm_op, name="llm-opwarmen", daemon=True).start()
+
+    def llm(self, model_name):
+        """De ChatGroq-client voor dit model (één per proces)."""
+        with self._lock:
+            if model_name not in self._llms:
+                from groq import Groq, AsyncGroq
+                from langchain_groq import ChatGroq
+                instellingen = {"api_key": self.api_key, "base_url": self.base_url, "timeout": self._timeout, "max_retries": self.max_retries}
+                self._llms[model_name] = ChatGroq(
+                    temperature=0, groq_api_key=self.api_key, model_name=model_name, callbacks=self.callbacks,
+                    timeout=self._timeout, max_retries=self.max_retries,
+                    # ChatGroq zou zelf een eigen HTTP-client maken; wij geven de gedeelde pool mee.
+                    client=Groq(http_client=self._http, **instellingen).chat.completions,
+                    async_client=AsyncGroq(http_client=self._http_async, **instellingen).chat.completions,
+                )
+            return self._llms[model_name]
+
+    def keten(self, prompt, llm):
+        """De runnable 'prompt | llm', één keer gebouwd per prompt en model."""
+        sleutel = (id(prompt), getattr(llm, "model_name", id(llm)))
+        with self._lock:
+            if sleutel not in self._ketens:
+                self._ketens[sleutel] = prompt | llm
+            return self._ketens[sleutel]
+
+    def warm_op(self):
+        """
+        Opent alvast een verbinding met de API (de lijst met modellen kost geen tokens),
+        zodat de eerste echte call niet op DNS en TLS hoeft te wachten.
+        """
+        url = (self.base_url or "https://api.groq.com").rstrip("/") + "/openai/v1/models"
+        start = time.perf_counter()
+        try:
+            self._http.get(url, headers={"Authorization": f"Bearer {self.api_key}"})
+            print(f"Verbinding met de LLM-API opgewarmd in {(time.perf_counter() - start) * 1000:.0f} ms")
+        except httpx.HTTPError as e:
+            print(f"Opwarmen van de LLM-API mislukt: {e}")
+
+    def stats(self):
+        """Verbindingen (nieuw en hergebruikt) en het aantal clients en ketens, voor het debugpaneel."""
+        return {**self.verbindingen.stats(), "clients": len(self._llms), "ketens": len(self._ketens)}
+
+    def sluit(self):
+        self._http.close()
@@ -0,0 +1,163 @@
+import os
+import re
+import argparse
+from gesprek_geheugen import tel_tokens
+
+# --- Configuratie ---
+KLEIN_MODEL = "llama3-8b-8192"
+GROOT_MODEL = "llama3-70b-8192"
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "1") == "1"  # "0": alles naar het grote model, zoals vroeger
+
+# Prijzen van Groq in dollar per miljoen tokens (invoer, uitvoer) en de snelheid in tokens per seconde.
+# Alleen gebruikt om de besparing te schatten; pas aan als Groq de prijzen verandert.
+PRIJZEN = {KLEIN_MODEL: (0.05, 0.08), GROOT_MODEL: (0.59, 0.79)}
+TOKENS_PER_SECONDE = {KLEIN_MODEL: 800, GROOT_MODEL: 300}
+
+# Vanaf deze score gaat een verzoek naar het grote model.
+DREMPEL = 1
+# Hoe zwaar een taak op zichzelf is. Vertalen en het gesprek samenvatten gaan altijd naar het kleine model.
+# De samenvatting en de gevolgen beginnen op de drempel: alleen een korte brief brengt ze naar het kleine model.
+TAAK_SCORES = {
+    "samenvatting": DREMPEL,
+    "gevolgen": DREMPEL,
+    "brief_schrijven": DREMPEL,  # Een formele brief (bezwaar, uitstel) moet foutloos zijn
+    "chat": -2,
+    "vertaling": -3,
+    "gesprek_samenvatten": -3,
+}
+KORTE_BRIEF_TOKENS = 250
+LANGE_BRIEF_TOKENS = 900
+# Juridische brieven en schulden: daar wil je het grote model, want een fout kost de gebruiker geld.
+ZWARE_DOCUMENT_TYPES = {"Dagvaarding", "Dwangbevel", "Beslaglegging", "Ontruiming", "Aanmaning", "Terugvordering", "Sanctie", "Boete", "Afwijzing", "Beslissing", "Aanslag"}
+ZWARE_ACTIES = {"Betalen", "Bezwaar maken", "Uitstel vragen"}
+ZWARE_WOORDEN = re.compile(
+    r"\b(deurwaarder|gerechtsdeurwaarder|beslag|dagvaarding|rechtbank|rechter|vonnis|dwangbevel|incasso|"
+    r"aanmaning|ingebrekestelling|ontruiming|huisuitzetting|bezwaar|beroep|terugvordering|boete|schuld\w*)\b",
+    re.IGNORECASE,
+)
+
+
+def score_verzoek(taak, brief_tekst="", document_type=None, actie=None):
+    """
+    Scoort hoe zwaar een verzoek is: de taak, de lengte van de brief, het (voorspelde) soort brief
+    en woorden die op een juridische brief of een schuld wijzen. Geeft (score, redenen).
+    """
+    score = TAAK_SCORES.get(taak, 0)
+    redenen = [f"taak {taak} ({score:+d})"]
+    if brief_tekst:
+        tokens = tel_tokens(brief_tekst)
+        if tokens < KORTE_BRIEF_TOKENS:
+            score -= 1
+            redenen.append(f"korte brief, ~{tokens} tokens (-1)")
+        elif tokens > LANGE_BRIEF_TOKENS:
+            score += 1
+            redenen.append(f"lange brief, ~{tokens} tokens (+1)")
+        zware_woorden = {woord.lower() for woord in ZWARE_WOORDEN.findall(brief_tekst)}
+        if zware_woorden:
+            bonus = min(2, len(zware_woorden))
+            score += bonus
+            redenen.append(f"juridisch/schuld: {', '.join(sorted(zware_woorden)[:3])} (+{bonus})")
+    if document_type in ZWARE_DOCUMENT_TYPES:
+        score += 2
+        redenen.append(f"soort brief {document_type} (+2)")
+    if actie in ZWARE_ACTIES:
+        score += 1
+        redenen.append(f"actie {actie} (+1)")
+    return score, redenen
+
+
+def kies_model(taak, brief_tekst="", document_type=None, actie=None, routing=MODEL_ROUTING):
+    """Kiest het model voor een verzoek. Geeft (model, score, redenen)."""
+    if not routing:
+        return GROOT_MODEL, None, ["routering uit"]
+    score, redenen = score_verzoek(taak, brief_tekst, document_type, actie)
+    return (GROOT_MODEL if score >= DREMPEL else KLEIN_MODEL), score, redenen
+
+
+def kosten(model, prompt_tokens, completion_tokens):
+    """Kosten in dollar volgens PRIJZEN."""
+    invoer, uitvoer = PRIJZEN[model]
+    return (prompt_tokens * invoer + completion_tokens * uitvoer) / 1_000_000
+
+
+class ModelRouter:
+    """
+    Geeft per verzoek de LLM-client van het gekozen model. De clients worden pas gemaakt als
+    ze nodig zijn, met 'maak_llm(model_name)', zodat de app bepaalt hoe (sleutel, callbacks).
+    """
+
+    def __init__(self, maak_llm, routing=MODEL_ROUTING):
+        self.maak_llm = maak_llm
+        self.routing = routing
+        self._clients = {}
+
+    def client(self, model):
+        if model not in self._clients:
+            self._clients[model] = self.maak_llm(model)
+        return self._clients[model]
+
+    def llm_voor(self, taak, brief_tekst="", document_type=None, actie=None):
+        model, score, redenen = kies_model(taak, brief_tekst, document_type, actie, self.routing)
+        print(f"Model voor {taak}: {model} (score {score}; {'; '.join(redenen)})")
+        return self.client(model)
+
+
+def besparing(per_model):
+    """
+    Rekent uit wat de routering scheelt ten opzichte van alles via het grote model.
+    'per_model' is {model: {"calls", "prompt_tokens", "completion_tokens"}}, bv. TRACER.modellen.
+    De tijdwinst is een schatting: hetzelfde aantal uitvoertokens, maar op de snelheid van het grote model.
+    """
+    werkelijk, alles_groot, tijd_gewonnen_s = 0.0, 0.0, 0.0
+    for model, stats in per_model.items():
+        if model not in PRIJZEN:
+            continue
+        werkelijk += kosten(model, stats["prompt_tokens"], stats["completion_tokens"])
+        alles_groot += kosten(GROOT_MODEL, stats["prompt_tokens"], stats["completion_tokens"])
+        if model != GROOT_MODEL:
+            tijd_gewonnen_s += stats["completion_tokens"] * (1 / TOKENS_PER_SECONDE[GROOT_MODEL] - 1 / TOKENS_PER_SECONDE[model])
+    return {
+        "kosten_usd": round(werkelijk, 6),
+        "kosten_alles_groot_usd": round(alles_groot, 6),
+        "besparing_pct": round(100 * (1 - werkelijk / alles_groot), 1) if alles_groot else 0.0,
+        "tijd_gewonnen_s": round(tijd_gewonnen_s, 2),
+    }
+
+
+# --- Start het Script ---
+# Laat zien welk model elke taak voor de brieven in Data/ zou krijgen, en wat dat scheelt:
+# python model_router.py
+if __name__ == "__main__":
+    from corpus import lees_brief, lees_metadata, DATA_PATH
+    from classificatie import actie_label
+
+    parser = argparse.ArgumentParser(description="Schat de besparing van de modelroutering over Data/.")
+    parser.add_argument("--talen", type=int, default=2, help="Aantal vertalingen per brief.")
+    parser.add_argument("--chatvragen", type=int, default=2, help="Aantal vervolgvragen per brief.")
+    args = parser.parse_args()
+
+    metadata = lees_metadata()
+    # Per taak: (hoe vaak per brief, geschatte uitvoertokens, extra invoertokens naast de brief)
+    taken = {"samenvatting": (1, 250, 600), "gevolgen": (1, 120, 250), "vertaling": (args.talen, 250, 0), "chat": (args.chatvragen, 120, 400)}
+    per_model, per_taak = {}, {}
+    for naam in sorted(os.listdir(DATA_PATH)):
+        meta = metadata.get(naam)
+        if not naam.endswith(".txt") or not meta:
+            continue
+        tekst = lees_brief(os.path.join(DATA_PATH, naam))
+        for taak, (aantal, uitvoer, extra) in taken.items():
+            # Net als in de app: een vertaling gaat over de samenvatting, dus zonder de brief zelf.
+            model, _, _ = kies_model(taak, "" if taak == "vertaling" else tekst, meta["document_type"], actie_label(meta), routing=True)
+            invoer = extra + (250 if taak == "vertaling" else tel_tokens(tekst))  # Vertalen gaat over de samenvatting
+            stats = per_model.setdefault(model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            stats["calls"] += aantal
+            stats["prompt_tokens"] += aantal * invoer
+            stats["completion_tokens"] += aantal * uitvoer
+            per_taak.setdefault(taak, {KLEIN_MODEL: 0, GROOT_MODEL: 0})[model] += aantal
+
+    print("Calls per taak (klein / groot):")
+    for taak, telling in per_taak.items():
+        print(f"  {taak:<14} {telling[KLEIN_MODEL]:>5} / {telling[GROOT_MODEL]}")
+    resultaat = besparing(per_model)
+    print(f"\nGeschatte kosten: ${resultaat['kosten_usd']:.4f} in plaats van ${resultaat['kosten_alles_groot_usd']:.4f} "
+          f"({resultaat['besparing_pct']}% minder), ~{resultaat['tijd_gewonnen_s']:.0f}s minder wachten op het model.")
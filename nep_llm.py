@@ -0,0 +1,74 @@
+import json
+import time
+import hashlib
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from extractie import extraheer, formatteer_bedrag
+from gesprek_geheugen import tel_tokens
+
+
+class NepLLM(BaseChatModel):
+    """
+    Lokale vervanger van ChatGroq voor benchmarks en CI: geen netwerk, altijd hetzelfde antwoord
+    op dezelfde prompt. De vertraging is in te stellen (vaste tijd per call plus tijd per token),
+    zodat de pijplijn zich gedraagt alsof er een echt model achter zit.
+    """
+
+    vertraging_s: float = 0.5
+    per_token_s: float = 0.002
+    model_name: str = "nep-llm"
+
+    @property
+    def _llm_type(self):
+        return "nep-llm"
+
+    def _antwoord(self, prompt):
+        """Een plausibel antwoord in het formaat dat de prompt vraagt (JSON of tekst met ###ACTIE###)."""
+        brief = prompt.split("CONTEXT:", 1)[-1]
+        gevonden = extraheer(brief)
+        regels = [regel.strip() for regel in brief.strip().lstrip("\ufeff").splitlines() if regel.strip()]
+        afzender = regels[0][:60] if regels else "N.v.t."
+        bedrag = formatteer_bedrag(gevonden["bedragen"][0]["waarde"]) if gevonden["bedragen"] else "geen bedrag"
+        datum = gevonden["data"][0]["tekst"] if gevonden["data"] else "geen datum"
+        kenmerk = gevonden["kenmerken"][0]["waarde"] if gevonden["kenmerken"] else "N.v.t."
+        actie = "Betalen" if gevonden["bedragen"] else "Geen actie nodig"
+        samenvatting = (
+            "Ik heb de brief voor u gelezen. Geen zorgen, ik leg het rustig uit.\n"
+            f"* 🏢 **Van wie:** {afzender}\n* 🎯 **Wat moet u doen?:** {actie}.\n"
+            f"* 💰 **Bedrag:** {bedrag}\n* 🗓️ **Datum:** {datum}\n* ℹ️ **Let op:** Bewaar deze brief.\n"
+            "Is dit zo duidelijk, of is er een woord dat ik extra moet uitleggen?"
+        )
+        if "Nederlandse tekststukken (JSON-lijst):" in prompt:
+            # PROMPT_VERTAAL_STUKKEN: elk stuk 'vertaald' als "[taal] stuk", in dezelfde volgorde.
+            talen = prompt.split("naar deze talen: ", 1)[1].split(". ", 1)[0].split(", ")
+            stukken = json.loads(prompt.split("Nederlandse tekststukken (JSON-lijst):", 1)[1].rsplit("JSON:", 1)[0])
+            return json.dumps({taal: [f"[{taal}] {stuk}" for stuk in stukken] for taal in talen}, ensure_ascii=False)
+        if prompt.rstrip().endswith("JSON:"):
+            return json.dumps({"samenvatting": samenvatting, "actie": actie, "afzender": afzender, "kenmerk": kenmerk,
+                               "gevolgen": "Als u niets doet, kunnen er extra kosten komen."}, ensure_ascii=False)
+        if "###ACTIE###" in prompt:
+            return f"{samenvatting}\n###ACTIE### {actie}\n###DATA### Afzender: {afzender} | Kenmerk: {kenmerk}"
+        # Overige prompts (vertalen, gevolgen, chat): een vaste tekst die van de prompt afhangt.
+        return f"Antwoord {hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]}: {samenvatting.splitlines()[0]}"
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        """Zoals streamen bij Groq: de vaste vertraging vóór het eerste stukje, daarna per token."""
+        tekst = self._antwoord("\n".join(str(bericht.content) for bericht in messages))
+        time.sleep(self.vertraging_s)
+        for i in range(0, len(tekst), 4):  # Ongeveer één token per stukje
+            stukje = tekst[i:i + 4]
+            time.sleep(self.per_token_s)
+            if run_manager:
+                run_manager.on_llm_new_token(stukje)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=stukje))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(str(bericht.content) for bericht in messages)
+        tekst = self._antwoord(prompt)
+        prompt_tokens, completion_tokens = tel_tokens(prompt), tel_tokens(tekst)
+        time.sleep(self.vertraging_s + self.per_token_s * completion_tokens)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=tekst))],
+            llm_output={"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}, "model_name": self.model_name},
+        )
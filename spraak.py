@@ -0,0 +1,328 @@
+import os
+import re
+import time
+import wave
+import shutil
+import hashlib
+import threading
+import subprocess
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from prompts import BULLET_ICONEN
+
+# --- Configuratie ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+AUDIO_CACHE_PATH = os.path.join(SCRIPT_DIR, "audio_cache")
+AUDIO_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Daarboven gooien we de langst niet gebruikte bestanden weg
+# De audio is de voorgelezen uitleg van iemands brief. Standaard blijft hij daarom in het geheugen;
+# "1" bewaart hem ook in AUDIO_CACHE_PATH, zodat hij een herstart overleeft.
+AUDIO_CACHE_OP_SCHIJF = os.getenv("AUDIO_CACHE_OP_SCHIJF", "0") == "1"
+AUDIO_GEHEUGEN_MAX_BYTES = 50 * 1024 * 1024
+TTS_TAAL = 'nl'
+TTS_MAX_GELIJKTIJDIG = 4
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")  # 'gtts' (Google, online) of 'lokaal' (espeak-ng, offline)
+TTS_FALLBACK_ENGINE = os.getenv("TTS_FALLBACK_ENGINE", "lokaal")
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", "4"))  # Seconden per stuk voordat we overstappen op de fallback
+
+_tts_pool = None
+_lopend = {}  # Sleutel -> future van een stuk dat nu ingesproken wordt
+_lopend_lock = threading.Lock()
+_pool_lock = threading.Lock()
+
+
+def get_tts_pool():
+    """De pool die de stukken tegelijk inspreekt; pas gemaakt als er voor het eerst iets voorgelezen wordt."""
+    global _tts_pool
+    with _pool_lock:
+        if _tts_pool is None:
+            _tts_pool = ThreadPoolExecutor(max_workers=TTS_MAX_GELIJKTIJDIG)
+    return _tts_pool
+
+
+# --- Tekst voorbereiden ---
+def maak_voorleestekst(text):
+    """Haalt de opmaak en iconen weg, zodat de stem ze niet voorleest."""
+    clean_text = re.sub(r'\*\*', '', text) # Verwijder **
+    clean_text = re.sub(r'\*', '', clean_text)  # Verwijder *
+    clean_text = re.sub('|'.join(BULLET_ICONEN), '', clean_text) # Verwijder iconen
+    clean_text = re.sub(r'Wat moet u doen\?:', 'Wat moet u doen?', clean_text)
+    return clean_text.strip()
+
+
+def splits_in_segmenten(text):
+    """
+    Knipt de samenvatting op bij de bullets (🏢/🎯/💰/🗓️/ℹ️): de inleiding, elke bullet
+    en de afsluiting worden aparte stukken die los van elkaar ingesproken kunnen worden.
+    """
+    patroon = '(?=' + '|'.join(re.escape(icoon) for icoon in BULLET_ICONEN) + ')'
+    segmenten = []
+    for deel in re.split(patroon, text):
+        # De afsluitende vraag staat na de laatste bullet op een eigen regel.
+        for stuk in re.split(r'\n\s*\n', deel):
+            stuk = maak_voorleestekst(stuk)
+            if stuk:
+                segmenten.append(stuk)
+    return segmenten
+
+
+# --- Cache (op schijf of in het geheugen) ---
+class AudioCache:
+    """
+    Audiobestanden op schijf, met de hash van de inhoud als bestandsnaam. Zo overleven ze een
+    herstart. Wordt de map groter dan 'max_bytes', dan gaan de oudste bestanden weg.
+    """
+
+    def __init__(self, pad=AUDIO_CACHE_PATH, max_bytes=AUDIO_CACHE_MAX_BYTES):
+        self.pad = pad
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(pad, exist_ok=True)
+
+    def _bestand(self, sleutel, extensie):
+        return os.path.join(self.pad, f"{sleutel}.{extensie}")
+
+    def get(self, sleutel, extensie="mp3"):
+        bestand = self._bestand(sleutel, extensie)
+        try:
+            with open(bestand, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(bestand)  # Markeer als recent gebruikt
+        return data
+
+    def set(self, sleutel, data, extensie="mp3"):
+        bestand = self._bestand(sleutel, extensie)
+        tmp_bestand = f"{bestand}.{threading.get_ident()}.tmp"
+        with open(tmp_bestand, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_bestand, bestand)
+        self.ruim_op()
+
+    def ruim_op(self):
+        """Verwijdert de langst niet gebruikte bestanden tot de map weer onder de limiet zit."""
+        with self._lock:
+            bestanden = []
+            for naam in os.listdir(self.pad):
+                if naam.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(self.pad, naam))
+                bestanden.append((stat.st_mtime, stat.st_size, naam))
+            totaal = sum(grootte for _, grootte, _ in bestanden)
+            for _, grootte, naam in sorted(bestanden):
+                if totaal <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.pad, naam))
+                except FileNotFoundError:
+                    pass
+                totaal -= grootte
+
+
+class GeheugenAudioCache:
+    """Als AudioCache, maar alleen in het geheugen: er komt niets op schijf."""
+
+    def __init__(self, max_bytes=AUDIO_GEHEUGEN_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, sleutel, extensie="mp3"):
+        with self._lock:
+            data = self._items.get((sleutel, extensie))
+            if data is not None:
+                self._items.move_to_end((sleutel, extensie))
+            return data
+
+    def set(self, sleutel, data, extensie="mp3"):
+        with self._lock:
+            oud = self._items.pop((sleutel, extensie), None)
+            self._bytes += len(data) - (len(oud) if oud else 0)
+            self._items[(sleutel, extensie)] = data
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, weg = self._items.popitem(last=False)
+                self._bytes -= len(weg)
+
+
+_audio_cache = None
+
+
+def get_audio_cache():
+    """De cache (en bij AUDIO_CACHE_OP_SCHIJF de map) wordt pas gemaakt als er voor het eerst iets voorgelezen wordt."""
+    global _audio_cache
+    if _audio_cache is None:
+        _audio_cache = AudioCache() if AUDIO_CACHE_OP_SCHIJF else GeheugenAudioCache()
+    return _audio_cache
+
+
+# --- Backends ---
+class TTSBackend:
+    """Basis voor een stem: krijgt een stuk tekst en geeft audio-bytes terug."""
+    naam = None
+    mime = None
+    extensie = None
+
+    def synthetiseer(self, tekst, lang=TTS_TAAL):
+        raise NotImplementedError
+
+    def is_beschikbaar(self):
+        return True
+
+
+class GTTSBackend(TTSBackend):
+    """De stem van Google (online). Klinkt natuurlijk, maar de snelheid hangt af van het netwerk."""
+    naam = "gtts"
+    mime = "audio/mp3"
+    extensie = "mp3"
+
+    def synthetiseer(self, tekst, lang=TTS_TAAL):
+        from gtts import gTTS
+        tts = gTTS(text=tekst, lang=lang, slow=False)
+        audio_fp = BytesIO()
+        tts.write_to_fp(audio_fp)
+        return audio_fp.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """Offline stem via espeak-ng op de server zelf (zie packages.txt). Snel en altijd beschikbaar."""
+    naam = "lokaal"
+    mime = "audio/wav"
+    extensie = "wav"
+
+    def __init__(self, snelheid=150):
+        self.snelheid = snelheid  # Woorden per minuut; iets rustiger dan de standaard van espeak
+        self._programma = None
+
+    @property
+    def programma(self):
+        """Het pad naar espeak-ng (of espeak); pas gezocht als de stem nodig is, niet bij het importeren."""
+        if self._programma is None:
+            self._programma = shutil.which("espeak-ng") or shutil.which("espeak") or ""
+        return self._programma or None
+
+    def is_beschikbaar(self):
+        return self.programma is not None
+
+    def synthetiseer(self, tekst, lang=TTS_TAAL):
+        if not self.programma:
+            raise RuntimeError("espeak-ng is niet geïnstalleerd.")
+        # De tekst via stdin, niet als argument: een stuk dat met '-' begint (een opsomming, een negatief bedrag) zou espeak als optie lezen.
+        resultaat = subprocess.run([self.programma, "-v", lang, "-s", str(self.snelheid), "--stdout", "--stdin"],
+                                   input=tekst.encode("utf-8"), capture_output=True, check=True)
+        return resultaat.stdout
+
+
+BACKENDS = {backend.naam: backend for backend in [GTTSBackend(), EspeakBackend()]}
+
+
+def get_backend(naam=None):
+    """Geeft de backend met deze naam terug (standaard die uit TTS_ENGINE)."""
+    naam = naam or TTS_ENGINE
+    if naam not in BACKENDS:
+        raise ValueError(f"Onbekende TTS-engine '{naam}'. Kies uit: {', '.join(BACKENDS)}.")
+    return BACKENDS[naam]
+
+
+# --- Inspreken ---
+def audio_sleutel(backend, tekst, lang=TTS_TAAL):
+    return hashlib.sha256(f"{backend.naam}\x00{lang}\x00{tekst}".encode('utf-8')).hexdigest()
+
+
+def synthetiseer_gecached(backend, tekst, lang=TTS_TAAL):
+    """Haalt het stuk uit de cache, of spreekt het in en bewaart het daar."""
+    cache = get_audio_cache()
+    sleutel = audio_sleutel(backend, tekst, lang)
+    data = cache.get(sleutel, backend.extensie)
+    if data is None:
+        start = time.perf_counter()
+        data = backend.synthetiseer(tekst, lang)
+        cache.set(sleutel, data, backend.extensie)
+        print(f"Audio ingesproken met '{backend.naam}' ({len(tekst)} tekens) in {time.perf_counter() - start:.2f}s")
+    return data
+
+
+def start_inspreken(backend, tekst, lang=TTS_TAAL):
+    """
+    Start het inspreken van een stuk in de pool en geeft de future terug. Wordt hetzelfde stuk al
+    ingesproken (bv. vooraf, door spreek_vooraf_in), dan krijg je die future: niets gebeurt dubbel.
+    """
+    sleutel = audio_sleutel(backend, tekst, lang)
+    with _lopend_lock:
+        taak = _lopend.get(sleutel)
+        if taak is None:
+            taak = _lopend[sleutel] = get_tts_pool().submit(synthetiseer_gecached, backend, tekst, lang)
+            taak.add_done_callback(lambda _: _lopend.pop(sleutel, None))
+    return taak
+
+
+def spreek_vooraf_in(text, lang=TTS_TAAL):
+    """
+    Begint alvast met het inspreken van alle stukken, zonder te wachten. Vraagt de pagina daarna
+    om de audio, dan haakt genereer_audio_segmenten in op deze stukken (en op de cache).
+    """
+    backend = get_backend()
+    for segment in splits_in_segmenten(text):
+        start_inspreken(backend, segment, lang)
+
+
+def voeg_audio_samen(segmenten, mime):
+    """Plakt de stukken achter elkaar. MP3 kan direct; bij WAV moet de header opnieuw."""
+    if mime != "audio/wav":
+        return b"".join(segmenten)
+    uitvoer = BytesIO()
+    with wave.open(uitvoer, 'wb') as samengevoegd:
+        for i, segment in enumerate(segmenten):
+            with wave.open(BytesIO(segment), 'rb') as stuk:
+                if i == 0:
+                    samengevoegd.setparams(stuk.getparams())
+                samengevoegd.writeframes(stuk.readframes(stuk.getnframes()))
+    return uitvoer.getvalue()
+
+
+def genereer_audio_segmenten(text, lang=TTS_TAAL, backend=None, fallback=None, timeout=TTS_TIMEOUT):
+    """
+    Spreekt alle stukken van de samenvatting tegelijk in en geeft ze op volgorde terug
+    als (bytes, mime), zodra ze klaar zijn. Het eerste stuk kan dus al afgespeeld worden
+    terwijl de rest nog gemaakt wordt.
+    Is de hoofd-engine te traag (of gaat hij mis), dan wordt dat stuk met de fallback ingesproken.
+    Is er geen fallback, dan wachten we gewoon langer op de hoofd-engine.
+    """
+    backend = backend or get_backend()
+    fallback = fallback or get_backend(TTS_FALLBACK_ENGINE)
+    heeft_fallback = fallback is not backend and fallback.is_beschikbaar()
+    segmenten = splits_in_segmenten(text)
+    taken = [start_inspreken(backend, segment, lang) for segment in segmenten]
+    for segment, taak in zip(segmenten, taken):
+        try:
+            yield taak.result(timeout=timeout if heeft_fallback else None), backend.mime
+        except Exception as e:
+            if not heeft_fallback:
+                raise
+            reden = "te traag" if isinstance(e, FutureTimeoutError) else f"fout: {e}"
+            print(f"TTS-engine '{backend.naam}' {reden}; stuk wordt ingesproken met '{fallback.naam}'.")
+            yield synthetiseer_gecached(fallback, segment, lang), fallback.mime
+
+
+def genereer_audio(text, lang=TTS_TAAL, bij_eerste_segment=None):
+    """
+    Spreekt de hele samenvatting in en geeft (bytes, mime) terug.
+    'bij_eerste_segment' krijgt het eerste stuk (bytes, mime) zodra het klaar is.
+    Als de stukken van verschillende engines komen (door de fallback), dan wordt alles
+    met de fallback opnieuw gemaakt: MP3 en WAV kun je niet aan elkaar plakken.
+    """
+    segmenten = []
+    for data, mime in genereer_audio_segmenten(text, lang):
+        if not segmenten and bij_eerste_segment:
+            bij_eerste_segment(data, mime)
+        segmenten.append((data, mime))
+    if not segmenten:
+        return None, None
+
+    soorten = {mime for _, mime in segmenten}
+    if len(soorten) > 1:
+        fallback = get_backend(TTS_FALLBACK_ENGINE)
+        segmenten = [(data, mime) for data, mime in genereer_audio_segmenten(text, lang, backend=fallback, fallback=fallback)]
+    mime = segmenten[0][1]
+    return voeg_audio_samen([data for data, _ in segmenten], mime), mime
@@ -0,0 +1,93 @@
+import os
+import ast
+import sys
+import json
+import argparse
+import subprocess
+from datetime import datetime
+
+# --- Configuratie ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(SCRIPT_DIR, "Standalone_chatbot.py")
+
+# De onderdelen die de app pas bij het eerste gebruik importeert; die meten we apart.
+ZWARE_ONDERDELEN = {
+    "ocr_pdf": ["tekst_extractie"],
+    "voorlezen": ["gtts"],
+    "embeddings": ["langchain_community.embeddings", "kennisbank"],
+    "supabase": ["supabase"],
+    "classificatie": ["classificatie"],
+}
+
+
+def opstart_imports(app_file=APP_FILE):
+    """Zoekt de imports die de app bovenaan het bestand doet (dus bij elke start)."""
+    with open(app_file, 'r', encoding='utf-8') as f:
+        boom = ast.parse(f.read())
+    modules = []
+    for node in boom.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return modules
+
+
+def meet_imports(modules):
+    """
+    Importeert de modules in een vers Python-proces met '-X importtime'.
+    Geeft de totale tijd en de tijd per top-level package terug (in milliseconden).
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    resultaat = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=SCRIPT_DIR, capture_output=True, text=True)
+    if resultaat.returncode != 0:
+        raise RuntimeError(f"Importeren mislukt: {resultaat.stderr.strip().splitlines()[-1]}")
+
+    per_package = {}
+    for regel in resultaat.stderr.splitlines():
+        if not regel.startswith("import time:") or "cumulative" in regel:
+            continue
+        _, cumulatief, naam = regel[len("import time:"):].split("|")
+        # Alleen de imports op het bovenste niveau; de rest zit al in hun 'cumulative'.
+        if not naam.startswith("  "):
+            package = naam.strip().split(".")[0]
+            per_package[package] = per_package.get(package, 0) + int(cumulatief) / 1000
+    return {"totaal_ms": round(sum(per_package.values()), 1), "per_package_ms": {k: round(v, 1) for k, v in sorted(per_package.items(), key=lambda x: -x[1])}}
+
+
+def maak_rapport():
+    """Meet de opstarttijd van de app en van elk zwaar onderdeel dat pas later geladen wordt."""
+    modules = opstart_imports()
+    rapport = {
+        "datum": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "opstart": meet_imports(modules),
+        "bij_eerste_gebruik": {},
+    }
+    for onderdeel, onderdeel_modules in ZWARE_ONDERDELEN.items():
+        try:
+            rapport["bij_eerste_gebruik"][onderdeel] = meet_imports(onderdeel_modules)["totaal_ms"]
+        except RuntimeError as e:
+            rapport["bij_eerste_gebruik"][onderdeel] = f"niet beschikbaar ({e})"
+    return rapport
+
+
+# --- Start het Script ---
+# 'python startup_rapport.py --json rapport.json' bewaart het rapport, zodat je releases kunt vergelijken.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meet hoe lang het importeren van de app duurt.")
+    parser.add_argument("--json", help="Sla het rapport ook op als JSON-bestand.")
+    args = parser.parse_args()
+
+    rapport = maak_rapport()
+    print(f"Opstarttijd (imports): {rapport['opstart']['totaal_ms']:.0f} ms")
+    for package, ms in list(rapport['opstart']['per_package_ms'].items())[:10]:
+        print(f"  {package:<25} {ms:>8.0f} ms")
+    print("Pas bij eerste gebruik:")
+    for onderdeel, ms in rapport['bij_eerste_gebruik'].items():
+        print(f"  {onderdeel:<25} {ms:>8.0f} ms" if isinstance(ms, float) else f"  {onderdeel:<25} {ms}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, indent=2)
+        print(f"Rapport opgeslagen in '{args.json}'.")
@@ -0,0 +1,154 @@
+import os
+import time
+import hashlib
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+import pytesseract
+import fitz  # PyMuPDF
+from brief_cache import LRUCache
+
+# --- Configuratie ---
+OCR_TAAL = 'nld'
+OCR_MAX_ZIJDE = 2500  # Telefoonfoto's zijn vaak 4000+ pixels; groter dan dit helpt Tesseract niet
+PDF_MAX_DPI = 300
+PDF_MIN_TEKENS = 25  # Minder tekens dan dit in de tekstlaag: dan is de pagina waarschijnlijk gescand
+AFBEELDING_EXTENSIES = [".jpg", ".jpeg", ".png"]
+
+_ocr_pool = None
+_bestand_cache = LRUCache(max_items=64)  # Tekst per bestand (op hash), zodat opnieuw uploaden niets kost
+
+
+def get_ocr_pool():
+    """Eén gedeelde pool met een Tesseract-worker per processorkern."""
+    global _ocr_pool
+    if _ocr_pool is None:
+        # 'spawn' i.p.v. 'fork': de Streamlit-server draait threads, en fork gaat daar niet goed mee om.
+        _ocr_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+    return _ocr_pool
+
+
+# --- Voorbewerking ---
+def otsu_drempel(afbeelding):
+    """Berekent de beste grens tussen zwart en wit op basis van het histogram (Otsu)."""
+    histogram = afbeelding.histogram()
+    totaal = sum(histogram)
+    som_totaal = sum(i * aantal for i, aantal in enumerate(histogram))
+    som_achtergrond, gewicht_achtergrond = 0, 0
+    beste_drempel, beste_variantie = 127, 0
+    for i, aantal in enumerate(histogram):
+        gewicht_achtergrond += aantal
+        if gewicht_achtergrond == 0:
+            continue
+        gewicht_voorgrond = totaal - gewicht_achtergrond
+        if gewicht_voorgrond == 0:
+            break
+        som_achtergrond += i * aantal
+        verschil = som_achtergrond / gewicht_achtergrond - (som_totaal - som_achtergrond) / gewicht_voorgrond
+        variantie = gewicht_achtergrond * gewicht_voorgrond * verschil * verschil
+        if variantie > beste_variantie:
+            beste_drempel, beste_variantie = i, variantie
+    return beste_drempel
+
+
+def voorbewerk_pagina(afbeelding, max_zijde=OCR_MAX_ZIJDE):
+    """Draait de foto recht (EXIF), maakt hem grijs, kleiner en zwart-wit."""
+    afbeelding = ImageOps.exif_transpose(afbeelding).convert('L')
+    if max(afbeelding.size) > max_zijde:
+        afbeelding.thumbnail((max_zijde, max_zijde), Image.LANCZOS)
+    afbeelding = ImageOps.autocontrast(afbeelding)
+    drempel = otsu_drempel(afbeelding)
+    return afbeelding.point(lambda p: 255 if p > drempel else 0, mode='1')
+
+
+def ocr_pagina(afbeelding_bytes, lang=OCR_TAAL):
+    """Voorbewerking en OCR van één pagina. Draait in een apart proces."""
+    start = time.perf_counter()
+    afbeelding = voorbewerk_pagina(Image.open(BytesIO(afbeelding_bytes)))
+    tekst = pytesseract.image_to_string(afbeelding, lang=lang)
+    return tekst, time.perf_counter() - start
+
+
+# --- Uploads ---
+def render_pagina(pagina, max_zijde=OCR_MAX_ZIJDE):
+    """
+    Zet een PDF-pagina om naar een PNG. De DPI is zo gekozen dat de pagina precies
+    zo groot wordt als we voor OCR gebruiken; meer pixels renderen is zonde van de tijd.
+    """
+    langste_zijde_inch = max(pagina.rect.width, pagina.rect.height) / 72
+    dpi = min(PDF_MAX_DPI, int(max_zijde / langste_zijde_inch))
+    return pagina.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY).tobytes("png")
+
+
+def start_pdf(pdf_bytes):
+    """
+    Loopt de PDF pagina voor pagina door. Pagina's met een tekstlaag leveren direct tekst op;
+    gescande pagina's worden gerenderd en meteen naar de OCR-pool gestuurd, zodat de
+    volgende pagina al gerenderd wordt terwijl de vorige nog gelezen wordt.
+    """
+    from tracing import meet  # Niet bovenaan: de OCR-workers importeren deze module ook
+    paginas = []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for pagina in doc:
+            with meet("pdf_tekst"):
+                tekst = pagina.get_text()
+            if len(tekst.strip()) >= PDF_MIN_TEKENS:
+                paginas.append(tekst)
+            else:
+                with meet("pdf_render"):
+                    png = render_pagina(pagina)
+                paginas.append(get_ocr_pool().submit(ocr_pagina, png))
+    return paginas
+
+
+def start_bestand(naam, data):
+    """Geeft per pagina de tekst, of een lopende OCR-taak (Future) voor die pagina."""
+    file_ext = os.path.splitext(naam)[1].lower()
+    if file_ext == ".pdf":
+        return start_pdf(data)
+    if file_ext in AFBEELDING_EXTENSIES:
+        return [get_ocr_pool().submit(ocr_pagina, data)]
+    return []
+
+
+def voeg_paginas_samen(pagina_teksten):
+    """Plakt de pagina's in de juiste volgorde aan elkaar, met dezelfde paginakoppen als in Data/."""
+    if len(pagina_teksten) == 1:
+        return pagina_teksten[0]
+    return "\n".join(f"--- Pagina {i} van {len(pagina_teksten)} ---\n{tekst.strip()}" for i, tekst in enumerate(pagina_teksten, start=1))
+
+
+def lees_uploads(bestanden):
+    """
+    Leest een of meer geüploade bestanden (foto's en/of PDF's) als één brief.
+    'bestanden' is een lijst van (bestandsnaam, bytes).
+    Geeft de tekst terug plus een lijst met (paginanummer, OCR-tijd) voor elke pagina die nu met OCR
+    gelezen is. Een bestand uit de cache is niet opnieuw gelezen en heeft dus geen tijden.
+    """
+    from tracing import registreer, noteer
+    # Start eerst alle bestanden, zodat alle OCR-taken tegelijk in de pool lopen.
+    lopend = []
+    for naam, data in bestanden:
+        sleutel = hashlib.sha256(data).hexdigest()
+        gecached = _bestand_cache.get(sleutel)
+        lopend.append((sleutel, gecached, None if gecached else start_bestand(naam, data)))
+    noteer(cache_hit=all(gecached is not None for _, gecached, _ in lopend))
+
+    # Haal daarna de resultaten op, in de volgorde van de pagina's.
+    pagina_teksten, pagina_tijden = [], []
+    for sleutel, gecached, paginas in lopend:
+        if gecached is None:
+            gecached = []
+            for pagina in paginas:
+                if isinstance(pagina, str):
+                    gecached.append(pagina)
+                else:
+                    tekst, duur = pagina.result()
+                    # De OCR zelf draait in een ander proces; daar meten we de tijd al, dus die geven we door.
+                    registreer({"stap": "ocr", "duur_ms": round(duur * 1000, 1)})
+                    gecached.append(tekst)
+                    pagina_tijden.append((len(pagina_teksten) + len(gecached), duur))
+            _bestand_cache.set(sleutel, gecached)
+        pagina_teksten.extend(gecached)
+    return voeg_paginas_samen(pagina_teksten) if pagina_teksten else "", pagina_tijden
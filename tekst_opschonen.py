@@ -0,0 +1,157 @@
+import os
+import re
+import argparse
+from extractie import PATROON, extraheer
+from gesprek_geheugen import tel_tokens
+
+# --- Configuratie ---
+TEKST_OPSCHONEN = os.getenv("TEKST_OPSCHONEN", "1") == "1"  # "0": de brief gaat ongewijzigd naar het model
+KOP_VOET_REGELS = 3  # Zoveel regels aan het begin en eind van een pagina kunnen een kop- of voettekst zijn
+
+PAGINA_KOP = re.compile(r"^-{2,}\s*Pagina \d+ van \d+\s*-{2,}$", re.IGNORECASE)  # Van voeg_paginas_samen
+PAGINANUMMER = re.compile(r"^(?:(?:pagina|blad|page)\s*\d+\s*(?:van|of|/)\s*\d+|-\s*\d+\s*-|\d+\s*/\s*\d+)$", re.IGNORECASE)
+# "betalings-\nregeling" (alleen midden in een woord). Niet bij "zorg-\nen welzijn": dat is een weglatingsstreepje.
+AFBREKING = re.compile(r"([a-zà-ÿ])-\n[ \t]*(?!(?:en|of|tot|noch|als)\b)([a-zà-ÿ])")
+STIPPELLIJN = re.compile(r"[.\-_·…]{4,}")  # Stippellijnen in tabellen: "Te betalen ........ € 50"
+WITRUIMTE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")  # Ook harde spaties en de smalle spaties uit PDF's
+# Regels die niets over de brief zelf zeggen: registratienummers van de afzender en standaard disclaimers.
+# Een bezoekadres hoort er niet bij: bij een uitnodiging is dat juist waar je heen moet. Staat het in
+# de kop- of voettekst van elke pagina, dan blijft via herhaalde_regels alleen de eerste staan.
+IRRELEVANT = re.compile(
+    r"^(?:kvk|k\.v\.k\.|kamer van koophandel|handelsregister|btw|b\.t\.w\.|fax)\b"
+    r"|aan (?:deze|dit) (?:brief|e-?mail|bericht) kunnen geen rechten"
+    r"|(?:dit|deze) (?:is een )?(?:e-?mail|bericht|brief) is (?:automatisch|computer)",
+    re.IGNORECASE,
+)
+# Een regel met een bedrag, datum, kenmerk of termijn wordt nooit weggelaten.
+TERMIJN = re.compile(r"\b(?:uiterlijk|binnen \d+|termijn|vóór|voor \d)", re.IGNORECASE)
+VERVANGINGEN = {"\ufeff": "", "\u00ad": "", "\ufb01": "fi", "\ufb02": "fl", "\r\n": "\n", "\r": "\n", "\f": "\n\f\n"}
+
+
+def is_belangrijk(regel):
+    return bool(PATROON.search(regel) or TERMIJN.search(regel))
+
+
+def is_ruis(regel):
+    """OCR-ruis: een regel die vooral uit leestekens en losse tekens bestaat."""
+    tekens = regel.replace(" ", "")
+    return bool(tekens) and sum(teken.isalnum() for teken in tekens) / len(tekens) < 0.5 and "€" not in tekens
+
+
+def splits_paginas(tekst):
+    """
+    Knipt de tekst in pagina's, bij de paginakoppen van de app of een form feed van de PDF.
+    Geeft per pagina (kop, regels); de kop is de paginakop zelf, of None.
+    """
+    paginas = [(None, [])]
+    for regel in tekst.split("\n"):
+        if PAGINA_KOP.match(regel.strip()) or regel == "\f":
+            kop = regel.strip() if regel != "\f" else None
+            if paginas[-1][1] or paginas[-1][0]:
+                paginas.append((kop, []))
+            else:
+                paginas[-1] = (kop, [])
+            continue
+        paginas[-1][1].append(regel)
+    return paginas
+
+
+def regel_sleutel(regel):
+    """Om herhaalde regels te herkennen: zonder extra witruimte en hoofdletters (getallen tellen wel mee)."""
+    return WITRUIMTE.sub(" ", regel).strip().lower()
+
+
+def herhaalde_regels(paginas):
+    """
+    Kop- en voetteksten: regels die bovenaan of onderaan op meer dan één pagina staan.
+    Paginanummers ('Blad 2') hoeven hier niet bij: die gaan er via PAGINANUMMER al uit.
+    """
+    gezien = {}
+    for _, pagina in paginas:
+        regels = [regel for regel in pagina if regel.strip()]
+        for regel in set(regels[:KOP_VOET_REGELS] + regels[-KOP_VOET_REGELS:]):
+            sleutel = regel_sleutel(regel)
+            gezien[sleutel] = gezien.get(sleutel, 0) + 1
+    return {sleutel for sleutel, aantal in gezien.items() if aantal > 1}
+
+
+def schoon_op(tekst):
+    """
+    Haalt weg wat het model niet nodig heeft, zodat de prompt korter wordt: paginanummers,
+    herhaalde kop- en voetteksten (alleen de eerste blijft staan), afbrekingen, stippellijnen,
+    dubbele witruimte, OCR-ruis en standaardregels (KvK, BTW, disclaimers).
+    De paginakoppen (--- Pagina x van y ---) blijven staan: brief_index.splits_brief knipt daarop.
+    Regels met een bedrag, datum, kenmerk of termijn blijven altijd staan, ook als ze herhaald worden.
+    """
+    for oud, nieuw in VERVANGINGEN.items():
+        tekst = tekst.replace(oud, nieuw)
+    tekst = AFBREKING.sub(r"\1\2", tekst)
+    paginas = splits_paginas(tekst)
+    herhaald = herhaalde_regels(paginas) if len(paginas) > 1 else set()
+
+    regels, al_gehad = [], set()
+    for kop, pagina in paginas:
+        if kop:
+            while regels and not regels[-1]:
+                regels.pop()
+            regels.append(kop)
+        for regel in pagina:
+            regel = WITRUIMTE.sub(" ", STIPPELLIJN.sub(" ", regel)).strip()
+            if not is_belangrijk(regel):
+                sleutel = regel_sleutel(regel)
+                if sleutel in herhaald:
+                    if sleutel in al_gehad:
+                        continue
+                    al_gehad.add(sleutel)
+                if PAGINANUMMER.match(regel) or is_ruis(regel) or IRRELEVANT.search(regel):
+                    continue
+            if regel or (regels and regels[-1] and not PAGINA_KOP.match(regels[-1])):  # Hooguit één lege regel achter elkaar
+                regels.append(regel)
+    return "\n".join(regels).strip()
+
+
+def verloren_gegevens(origineel, opgeschoond):
+    """Bedragen, data, kenmerken en IBANs die in het origineel staan maar na het opschonen niet meer."""
+    voor, na = extraheer(origineel), extraheer(opgeschoond)
+    verloren = []
+    for soort in ("bedragen", "data", "kenmerken", "ibans"):
+        nog_over = {str(item["waarde"]) for item in na[soort]}
+        verloren += [item["tekst"] for item in voor[soort] if str(item["waarde"]) not in nog_over]
+    return verloren
+
+
+# --- Start het Script ---
+# Rapport over Data/: hoeveel tokens scheelt het opschonen per brief, en gaat er niets verloren?
+# python tekst_opschonen.py (met --scan ook via een gescande PDF en OCR, als Tesseract er is)
+if __name__ == "__main__":
+    from corpus import lees_brief, DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Rapport: tokens per brief voor en na het opschonen.")
+    parser.add_argument("--scan", action="store_true", help="Maak van elke brief eerst een gescande PDF en lees die met OCR.")
+    parser.add_argument("--aantal", type=int, default=None, help="Alleen de eerste N brieven.")
+    parser.add_argument("--alle", action="store_true", help="Toon elke brief, niet alleen de grootste besparingen.")
+    args = parser.parse_args()
+
+    rijen, verloren = [], {}
+    for naam in sorted(naam for naam in os.listdir(DATA_PATH) if naam.endswith(".txt"))[:args.aantal]:
+        tekst = lees_brief(os.path.join(DATA_PATH, naam))
+        if args.scan:
+            from benchmark_pijplijn import maak_pdf
+            from tekst_extractie import lees_uploads
+            tekst, _ = lees_uploads([(naam + ".pdf", maak_pdf(tekst, gescand=True))])
+        opgeschoond = schoon_op(tekst)
+        rijen.append((naam, tel_tokens(tekst), tel_tokens(opgeschoond)))
+        weg = verloren_gegevens(tekst, opgeschoond)
+        if weg:
+            verloren[naam] = weg
+
+    rijen.sort(key=lambda rij: rij[2] - rij[1])
+    print(f"{'brief':<60}{'voor':>7}{'na':>7}{'minder':>8}")
+    for naam, voor, na in rijen if args.alle else rijen[:15]:
+        print(f"{naam[:59]:<60}{voor:>7}{na:>7}{(voor - na) / voor:>8.0%}")
+    totaal_voor, totaal_na = sum(rij[1] for rij in rijen), sum(rij[2] for rij in rijen)
+    print(f"\n{len(rijen)} brieven: ~{totaal_voor} -> ~{totaal_na} tokens ({(totaal_voor - totaal_na) / totaal_voor:.1%} minder), "
+          f"{sum(voor > na for _, voor, na in rijen)} brieven korter.")
+    print(f"Bedragen, data, kenmerken of IBANs verloren in {len(verloren)} brieven.")
+    for naam, items in verloren.items():
+        print(f"  {naam}: {', '.join(items)}")
@@ -0,0 +1,36 @@
+import os
+import sys
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# De modules van de app staan los in de hoofdmap, niet in een package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class VasteAntwoorden(BaseChatModel):
+    """
+    Nep-model voor de tests: geeft de antwoorden uit 'antwoorden' op volgorde terug. Een antwoord
+    dat een Exception is wordt gegooid (bv. een 429). De prompts staan daarna in 'prompts'.
+    """
+
+    antwoorden: list = []
+    prompts: list = []
+    model_name: str = "vast"
+
+    @property
+    def _llm_type(self):
+        return "vaste-antwoorden"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append("\n".join(str(bericht.content) for bericht in messages))
+        antwoord = self.antwoorden.pop(0)
+        if isinstance(antwoord, Exception):
+            raise antwoord
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=antwoord))])
+
+
+@pytest.fixture
+def nep_model():
+    return lambda antwoorden: VasteAntwoorden(antwoorden=list(antwoorden), prompts=[])
@@ -0,0 +1,83 @@
+import json
+import pytest
+from langchain_core.prompts import PromptTemplate
+from antwoord_parser import AntwoordStream, SchemaFout, parse_antwoord, parse_json_antwoord, vraag_json_antwoord
+
+
+def json_antwoord(**velden):
+    antwoord = {"samenvatting": "Uitleg.", "actie": "Betalen", "afzender": "CJIB", "kenmerk": "123", "gevolgen": "Extra kosten."}
+    antwoord.update(velden)
+    return json.dumps(antwoord)
+
+
+def test_parse_antwoord_met_actie_en_data():
+    resultaat = parse_antwoord("Uitleg van de brief.\n###ACTIE### Betalen\n###DATA### Afzender: CJIB | Kenmerk: 12345")
+    assert resultaat == {"samenvatting": "Uitleg van de brief.", "actie": "Betalen", "afzender": "CJIB", "kenmerk": "12345"}
+
+
+def test_parse_antwoord_zonder_markers():
+    resultaat = parse_antwoord("Alleen uitleg.")
+    assert resultaat["samenvatting"] == "Alleen uitleg."
+    assert resultaat["actie"] is None and resultaat["afzender"] is None
+
+
+def test_parse_antwoord_slaat_data_zonder_dubbele_punt_over():
+    resultaat = parse_antwoord("Uitleg.\n###ACTIE### Betalen\n###DATA### CJIB | Kenmerk:")
+    assert resultaat["afzender"] == "N.v.t."
+    assert resultaat["kenmerk"] == "N.v.t."
+
+
+def test_parse_json_antwoord_met_tekst_eromheen():
+    resultaat = parse_json_antwoord("```json\n" + json_antwoord(afzender="", kenmerk=" 99 ") + "\n```")
+    assert resultaat["actie"] == "Betalen"
+    assert resultaat["afzender"] == "N.v.t."
+    assert resultaat["kenmerk"] == "99"
+
+
+@pytest.mark.parametrize("tekst", [
+    "geen json",
+    "{kapot",
+    "[1, 2]",
+    json.dumps({"samenvatting": "Uitleg."}),
+    json_antwoord(samenvatting="  "),
+    json_antwoord(actie="Dansen"),
+])
+def test_parse_json_antwoord_gooit_schemafout(tekst):
+    with pytest.raises(SchemaFout):
+        parse_json_antwoord(tekst)
+
+
+def test_vraag_json_antwoord_herkansing(nep_model):
+    prompt = PromptTemplate.from_template("Brief: {context}{opmerking}\nJSON:")
+    model = nep_model(["geen json", json_antwoord()])
+    resultaat, pogingen = vraag_json_antwoord(model, prompt, {"context": "tekst"})
+    assert pogingen == 2
+    assert resultaat["afzender"] == "CJIB"
+    assert "LET OP" in model.prompts[1]  # De fout gaat mee in de tweede poging
+
+
+def test_vraag_json_antwoord_geeft_op(nep_model):
+    prompt = PromptTemplate.from_template("Brief: {context}{opmerking}\nJSON:")
+    with pytest.raises(SchemaFout):
+        vraag_json_antwoord(nep_model(["fout"] * 2), prompt, {"context": "tekst"}, max_pogingen=2)
+
+
+def test_vraag_json_antwoord_zonder_pogingen(nep_model):
+    prompt = PromptTemplate.from_template("Brief: {context}{opmerking}\nJSON:")
+    model = nep_model([])
+    with pytest.raises(ValueError, match="max_pogingen"):
+        vraag_json_antwoord(model, prompt, {"context": "tekst"}, max_pogingen=0)
+    assert model.prompts == []
+
+
+def test_antwoord_stream_houdt_marker_achter_ook_als_hij_gesplitst_binnenkomt():
+    stukjes = ["Uitleg ", "van de brief.\n#", "##AC", "TIE### Betalen\n", "###DATA### Afzender: X"]
+    stream = AntwoordStream(iter(stukjes))
+    getoond = "".join(stream)
+    assert getoond == "Uitleg van de brief.\n"
+    assert stream.volledige_tekst == "".join(stukjes)
+
+
+def test_antwoord_stream_zonder_marker_toont_alles():
+    stream = AntwoordStream(iter(["Een ", "antwoord met #", " erin"]))
+    assert "".join(stream) == "Een antwoord met # erin"
@@ -0,0 +1,70 @@
+import time
+from brief_cache import SchijfCache, llm_sleutel
+
+
+def test_bewaart_json_waarden_en_overleeft_een_herstart(tmp_path):
+    pad = str(tmp_path / "cache.sqlite")
+    cache = SchijfCache(pad)
+    cache.set("a", {"samenvatting": "Uitleg", "bedragen": [1.5]})
+    assert cache.get("a") == {"samenvatting": "Uitleg", "bedragen": [1.5]}
+    assert cache.get("b", "standaard") == "standaard"
+
+    opnieuw = SchijfCache(pad)
+    assert opnieuw.get("a") == {"samenvatting": "Uitleg", "bedragen": [1.5]}
+    assert len(opnieuw) == 1
+
+
+def test_verlopen_antwoorden_tellen_niet(tmp_path):
+    cache = SchijfCache(str(tmp_path / "cache.sqlite"), ttl_s=0.05)
+    cache.set("a", "oud")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.teller["verlopen"] == 1
+    assert len(cache) == 0
+
+
+def test_gooit_langst_niet_gebruikte_weg(tmp_path):
+    cache = SchijfCache(str(tmp_path / "cache.sqlite"), max_items=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    cache.get("a")  # 'a' is nu recenter gebruikt dan 'b'
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.teller["weggegooid"] == 1
+
+
+def test_overslaan_leest_niet_maar_schrijft_wel(tmp_path):
+    pad = str(tmp_path / "cache.sqlite")
+    SchijfCache(pad).set("a", "oud")
+    cache = SchijfCache(pad, overslaan=True)
+    assert cache.get("a") is None
+    cache.set("a", "nieuw")
+    assert SchijfCache(pad).get("a") == "nieuw"
+
+
+def test_in_het_geheugen():
+    cache = SchijfCache(":memory:")
+    cache.set("a", "waarde")
+    assert cache.get("a") == "waarde"
+    assert cache.stats()["hits"] == 1
+
+
+def test_kapotte_cache_stopt_de_app_niet(tmp_path):
+    cache = SchijfCache(str(tmp_path / "cache.sqlite"))
+    cache._db.execute("DROP TABLE antwoorden")
+    assert cache.get("a", "standaard") == "standaard"
+    cache.set("a", "waarde")
+    assert cache.teller["fouten"] == 2
+
+
+def test_llm_sleutel_negeert_witruimte_maar_niet_de_inhoud():
+    sleutel = llm_sleutel("Prompt {x}", "model", {"x": "een  brief\n"})
+    assert sleutel == llm_sleutel("Prompt {x}", "model", {"x": "een brief"})
+    assert sleutel != llm_sleutel("Prompt {x}", "model", {"x": "andere brief"})
+    assert sleutel != llm_sleutel("Prompt {x}", "ander-model", {"x": "een brief"})
+    assert sleutel != llm_sleutel("Andere prompt {x}", "model", {"x": "een brief"})
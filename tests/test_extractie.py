@@ -0,0 +1,49 @@
+from datetime import date
+import pytest
+from extractie import beste_kenmerk, extraheer, gegevens_voor_prompt, iban_geldig
+
+
+def test_iban_met_de_mod_97_proef():
+    assert iban_geldig("NL91ABNA0417164300")
+    assert iban_geldig("NL91 ABNA 0417 1643 00")
+    assert not iban_geldig("NL91ABNA0417164301")
+
+
+def test_alleen_geldige_ibans_worden_gevonden():
+    gevonden = extraheer("Maak het over naar NL91 ABNA 0417 1643 00 en niet naar NL91ABNA0417164301.")
+    assert [iban["waarde"] for iban in gevonden["ibans"]] == ["NL91ABNA0417164300"]
+
+
+@pytest.mark.parametrize("tekst, verwacht", [
+    ("Betaal voor 12-05-2024.", date(2024, 5, 12)),
+    ("Betaal voor 1/6/24.", date(2024, 6, 1)),
+    ("Uw afspraak is op 3 juni 2024.", date(2024, 6, 3)),
+    ("Uw afspraak is op 1 jan. 2025.", date(2025, 1, 1)),
+])
+def test_data(tekst, verwacht):
+    assert [datum["waarde"] for datum in extraheer(tekst)["data"]] == [verwacht]
+
+
+@pytest.mark.parametrize("tekst", ["Op 31-02-2024 gaat het niet.", "Dossier 12-13-2024.", "Op 30 februari 2024 ook niet."])
+def test_datums_die_niet_bestaan_tellen_niet(tekst):
+    assert extraheer(tekst)["data"] == []
+
+
+@pytest.mark.parametrize("tekst, verwacht", [
+    ("Uw CJIB-nummer is 1234 5678 9012 3456.", "1234 5678 9012 3456"),
+    ("CJIB-nummer: 123456789", "123456789"),
+    ("Het kenmerk luidt: AB-123.", "AB-123"),
+])
+def test_kenmerk_achter_het_label(tekst, verwacht):
+    assert [kenmerk["waarde"] for kenmerk in extraheer(tekst)["kenmerken"]] == [verwacht]
+
+
+def test_label_zonder_nummer_is_geen_kenmerk():
+    assert extraheer("Het kenmerk is belangrijk.")["kenmerken"] == []
+
+
+def test_bedragen_en_voorkeur_voor_het_cjib_nummer():
+    gevonden = extraheer("Ons kenmerk: Z-77. Betaal € 1.234,50 en 80,00 euro. Uw CJIB-nummer is 9876 5432 1098 7654.")
+    assert [bedrag["waarde"] for bedrag in gevonden["bedragen"]] == [1234.5, 80.0]
+    assert beste_kenmerk(gevonden) == "9876 5432 1098 7654"
+    assert "Bedragen: € 1.234,50, € 80,00" in gegevens_voor_prompt(gevonden)
@@ -0,0 +1,86 @@
+import time
+import threading
+from feedback_logger import FeedbackLogger, LokaleBackend, Spool
+
+
+def wacht_tot(voorwaarde, timeout=5.0):
+    einde = time.monotonic() + timeout
+    while time.monotonic() < einde:
+        if voorwaarde():
+            return True
+        time.sleep(0.02)
+    return voorwaarde()
+
+
+def test_spool_bewaart_en_verwijdert_op_volgorde(tmp_path):
+    spool = Spool(str(tmp_path / "spool.jsonl"))
+    spool.voeg_toe([{"id": 1}, {"id": 2}])
+    spool.voeg_toe([{"id": 3}])
+    assert len(spool) == 3
+    assert spool.lees() == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    spool.verwijder_eerste(2)
+    assert spool.lees() == [{"id": 3}]
+    spool.verwijder_eerste(1)
+    assert len(spool) == 0
+    assert not (tmp_path / "spool.jsonl").exists()
+
+
+def test_spool_slaat_half_geschreven_regel_over(tmp_path):
+    pad = tmp_path / "spool.jsonl"
+    pad.write_text('{"id": 1}\n{"id": 2\n', encoding="utf-8")  # Crash tijdens het schrijven
+    assert Spool(str(pad)).lees() == [{"id": 1}]
+
+
+def test_storing_gaat_naar_spool_en_wordt_later_verstuurd(tmp_path):
+    backend = LokaleBackend()
+    backend.beschikbaar = False
+    spool = Spool(str(tmp_path / "spool.jsonl"))
+    logger = FeedbackLogger(backend, spool, batch_grootte=10, flush_interval=0.05, replay_interval=0.2)
+    try:
+        for i in range(25):
+            logger.log({"session_id": f"test-{i}", "feedback_score": i % 2})
+        assert wacht_tot(lambda: len(spool) == 25)
+        assert backend.rijen == []
+
+        backend.beschikbaar = True
+        assert wacht_tot(lambda: len(backend.rijen) == 25)
+        assert wacht_tot(lambda: len(spool) == 0)
+    finally:
+        logger.stop()
+    assert sorted(rij["session_id"] for rij in backend.rijen) == sorted(f"test-{i}" for i in range(25))
+    assert logger.stats()["opnieuw_verstuurd"] == 25
+
+
+def test_volle_wachtrij_gaat_direct_naar_spool(tmp_path):
+    backend = LokaleBackend(vertraging=0.5)
+    spool = Spool(str(tmp_path / "spool.jsonl"))
+    logger = FeedbackLogger(backend, spool, batch_grootte=1, flush_interval=0.05, max_wachtrij=1)
+    try:
+        for i in range(5):
+            logger.log({"session_id": f"test-{i}"})
+        assert logger.stats()["gespoold"] >= 3
+        assert len(spool) == logger.stats()["gespoold"]
+    finally:
+        logger.stop()
+
+
+def test_tellers_kloppen_bij_loggen_uit_meerdere_threads(tmp_path):
+    backend = LokaleBackend(vertraging=0.001)
+    spool = Spool(str(tmp_path / "spool.jsonl"))
+    logger = FeedbackLogger(backend, spool, batch_grootte=5, flush_interval=0.01, replay_interval=60, max_wachtrij=2)
+
+    def log_veel(thread):
+        for i in range(100):
+            logger.log({"session_id": f"test-{thread}-{i}"})
+
+    threads = [threading.Thread(target=log_veel, args=(thread,)) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logger.stop()
+    stats = logger.stats()
+    assert stats["verstuurd"] + stats["gespoold"] == 800
+    assert stats["verstuurd"] + stats["opnieuw_verstuurd"] == len(backend.rijen)
+    assert stats["gespoold"] - stats["opnieuw_verstuurd"] == len(spool)
@@ -0,0 +1,101 @@
+import json
+import os
+import pandas as pd
+import pytest
+
+os.environ.setdefault("GROQ_API_KEY", "test")  # Het script stopt zonder key; de echte API wordt niet gebruikt
+import genereer_samenvattingen as gs
+
+BRIEVEN = {
+    "brief_a.txt": "Geachte heer,\nU moet € 80,00 betalen voor 1 juni 2024.",
+    "brief_b.txt": "Beste mevrouw,\nUw afspraak is op 3 juni 2024 om 10.00 uur.",
+    "brief_c.txt": "Geachte heer,\nUw toeslag stopt per 1 juli 2024.",
+}
+
+
+class TeVeelVerzoeken(Exception):
+    status_code = 429
+
+
+class NepResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HttpFout(Exception):
+    def __init__(self, bericht, response):
+        super().__init__(bericht)
+        self.response = response
+
+
+@pytest.fixture
+def projectmap(tmp_path, monkeypatch):
+    """Een lege projectmap met drie brieven en een metadata.csv zonder samenvattingen."""
+    (tmp_path / "Data").mkdir()
+    for naam, tekst in BRIEVEN.items():
+        (tmp_path / "Data" / naam).write_text(tekst, encoding="utf-8")
+    metadata = pd.DataFrame({"bestandsnaam": list(BRIEVEN), "a2_samenvatting": ["[leeg]"] * len(BRIEVEN)})
+    metadata.to_csv(tmp_path / "metadata.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gs, "ANTWOORD_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(gs, "wachttijd", lambda fout, poging: 0)
+    return tmp_path
+
+
+def draai(monkeypatch, model, **kwargs):
+    monkeypatch.setattr(gs, "llm", model)
+    gs.genereer_samenvattingen(max_gelijktijdig=1, per_minuut=6000, **kwargs)
+    return pd.read_csv("metadata.csv").set_index("bestandsnaam")["a2_samenvatting"].to_dict()
+
+
+def test_429_wordt_opnieuw_geprobeerd(projectmap, monkeypatch, nep_model):
+    model = nep_model([TeVeelVerzoeken("429"), "Samenvatting A.", TeVeelVerzoeken("429"), TeVeelVerzoeken("429"),
+                       "Samenvatting B.", "Samenvatting C."])
+    samenvattingen = draai(monkeypatch, model)
+
+    assert samenvattingen == {"brief_a.txt": "Samenvatting A.", "brief_b.txt": "Samenvatting B.", "brief_c.txt": "Samenvatting C."}
+    assert len(model.prompts) == 6
+    journal = [json.loads(regel) for regel in (projectmap / gs.JOURNAL_FILE).read_text(encoding="utf-8").splitlines()]
+    assert sorted(record["bestandsnaam"] for record in journal) == sorted(BRIEVEN)
+
+
+def test_hervat_uit_journal_zonder_nieuwe_calls(projectmap, monkeypatch, nep_model):
+    origineel = (projectmap / "metadata.csv").read_text(encoding="utf-8")
+    # Eerste run: brief B gaat echt fout (geen 429), de andere twee komen in het journal.
+    draai(monkeypatch, nep_model(["Samenvatting A.", RuntimeError("kapot"), "Samenvatting C."]))
+
+    # Alsof de run halverwege stopte: metadata.csv is nog het origineel, het journal staat er wel.
+    (projectmap / "metadata.csv").write_text(origineel, encoding="utf-8")
+    model = nep_model(["Samenvatting B."])
+    samenvattingen = draai(monkeypatch, model, cache_overslaan=True)
+
+    assert len(model.prompts) == 1  # Alleen brief B gaat opnieuw naar het model
+    assert samenvattingen == {"brief_a.txt": "Samenvatting A.", "brief_b.txt": "Samenvatting B.", "brief_c.txt": "Samenvatting C."}
+
+    # Een derde run heeft niets meer te doen.
+    (projectmap / "metadata.csv").write_text(origineel, encoding="utf-8")
+    model = nep_model([])
+    assert draai(monkeypatch, model, cache_overslaan=True) == samenvattingen
+    assert model.prompts == []
+
+
+def test_opgegeven_429_stopt_alleen_die_brief(projectmap, monkeypatch, nep_model):
+    model = nep_model([TeVeelVerzoeken("429")] * gs.MAX_POGINGEN + ["Samenvatting B.", "Samenvatting C."])
+    samenvattingen = draai(monkeypatch, model)
+    assert samenvattingen["brief_a.txt"] == "[leeg]"
+    assert samenvattingen["brief_b.txt"] == "Samenvatting B."
+    assert samenvattingen["brief_c.txt"] == "Samenvatting C."
+
+
+def test_is_rate_limit_kijkt_naar_de_status_en_niet_naar_de_tekst():
+    assert gs.is_rate_limit(TeVeelVerzoeken("te veel"))
+    assert gs.is_rate_limit(HttpFout("te veel", NepResponse(429)))
+    assert not gs.is_rate_limit(RuntimeError("brief_429.txt is 429 bytes"))
+    assert not gs.is_rate_limit(HttpFout("429", NepResponse(500)))
+
+
+def test_wachttijd_volgt_retry_after_maar_niet_eindeloos():
+    assert gs.wachttijd(HttpFout("429", NepResponse(429, {"retry-after": "2.5"})), 0) == 2.5
+    assert gs.wachttijd(HttpFout("429", NepResponse(429, {"retry-after": "3600"})), 0) == gs.MAX_WACHTTIJD
+    assert gs.wachttijd(TeVeelVerzoeken("429"), 20) <= gs.MAX_WACHTTIJD + 1
@@ -0,0 +1,75 @@
+from gesprek_geheugen import GespreksGeheugen, relevante_passages, splits_in_passages, tel_tokens
+
+
+def test_korte_brief_gaat_helemaal_mee():
+    assert relevante_passages("Geachte heer,\n\nU moet betalen.", "betalen") == "Geachte heer,\n\nU moet betalen."
+
+
+def test_lange_brief_zonder_lege_regels_geeft_toch_context():
+    brief = "Geachte heer, u moet betalen. " * 300
+    context = relevante_passages(brief, "Wat moet ik betalen?", budget=500)
+    assert context
+    assert tel_tokens(context) <= 500
+    assert all(len(passage) <= 600 for passage in splits_in_passages(brief))
+
+
+def test_kiest_de_passages_die_bij_de_vraag_horen():
+    brief = "\n\n".join(["Afzender: Gemeente Utrecht, kenmerk 123."] + [f"Alinea {i} over het weer." * 20 for i in range(10)]
+                        + ["U kunt bezwaar maken binnen zes weken."])
+    context = relevante_passages(brief, "Hoe kan ik bezwaar maken?", budget=200)
+    assert "bezwaar maken binnen zes weken" in context
+    assert context.startswith("Afzender")
+
+
+def test_te_kleine_budget_geeft_het_begin_van_de_eerste_passage():
+    context = relevante_passages("Gemeente Utrecht " * 200, "vraag", budget=20)
+    assert context.startswith("Gemeente Utrecht")
+    assert tel_tokens(context) <= 20
+
+
+def test_lang_antwoord_houdt_de_laatste_beurt():
+    gesprek = GespreksGeheugen(token_budget=600)
+    gesprek.voeg_toe("Wat moet ik doen?", "Betalen. " * 400)
+    history = gesprek.history_tekst()
+    assert history.startswith("user: Wat moet ik doen?")
+    assert tel_tokens(history) <= 600
+
+
+def test_beurten_die_niet_passen_worden_samengevat():
+    gesprek = GespreksGeheugen(max_beurten=3, token_budget=600)
+    samengevat = []
+    samenvatter = lambda eerder, nieuw: samengevat.append(nieuw) or "Eerder ging het over de boete."
+    gesprek.voeg_toe("Eerste vraag", "Kort antwoord.")
+    gesprek.vouw_op(samenvatter)
+    assert samengevat == []
+
+    gesprek.voeg_toe("Tweede vraag", "Heel lang antwoord. " * 150)
+    gesprek.vouw_op(samenvatter)
+    assert "Eerste vraag" in samengevat[0]
+    history = gesprek.history_tekst()
+    assert "Eerder ging het over de boete." in history
+    assert "user: Tweede vraag" in history
+    assert "Eerste vraag" not in history
+
+
+def test_oudste_beurten_gaan_naar_de_samenvatting():
+    gesprek = GespreksGeheugen(max_beurten=2)
+    samengevat = []
+    for i in range(4):
+        gesprek.voeg_toe(f"vraag {i}", f"antwoord {i}")
+        gesprek.vouw_op(lambda eerder, nieuw: samengevat.append(nieuw) or f"{eerder} {nieuw}".strip())
+    assert [v for v, _ in gesprek.beurten] == ["vraag 2", "vraag 3"]
+    assert "vraag 0" in gesprek.samenvatting and "vraag 1" in gesprek.samenvatting
+
+
+def test_mislukte_samenvatting_bewaart_de_tekst():
+    gesprek = GespreksGeheugen(max_beurten=1)
+    gesprek.voeg_toe("vraag 0", "antwoord 0")
+    gesprek.voeg_toe("vraag 1", "antwoord 1")
+
+    def kapot(eerder, nieuw):
+        raise RuntimeError("geen verbinding")
+
+    gesprek.vouw_op(kapot)
+    assert "vraag 0" in gesprek.samenvatting
+    assert "user: vraag 1" in gesprek.history_tekst()
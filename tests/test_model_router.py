@@ -0,0 +1,48 @@
+from model_router import DREMPEL, GROOT_MODEL, KLEIN_MODEL, KORTE_BRIEF_TOKENS, ModelRouter, besparing, kies_model
+
+KORTE_BRIEF = "Beste mevrouw,\nUw pakket komt morgen."
+MIDDELLANGE_BRIEF = "Beste mevrouw,\nWij sturen u informatie over uw nieuwe pas en de openingstijden.\n" * 15
+LANGE_BRIEF = "Geachte heer,\nHierbij ontvangt u informatie over de wijziging van uw contract.\n" * 60
+
+
+def test_middellange_brief_zonder_zware_woorden_gaat_naar_het_grote_model():
+    assert len(MIDDELLANGE_BRIEF) // 4 >= KORTE_BRIEF_TOKENS
+    for taak in ("samenvatting", "gevolgen", "brief_schrijven"):
+        model, score, _ = kies_model(taak, MIDDELLANGE_BRIEF, routing=True)
+        assert model == GROOT_MODEL and score >= DREMPEL
+
+
+def test_alleen_een_korte_brief_gaat_naar_het_kleine_model():
+    assert kies_model("samenvatting", KORTE_BRIEF, routing=True)[0] == KLEIN_MODEL
+    assert kies_model("gevolgen", KORTE_BRIEF, routing=True)[0] == KLEIN_MODEL
+
+
+def test_korte_juridische_brief_gaat_toch_naar_het_grote_model():
+    model, _, redenen = kies_model("samenvatting", "De deurwaarder komt voor beslag.", "Dwangbevel", routing=True)
+    assert model == GROOT_MODEL
+    assert any("Dwangbevel" in reden for reden in redenen)
+
+
+def test_vertalen_en_chat_gaan_naar_het_kleine_model():
+    assert kies_model("vertaling", "", "Aanmaning", "Betalen", routing=True)[0] == KLEIN_MODEL
+    assert kies_model("gesprek_samenvatten", routing=True)[0] == KLEIN_MODEL
+    assert kies_model("chat", LANGE_BRIEF, routing=True)[0] == KLEIN_MODEL
+
+
+def test_routering_uit_gebruikt_altijd_het_grote_model():
+    assert kies_model("vertaling", KORTE_BRIEF, routing=False) == (GROOT_MODEL, None, ["routering uit"])
+
+
+def test_router_maakt_elke_client_een_keer():
+    gemaakt = []
+    router = ModelRouter(lambda model: gemaakt.append(model) or f"client {model}", routing=True)
+    assert router.llm_voor("vertaling") == f"client {KLEIN_MODEL}"
+    assert router.llm_voor("chat", KORTE_BRIEF) == f"client {KLEIN_MODEL}"
+    assert router.llm_voor("samenvatting", MIDDELLANGE_BRIEF) == f"client {GROOT_MODEL}"
+    assert gemaakt == [KLEIN_MODEL, GROOT_MODEL]
+
+
+def test_besparing_ten_opzichte_van_alles_groot():
+    stats = {"calls": 1, "prompt_tokens": 1000, "completion_tokens": 200}
+    assert besparing({GROOT_MODEL: stats})["besparing_pct"] == 0.0
+    assert besparing({KLEIN_MODEL: stats})["besparing_pct"] > 80
@@ -0,0 +1,95 @@
+import time
+import pytest
+import spraak
+from spraak import EspeakBackend, TTSBackend, genereer_audio_segmenten
+
+
+class NepStem(TTSBackend):
+    mime = "audio/mp3"
+    extensie = "mp3"
+
+    def __init__(self, naam, vertraging=0.0, beschikbaar=True):
+        self.naam = naam
+        self.vertraging = vertraging
+        self.beschikbaar = beschikbaar
+        self.ingesproken = []
+
+    def is_beschikbaar(self):
+        return self.beschikbaar
+
+    def synthetiseer(self, tekst, lang="nl"):
+        time.sleep(self.vertraging)
+        self.ingesproken.append(tekst)
+        return f"{self.naam}:{tekst}|".encode("utf-8")
+
+
+@pytest.fixture(autouse=True)
+def lege_audio_cache(monkeypatch):
+    monkeypatch.setattr(spraak, "_audio_cache", spraak.GeheugenAudioCache())
+
+
+def test_espeak_krijgt_de_tekst_via_stdin(monkeypatch):
+    aanroepen = []
+
+    class Resultaat:
+        stdout = b"RIFF"
+
+    monkeypatch.setattr(spraak.subprocess, "run", lambda args, **kwargs: aanroepen.append((args, kwargs)) or Resultaat())
+    monkeypatch.setattr(spraak.shutil, "which", lambda naam: "/usr/bin/espeak-ng")
+    backend = EspeakBackend()
+    assert backend.synthetiseer("- 50 euro terug") == b"RIFF"
+    args, kwargs = aanroepen[0]
+    assert "- 50 euro terug" not in args
+    assert "--stdin" in args
+    assert kwargs["input"] == "- 50 euro terug".encode("utf-8")
+
+
+def test_trage_hoofdstem_valt_terug_op_de_fallback():
+    traag, snel = NepStem("traag", vertraging=0.5), NepStem("snel")
+    stukken = list(genereer_audio_segmenten("Hallo.\n* 💰 **Bedrag:** € 50", backend=traag, fallback=snel, timeout=0.05))
+    assert [mime for _, mime in stukken] == ["audio/mp3", "audio/mp3"]
+    assert all(data.startswith(b"snel:") for data, _ in stukken)
+
+
+def test_zonder_fallback_wachten_we_op_de_hoofdstem():
+    traag, weg = NepStem("traag2", vertraging=0.2), NepStem("weg", beschikbaar=False)
+    stukken = list(genereer_audio_segmenten("Hallo.\n* 💰 **Bedrag:** € 50", backend=traag, fallback=weg, timeout=0.05))
+    assert [data for data, _ in stukken] == [b"traag2:Hallo.|", "traag2:Bedrag: € 50|".encode("utf-8")]
+    assert weg.ingesproken == []
+
+
+SAMENVATTING = (
+    "Ik heb de brief voor u gelezen.\n"
+    "* 🏢 **Van wie:** CJIB\n"
+    "* 🎯 **Wat moet u doen?:** Betalen.\n"
+    "* 💰 **Bedrag:** € 50,00\n\n"
+    "Is dit zo duidelijk?"
+)
+
+
+def test_splits_in_segmenten_per_bullet_zonder_opmaak():
+    assert spraak.splits_in_segmenten(SAMENVATTING) == [
+        "Ik heb de brief voor u gelezen.",
+        "Van wie: CJIB",
+        "Wat moet u doen? Betalen.",
+        "Bedrag: € 50,00",
+        "Is dit zo duidelijk?",
+    ]
+
+
+def test_splits_in_segmenten_zonder_bullets():
+    assert spraak.splits_in_segmenten("Eén zin.") == ["Eén zin."]
+    assert spraak.splits_in_segmenten("  \n\n ") == []
+
+
+def test_vooraf_inspreken_wordt_gedeeld_en_gecached(monkeypatch):
+    stem = NepStem("vooraf", vertraging=0.1)
+    monkeypatch.setitem(spraak.BACKENDS, "vooraf", stem)
+    monkeypatch.setattr(spraak, "TTS_ENGINE", "vooraf")
+    spraak.spreek_vooraf_in(SAMENVATTING)
+    stukken = list(genereer_audio_segmenten(SAMENVATTING, backend=stem, fallback=stem))
+    assert len(stukken) == 5
+    assert sorted(stem.ingesproken) == sorted(spraak.splits_in_segmenten(SAMENVATTING))  # Niets dubbel
+
+    list(genereer_audio_segmenten(SAMENVATTING, backend=stem, fallback=stem))
+    assert len(stem.ingesproken) == 5  # De tweede keer alles uit de cache
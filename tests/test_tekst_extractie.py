@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+import fitz  # PyMuPDF
+import pytest
+import tekst_extractie
+
+TEKST = "Geachte heer, dit is de eerste pagina met een gewone tekstlaag."
+
+
+def gemengde_pdf():
+    """Pagina 1 met een tekstlaag, pagina 2 als plaatje (gescand)."""
+    with fitz.open() as doc:
+        doc.new_page().insert_text((50, 72), TEKST, fontsize=9)
+        scan = doc.new_page()
+        scan.insert_image(fitz.Rect(0, 0, 100, 100), pixmap=fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 10, 10), 0))
+        return doc.tobytes()
+
+
+@pytest.fixture
+def nep_ocr(monkeypatch):
+    """OCR in een thread met een vaste uitkomst, zodat Tesseract niet nodig is."""
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(tekst_extractie, "get_ocr_pool", lambda: pool)
+    monkeypatch.setattr(tekst_extractie, "ocr_pagina", lambda data: ("Gescande tekst", 0.5))
+    tekst_extractie._bestand_cache.clear()
+    yield
+    pool.shutdown()
+    tekst_extractie._bestand_cache.clear()
+
+
+def test_ocr_tijd_hoort_bij_het_echte_paginanummer(nep_ocr):
+    tekst, tijden = tekst_extractie.lees_uploads([("brief.pdf", gemengde_pdf())])
+    assert "--- Pagina 2 van 2 ---\nGescande tekst" in tekst
+    assert TEKST in tekst
+    assert tijden == [(2, 0.5)]
+
+
+def test_paginanummers_lopen_door_over_bestanden(nep_ocr):
+    _, tijden = tekst_extractie.lees_uploads([("brief.pdf", gemengde_pdf()), ("foto.png", b"png")])
+    assert tijden == [(2, 0.5), (3, 0.5)]
+
+
+def test_uit_de_cache_geen_ocr_tijden(nep_ocr):
+    bestanden = [("brief.pdf", gemengde_pdf())]
+    eerste, _ = tekst_extractie.lees_uploads(bestanden)
+    tweede, tijden = tekst_extractie.lees_uploads(bestanden)
+    assert tweede == eerste
+    assert tijden == []
@@ -0,0 +1,78 @@
+import os
+import pytest
+from brief_index import splits_brief
+from corpus import lees_brief, DATA_PATH
+from tekst_opschonen import schoon_op, verloren_gegevens
+
+BRIEF = """--- Pagina 1 van 2 ---
+Gemeente Utrecht
+Postbus 16200
+Geachte heer,
+U moet € 80,00 betalen voor de zorg-
+en welzijnskosten en de betalings-
+regeling.
+Te betalen ........ € 80,00
+Pagina 1 van 2
+KvK 30123456
+--- Pagina 2 van 2 ---
+Gemeente Utrecht
+Postbus 16200
+Nog een keer € 80,00 uiterlijk 12-05-2024.
+Ook € 80,00 op 13-05-2024.
+- 2 -"""
+
+
+def test_herhaalde_kop_alleen_de_eerste_keer():
+    opgeschoond = schoon_op(BRIEF)
+    assert opgeschoond.count("Gemeente Utrecht") == 1
+    assert opgeschoond.count("Postbus 16200") == 1
+
+
+def test_bedragen_en_data_blijven_staan_ook_als_ze_herhaald_worden():
+    opgeschoond = schoon_op(BRIEF)
+    assert opgeschoond.count("€ 80,00") == 4
+    assert "12-05-2024" in opgeschoond and "13-05-2024" in opgeschoond
+    assert verloren_gegevens(BRIEF, opgeschoond) == []
+
+
+def test_paginakoppen_blijven_staan_voor_de_index():
+    opgeschoond = schoon_op(BRIEF)
+    assert "--- Pagina 2 van 2 ---" in opgeschoond
+    paginas = {doc.metadata["pagina"] for doc in splits_brief(opgeschoond) if "uiterlijk" in doc.page_content}
+    assert paginas == {2}
+
+
+def test_afbreking_alleen_midden_in_een_woord():
+    opgeschoond = schoon_op(BRIEF)
+    assert "betalingsregeling" in opgeschoond
+    assert "zorg-\nen welzijnskosten" in opgeschoond
+
+
+def test_paginanummers_stippellijnen_en_standaardregels_gaan_eruit():
+    opgeschoond = schoon_op(BRIEF)
+    assert "Pagina 1 van 2\n" not in opgeschoond.replace("--- Pagina 1 van 2 ---", "")
+    assert "- 2 -" not in opgeschoond
+    assert "KvK" not in opgeschoond
+    assert "Te betalen € 80,00" in opgeschoond
+
+
+def test_uitnodiging_houdt_het_bezoekadres():
+    uitnodiging = ("--- Pagina 1 van 2 ---\nUWV\nBezoekadres: Handelskade 10, 3500 AB Utrecht\nGeachte mevrouw,\n"
+                   "U bent uitgenodigd voor een gesprek op 4 juni 2024 om 10.00 uur.\n"
+                   "--- Pagina 2 van 2 ---\nUWV\nBezoekadres: Handelskade 10, 3500 AB Utrecht\nNeem uw ID-bewijs mee.")
+    opgeschoond = schoon_op(uitnodiging)
+    assert opgeschoond.count("Bezoekadres: Handelskade 10, 3500 AB Utrecht") == 1  # Herhaald in de kop: één keer
+    assert "Fax" not in schoon_op("Fax: 030 123 45 67\nBezoekadres: Stationsplein 1")
+    assert "Bezoekadres: Stationsplein 1" in schoon_op("Fax: 030 123 45 67\nBezoekadres: Stationsplein 1")
+
+
+def test_witruimte_en_onzichtbare_tekens():
+    assert schoon_op("﻿Beste  heer,\r\n\r\n\r\n\r\nGroet") == "Beste heer,\n\nGroet"
+
+
+@pytest.mark.skipif(not os.path.isdir(DATA_PATH), reason="Data/ ontbreekt")
+def test_geen_gegevens_verloren_in_het_corpus():
+    for naam in sorted(os.listdir(DATA_PATH)):
+        if naam.endswith(".txt"):
+            tekst = lees_brief(os.path.join(DATA_PATH, naam))
+            assert verloren_gegevens(tekst, schoon_op(tekst)) == [], naam
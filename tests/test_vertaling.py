@@ -0,0 +1,65 @@
+import json
+import pytest
+from antwoord_parser import SchemaFout
+from brief_cache import LRUCache
+from langchain_core.prompts import PromptTemplate
+from vertaling import VertaalGeheugen, parse_vertalingen, splits_samenvatting, vertaal_samenvatting, zet_samen
+
+PROMPT = PromptTemplate.from_template("Vertaal naar {talen}:{opmerking}\n{stukken}\nJSON:")
+SAMENVATTING = (
+    "Ik heb de brief voor u gelezen.\n"
+    "* 🏢 **Van wie:** CJIB\n"
+    "* 🗓️ **Datum:** Betaal voor 1 jan. 2024. Dan is het klaar."
+)
+
+
+def vertaald(stukken, talen):
+    return json.dumps({taal: [f"[{taal}] {stuk}" for stuk in stukken] for taal in talen})
+
+
+def test_datum_met_afkorting_blijft_een_stuk():
+    _, stukken = splits_samenvatting(SAMENVATTING)
+    assert stukken == ["Ik heb de brief voor u gelezen.", "Van wie:", "CJIB", "Datum:", "Betaal voor 1 jan. 2024.",
+                       "Dan is het klaar."]
+
+
+def test_sjabloon_geeft_het_origineel_terug():
+    sjabloon, stukken = splits_samenvatting(SAMENVATTING)
+    assert zet_samen(sjabloon, stukken) == SAMENVATTING
+
+
+def test_vertaling_houdt_opmaak_en_iconen():
+    sjabloon, stukken = splits_samenvatting(SAMENVATTING)
+    resultaat = zet_samen(sjabloon, [f"<{stuk}>" for stuk in stukken])
+    assert resultaat.splitlines()[1] == "* 🏢 **<Van wie:>** <CJIB>"
+    assert resultaat.splitlines()[2] == "* 🗓️ **<Datum:>** <Betaal voor 1 jan. 2024.> <Dan is het klaar.>"
+
+
+def test_vertaalgeheugen_hergebruikt_stukken_en_telt_na_succes(nep_model):
+    geheugen = VertaalGeheugen(LRUCache())
+    _, stukken = splits_samenvatting(SAMENVATTING)
+    model = nep_model([vertaald(stukken, ["Engels", "Turks"])])
+    resultaat = vertaal_samenvatting(SAMENVATTING, ["Engels", "Turks"], model, PROMPT, geheugen)
+    assert resultaat["Engels"].startswith("[Engels] Ik heb de brief voor u gelezen.")
+    assert geheugen.stats() == {"hergebruikt": 0, "nieuw": len(stukken), "hergebruik": 0.0}
+
+    # Een tweede samenvatting met één nieuwe zin: alleen die gaat naar het model.
+    tweede = SAMENVATTING.replace("Dan is het klaar.", "Bel ons gerust.")
+    model = nep_model([vertaald(["Bel ons gerust."], ["Engels", "Turks"])])
+    resultaat = vertaal_samenvatting(tweede, ["Engels", "Turks"], model, PROMPT, geheugen)
+    assert '"Bel ons gerust."' in model.prompts[0] and "CJIB" not in model.prompts[0]
+    assert resultaat["Turks"].endswith("[Turks] Bel ons gerust.")
+    assert geheugen.teller == {"hergebruikt": len(stukken) - 1, "nieuw": len(stukken) + 1}
+
+
+def test_mislukte_vertaling_telt_niet_mee(nep_model):
+    geheugen = VertaalGeheugen(LRUCache())
+    with pytest.raises(SchemaFout):
+        vertaal_samenvatting(SAMENVATTING, ["Engels"], nep_model(["geen json"] * 3), PROMPT, geheugen)
+    assert geheugen.teller == {"hergebruikt": 0, "nieuw": 0}
+
+
+@pytest.mark.parametrize("tekst", ["geen json", json.dumps({"Engels": ["een"]}), json.dumps({"Engels": ["een", 2]})])
+def test_parse_vertalingen_gooit_schemafout(tekst):
+    with pytest.raises(SchemaFout):
+        parse_vertalingen(tekst, ["Engels"], 2)
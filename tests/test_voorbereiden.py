@@ -0,0 +1,43 @@
+import threading
+from brief_cache import LRUCache
+from voorbereiden import Voorbereider
+
+
+def test_wacht_geeft_het_resultaat_van_de_lopende_taak():
+    voorbereider = Voorbereider(max_gelijktijdig=2)
+    cache, begin = LRUCache(), threading.Event()
+    voorbereider.start("sessie", "a", lambda: begin.wait(5) and "klaar", cache)
+    voorbereider.start("sessie", "a", lambda: "dubbel", cache)  # Loopt al: geen tweede taak
+    begin.set()
+    assert voorbereider.wacht("a") == "klaar"
+    assert cache.get("a") == "klaar"
+    assert voorbereider.stats() == {"lopend": 0, "gestart": 1, "klaar": 1, "gebruikt": 1, "geannuleerd": 0, "fouten": 0}
+
+
+def test_tellers_kloppen_met_veel_taken_tegelijk():
+    voorbereider = Voorbereider(max_gelijktijdig=8)
+    cache = LRUCache(max_items=1000)
+
+    def maak(i):
+        if i % 4 == 0:
+            raise RuntimeError("kapot")
+        return i
+
+    for i in range(200):
+        voorbereider.start("sessie", i, lambda i=i: maak(i), cache)
+    voorbereider._pool.shutdown(wait=True)
+    assert len(cache) == 150
+    assert voorbereider.stats() == {"lopend": 0, "gestart": 200, "klaar": 150, "gebruikt": 0, "geannuleerd": 0, "fouten": 50}
+
+
+def test_annuleer_alleen_taken_van_de_sessie_die_nog_niet_begonnen_zijn():
+    voorbereider = Voorbereider(max_gelijktijdig=1)
+    cache, begin = LRUCache(), threading.Event()
+    voorbereider.start("sessie", "a", lambda: begin.wait(5) and "a", cache)
+    voorbereider.start("sessie", "b", lambda: "b", cache)
+    voorbereider.start("andere", "c", lambda: "c", cache)
+    voorbereider.annuleer("sessie")
+    begin.set()
+    assert voorbereider.wacht("b") is None
+    assert voorbereider.wacht("c") == "c"
+    assert voorbereider.stats()["geannuleerd"] == 1
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from langchain_core.callbacks import BaseCallbackHandler
+from gesprek_geheugen import tel_tokens
+
+# --- Configuratie ---
+TRACE_LOG = os.getenv("TRACE_LOG", "1") == "1"  # Eén JSON-regel per meting naar stdout (komt in de Streamlit-logs)
+TRACE_PROMETHEUS_PATH = os.getenv("TRACE_PROMETHEUS_PATH")  # Optioneel: textfile voor de node_exporter
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # Seconden, voor het Prometheus-histogram
+MAX_RECENT = 200  # Zoveel losse metingen bewaren we voor het debugpaneel
+MAX_DUREN_PER_STAP = 500  # Voor p50/p95 per stap
+
+_huidige_meting = contextvars.ContextVar("huidige_meting", default=None)
+
+
+class Tracer:
+    """
+    Houdt per stap van de pijplijn (upload, OCR, LLM-calls, audio, ...) bij hoe lang die duurt,
+    hoeveel tokens er gebruikt zijn en of het uit de cache kwam. Eén tracer per proces.
+    """
+
+    def __init__(self, log=TRACE_LOG, prometheus_pad=TRACE_PROMETHEUS_PATH):
+        self.log = log
+        self.prometheus_pad = prometheus_pad
+        self.recent = deque(maxlen=MAX_RECENT)
+        self.stappen = {}
+        self.modellen = {}  # Per model: calls en tokens (voor de besparing van de modelroutering)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def meet(self, stap, **velden):
+        """
+        Meet de duur van het blok. Binnen het blok kun je velden aan de meting toevoegen
+        (bv. meting["cache_hit"] = True); LLM-calls tellen hun tokens er zelf bij op (zie TraceCallback).
+        """
+        meting = {"stap": stap, **velden}
+        token = _huidige_meting.set(meting)
+        start = time.perf_counter()
+        try:
+            yield meting
+        except Exception as e:
+            meting["fout"] = type(e).__name__
+            raise
+        finally:
+            meting["duur_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            try:
+                _huidige_meting.reset(token)
+            except ValueError:
+                pass  # Een afgebroken stream wordt soms pas later (in een andere context) opgeruimd
+            self.registreer(meting)
+
+    def registreer(self, meting):
+        """Slaat een meting op (ook bruikbaar voor tijden die elders gemeten zijn, zoals OCR in een subproces)."""
+        meting.setdefault("tijdstip", time.time())
+        with self._lock:
+            stap = self.stappen.setdefault(meting["stap"], {
+                "aantal": 0, "som_s": 0.0, "buckets": [0] * len(BUCKETS), "duren": deque(maxlen=MAX_DUREN_PER_STAP),
+                "prompt_tokens": 0, "completion_tokens": 0, "cache_hits": 0, "cache_misses": 0, "fouten": 0,
+            })
+            duur_s = meting.get("duur_ms", 0.0) / 1000
+            stap["aantal"] += 1
+            stap["som_s"] += duur_s
+            stap["duren"].append(duur_s)
+            for i, grens in enumerate(BUCKETS):
+                if duur_s <= grens:
+                    stap["buckets"][i] += 1
+            stap["prompt_tokens"] += meting.get("prompt_tokens", 0)
+            stap["completion_tokens"] += meting.get("completion_tokens", 0)
+            if "cache_hit" in meting:
+                stap["cache_hits" if meting["cache_hit"] else "cache_misses"] += 1
+            stap["fouten"] += "fout" in meting
+            self.recent.append(meting)
+        if self.log:
+            print("TRACE " + json.dumps(meting, ensure_ascii=False, default=str))
+        if self.prometheus_pad:
+            self.schrijf_prometheus(self.prometheus_pad)
+
+    def tel_model(self, model, prompt_tokens, completion_tokens):
+        """Telt een LLM-call op bij het model dat hem deed."""
+        with self._lock:
+            stats = self.modellen.setdefault(model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+
+    def reset(self):
+        """Begint opnieuw met tellen (bv. tussen twee benchmarkrondes)."""
+        with self._lock:
+            self.stappen.clear()
+            self.modellen.clear()
+            self.recent.clear()
+
+    def samenvatting(self):
+        """Per stap: aantal, p50/p95/max in ms, tokens en cache hits (voor het debugpaneel)."""
+        rijen = []
+        with self._lock:
+            for naam, stap in sorted(self.stappen.items()):
+                duren = sorted(stap["duren"])
+                rijen.append({
+                    "stap": naam,
+                    "aantal": stap["aantal"],
+                    "p50_ms": round(duren[len(duren) // 2] * 1000, 1),
+                    "p95_ms": round(duren[min(len(duren) - 1, int(len(duren) * 0.95))] * 1000, 1),
+                    "max_ms": round(duren[-1] * 1000, 1),
+                    "prompt_tokens": stap["prompt_tokens"],
+                    "completion_tokens": stap["completion_tokens"],
+                    "cache_hits": stap["cache_hits"],
+                    "cache_misses": stap["cache_misses"],
+                    "fouten": stap["fouten"],
+                })
+        return rijen
+
+    def prometheus_tekst(self):
+        """Alle metingen in het tekstformaat van Prometheus."""
+        regels = [
+            "# HELP brievenbus_stap_duur_seconden Duur per stap van de pijplijn.",
+            "# TYPE brievenbus_stap_duur_seconden histogram",
+        ]
+        tellers = []
+        with self._lock:
+            for naam, stap in sorted(self.stappen.items()):
+                for grens, aantal in zip(BUCKETS, stap["buckets"]):
+                    regels.append(f'brievenbus_stap_duur_seconden_bucket{{stap="{naam}",le="{grens}"}} {aantal}')
+                regels.append(f'brievenbus_stap_duur_seconden_bucket{{stap="{naam}",le="+Inf"}} {stap["aantal"]}')
+                regels.append(f'brievenbus_stap_duur_seconden_sum{{stap="{naam}"}} {stap["som_s"]:.6f}')
+                regels.append(f'brievenbus_stap_duur_seconden_count{{stap="{naam}"}} {stap["aantal"]}')
+                tellers.append(f'brievenbus_tokens_total{{stap="{naam}",soort="prompt"}} {stap["prompt_tokens"]}')
+                tellers.append(f'brievenbus_tokens_total{{stap="{naam}",soort="completion"}} {stap["completion_tokens"]}')
+                tellers.append(f'brievenbus_cache_total{{stap="{naam}",resultaat="hit"}} {stap["cache_hits"]}')
+                tellers.append(f'brievenbus_cache_total{{stap="{naam}",resultaat="miss"}} {stap["cache_misses"]}')
+                tellers.append(f'brievenbus_fouten_total{{stap="{naam}"}} {stap["fouten"]}')
+        regels += ["# TYPE brievenbus_tokens_total counter", "# TYPE brievenbus_cache_total counter", "# TYPE brievenbus_fouten_total counter"]
+        return "\n".join(regels + tellers) + "\n"
+
+    def schrijf_prometheus(self, pad):
+        """Schrijft prometheus_tekst() atomair weg, zodat de node_exporter nooit een half bestand leest."""
+        tmp_pad = f"{pad}.{threading.get_ident()}.tmp"
+        with open(tmp_pad, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_tekst())
+        os.replace(tmp_pad, pad)
+
+
+class TraceCallback(BaseCallbackHandler):
+    """
+    LangChain-callback die de tokens van elke LLM-call optelt bij de meting die op dat moment loopt.
+    Geeft de API geen token_usage terug (bij streamen), dan schatten we het aantal tokens.
+    """
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        meting = _huidige_meting.get()
+        if meting is not None:
+            params = kwargs.get("invocation_params") or {}
+            if params.get("model") or params.get("model_name"):
+                meting["model"] = params.get("model") or params.get("model_name")
+            meting["_prompt_schatting"] = sum(tel_tokens(str(bericht.content)) for rij in messages for bericht in rij)
+
+    def on_llm_end(self, response, **kwargs):
+        meting = _huidige_meting.get()
+        if meting is None:
+            return
+        meting["llm_calls"] = meting.get("llm_calls", 0) + 1
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("prompt_tokens") is not None:
+            prompt_tokens, completion_tokens = usage["prompt_tokens"], usage.get("completion_tokens", 0)
+        else:
+            meting["tokens_geschat"] = True
+            prompt_tokens = meting.get("_prompt_schatting", 0)
+            completion_tokens = sum(tel_tokens(gen.text) for rij in response.generations for gen in rij)
+        meting.pop("_prompt_schatting", None)
+        meting["prompt_tokens"] = meting.get("prompt_tokens", 0) + prompt_tokens
+        meting["completion_tokens"] = meting.get("completion_tokens", 0) + completion_tokens
+        model = (response.llm_output or {}).get("model_name") or meting.get("model")
+        if model:
+            meting["model"] = model
+            TRACER.tel_model(model, prompt_tokens, completion_tokens)
+
+
+def noteer(**velden):
+    """Voegt velden toe aan de meting die op dat moment loopt (doet niets als er geen loopt)."""
+    meting = _huidige_meting.get()
+    if meting is not None:
+        meting.update(velden)
+
+
+TRACER = Tracer()
+meet = TRACER.meet
+registreer = TRACER.registreer
@@ -0,0 +1,71 @@
+import os
+import argparse
+from dotenv import load_dotenv
+from prompts import PROMPT_CHAT
+from brief_index import BriefIndex
+from kennisbank import lees_brief, EMBEDDING_MODEL_NAME
+from gesprek_geheugen import tel_tokens
+
+# --- Configuratie ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(SCRIPT_DIR, "Data")
+LLM_MODEL_GROQ = "llama3-70b-8192"
+
+# Vragen die gebruikers vaak stellen; voor elke brief worden ze in beide modi gesteld.
+VRAGEN = [
+    "Hoeveel moet ik betalen?",
+    "Voor welke datum moet ik iets doen?",
+    "Wat gebeurt er als ik niets doe?",
+    "Kan ik bezwaar maken?",
+]
+
+
+def lange_brieven():
+    """De brieven uit Data/, de langste eerst: daar maakt retrieval het meeste uit."""
+    brieven = [(naam, lees_brief(os.path.join(DATA_PATH, naam))) for naam in os.listdir(DATA_PATH) if naam.endswith(".txt")]
+    return sorted(brieven, key=lambda b: -len(b[1]))
+
+
+def chat_inputs(brief_context, vraag):
+    return {"history": "", "input": vraag, "original_brief": brief_context, "summary": ""}
+
+
+# --- Start het Script ---
+# 'python vergelijk_context.py --aantal 5' vergelijkt alleen de tokens (in de app gaat retrieval
+# pas aan boven BRIEF_TOKEN_BUDGET; dit script forceert het om de kwaliteit te kunnen vergelijken);
+# met '--met-llm' worden de antwoorden van beide modi ook naast elkaar gezet.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vergelijk retrieval met de volledige brief als context voor PROMPT_CHAT.")
+    parser.add_argument("--aantal", type=int, default=5, help="Aantal (lange) brieven uit Data/.")
+    parser.add_argument("--top-k", type=int, default=4, help="Aantal stukken dat retrieval meestuurt.")
+    parser.add_argument("--met-llm", action="store_true", help="Vraag ook echt antwoorden op (kost API-calls).")
+    args = parser.parse_args()
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    llm = None
+    if args.met_llm:
+        from langchain_groq import ChatGroq
+        load_dotenv()
+        llm = ChatGroq(temperature=0, groq_api_key=os.getenv("GROQ_API_KEY"), model_name=LLM_MODEL_GROQ)
+
+    totaal_volledig, totaal_retrieval = 0, 0
+    for naam, tekst in lange_brieven()[:args.aantal]:
+        index = BriefIndex(tekst, embeddings)
+        print(f"\n=== {naam} ({len(index.stukken)} stukken) ===")
+        for vraag in VRAGEN:
+            volledig = chat_inputs(tekst, vraag)
+            retrieval = chat_inputs(index.context(vraag, k=args.top_k), vraag)
+            tokens_volledig = tel_tokens(PROMPT_CHAT.format(**volledig))
+            tokens_retrieval = tel_tokens(PROMPT_CHAT.format(**retrieval))
+            totaal_volledig += tokens_volledig
+            totaal_retrieval += tokens_retrieval
+            print(f"- {vraag}  volledig: ~{tokens_volledig} tokens, retrieval: ~{tokens_retrieval} tokens")
+            if llm is not None:
+                for modus, inputs in [("volledig", volledig), ("retrieval", retrieval)]:
+                    antwoord = (PROMPT_CHAT | llm).invoke(inputs).content.strip().replace("\n", " ")
+                    print(f"    [{modus}] {antwoord}")
+
+    if totaal_volledig:
+        print(f"\nTotaal: volledig ~{totaal_volledig} tokens, retrieval ~{totaal_retrieval} tokens "
+              f"({100 * (1 - totaal_retrieval / totaal_volledig):.0f}% minder).")
@@ -0,0 +1,85 @@
+import os
+import re
+import zlib
+import numpy as np
+from corpus import lees_brief, lees_metadata, DATA_PATH, METADATA_PATH
+
+# --- Configuratie ---
+AANTAL_PERMUTATIES = 128
+BANDEN = 32  # 32 banden van 4 rijen: brieven met een gelijkenis vanaf ~0.5 worden vrijwel altijd gevonden
+SHINGLE_GROOTTE = 3
+DREMPEL = 0.8  # Pas vanaf deze (geschatte) gelijkenis noemen we de bekende brief
+# Alleen deze gegevens van de bekende brief komen terug. De opgeslagen samenvatting niet: daarin staan
+# de naam, bedragen en kenmerken van iemand anders.
+OPENBARE_KOLOMMEN = ["bron", "onderwerp", "document_type"]
+PRIEM = 4294967311  # Eerste priemgetal boven 2^32
+
+_rng = np.random.default_rng(seed=42)  # Vaste seed: dezelfde tekst geeft altijd dezelfde handtekening
+_A = _rng.integers(1, 2**31, size=AANTAL_PERMUTATIES, dtype=np.uint64)
+_B = _rng.integers(0, 2**31, size=AANTAL_PERMUTATIES, dtype=np.uint64)
+
+
+def shingles(tekst):
+    """
+    Groepjes van drie opeenvolgende woorden. Cijfers worden gelijkgemaakt, zodat twee
+    standaardbrieven met andere bedragen, data of kenmerken toch op elkaar lijken.
+    """
+    woorden = re.findall(r"\w+", re.sub(r"\d", "0", tekst.lower()))
+    if len(woorden) < SHINGLE_GROOTTE:
+        return {" ".join(woorden)} if woorden else set()
+    return {" ".join(woorden[i:i + SHINGLE_GROOTTE]) for i in range(len(woorden) - SHINGLE_GROOTTE + 1)}
+
+
+def minhash(tekst):
+    """MinHash-handtekening van de tekst (alle permutaties in één keer met numpy)."""
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles(tekst)), dtype=np.uint64)
+    if hashes.size == 0:
+        return np.full(AANTAL_PERMUTATIES, PRIEM, dtype=np.uint64)
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % PRIEM).min(axis=1)
+
+
+class VergelijkbareBrieven:
+    """
+    Zoekt in het Data/-corpus naar een (bijna) identieke standaardbrief, met MinHash en LSH.
+    Een zoekopdracht kost maar een paar milliseconden, dus hij kan vóór de LLM-call.
+    """
+
+    def __init__(self, data_path=DATA_PATH, metadata_path=METADATA_PATH):
+        self.metadata = lees_metadata(metadata_path)
+        self.namen, handtekeningen = [], []
+        self.buckets = {}
+        rijen = AANTAL_PERMUTATIES // BANDEN
+        for bestandsnaam in sorted(os.listdir(data_path)):
+            if not bestandsnaam.endswith(".txt") or not self.metadata.get(bestandsnaam, {}).get("bron"):
+                continue
+            handtekening = minhash(lees_brief(os.path.join(data_path, bestandsnaam)))
+            positie = len(self.namen)
+            self.namen.append(bestandsnaam)
+            handtekeningen.append(handtekening)
+            for band in range(BANDEN):
+                sleutel = (band, handtekening[band * rijen:(band + 1) * rijen].tobytes())
+                self.buckets.setdefault(sleutel, []).append(positie)
+        self.handtekeningen = np.array(handtekeningen)
+
+    def zoek(self, tekst, drempel=DREMPEL):
+        """
+        Geeft de best passende brief terug als dictionary met bestandsnaam, gelijkenis en
+        de OPENBARE_KOLOMMEN uit de metadata, of None als niets genoeg lijkt.
+        """
+        if not self.namen:
+            return None
+        handtekening = minhash(tekst)
+        rijen = AANTAL_PERMUTATIES // BANDEN
+        kandidaten = set()
+        for band in range(BANDEN):
+            kandidaten.update(self.buckets.get((band, handtekening[band * rijen:(band + 1) * rijen].tobytes()), []))
+        if not kandidaten:
+            return None
+        kandidaten = sorted(kandidaten)
+        gelijkenissen = (self.handtekeningen[kandidaten] == handtekening).mean(axis=1)
+        beste = int(np.argmax(gelijkenissen))
+        if gelijkenissen[beste] < drempel:
+            return None
+        bestandsnaam = self.namen[kandidaten[beste]]
+        metadata = self.metadata[bestandsnaam]
+        return {"bestandsnaam": bestandsnaam, "gelijkenis": float(gelijkenissen[beste]), **{kolom: metadata.get(kolom) for kolom in OPENBARE_KOLOMMEN}}
@@ -0,0 +1,164 @@
+import re
+import json
+import argparse
+from brief_cache import inhoud_sleutel, normaliseer_invoer
+from antwoord_parser import SchemaFout, MAX_SCHEMA_POGINGEN
+from prompts import BULLET_ICONEN
+
+# --- Configuratie ---
+TALEN = ["Engels", "Arabisch", "Turks", "Pools"]
+
+# Een regel van de samenvatting: opsommingsteken en icoon (blijven staan), een vetgedrukt label
+# zoals **Van wie:** (komt in elke samenvatting terug) en de rest van de regel.
+REGEL_PATROON = re.compile(
+    r"^(?P<begin>\s*(?:[*-]\s+)?(?:(?:" + "|".join(map(re.escape, BULLET_ICONEN)) + r")\s*)?)"
+    r"(?:\*\*(?P<label>[^*]+)\*\*(?P<tussen>\s*))?(?P<rest>.*)$"
+)
+# Een nieuwe zin begint met een hoofdletter. Niet met een cijfer: dan is de punt meestal een afkorting ("1 jan. 2024").
+ZINSGRENS = re.compile(r'(?<=[.!?])(\s+)(?=["\'(]?[A-ZÀ-Ý])')
+
+
+# --- Samenvatting in stukken ---
+def splits_samenvatting(tekst):
+    """
+    Knipt de samenvatting in stukken die los vertaald worden: de labels van de bullets en de losse zinnen.
+    Geeft (sjabloon, stukken): het sjabloon is een lijst met vaste tekst (opmaak, iconen, witruimte)
+    en gehele getallen, die verwijzen naar een stuk. Dezelfde zin komt maar één keer in 'stukken'.
+    """
+    sjabloon, stukken, index = [], [], {}
+
+    def voeg_stuk_toe(stuk):
+        if stuk not in index:
+            index[stuk] = len(stukken)
+            stukken.append(stuk)
+        sjabloon.append(index[stuk])
+
+    for nummer, regel in enumerate(tekst.split("\n")):
+        if nummer:
+            sjabloon.append("\n")
+        delen = REGEL_PATROON.match(regel)
+        sjabloon.append(delen["begin"])
+        if delen["label"]:
+            sjabloon.append("**")
+            voeg_stuk_toe(delen["label"].strip())
+            sjabloon.append("**" + delen["tussen"])
+        for zin in ZINSGRENS.split(delen["rest"]):
+            if zin.strip():
+                voeg_stuk_toe(zin)
+            elif zin:
+                sjabloon.append(zin)  # De witruimte tussen twee zinnen
+    return sjabloon, stukken
+
+
+def zet_samen(sjabloon, vertaalde_stukken):
+    """Vult het sjabloon van splits_samenvatting met de vertaalde stukken."""
+    return "".join(vertaalde_stukken[deel] if isinstance(deel, int) else deel for deel in sjabloon)
+
+
+# --- Vertaalgeheugen ---
+class VertaalGeheugen:
+    """
+    Vertaalde stukken (labels, vaste zinnen zoals "Ik heb de brief voor u gelezen.") per taal, in een
+    cache met get/set (bv. de SchijfCache uit brief_cache.py). Zo gaan alleen nieuwe zinnen naar het model.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.teller = {"hergebruikt": 0, "nieuw": 0}
+
+    @staticmethod
+    def sleutel(stuk, taal):
+        return inhoud_sleutel("vertaalgeheugen", taal, normaliseer_invoer({"stuk": stuk})["stuk"])
+
+    def zoek(self, stuk, taal):
+        return self.cache.get(self.sleutel(stuk, taal))
+
+    def bewaar(self, stuk, taal, vertaling):
+        self.cache.set(self.sleutel(stuk, taal), vertaling)
+
+    def stats(self):
+        totaal = self.teller["hergebruikt"] + self.teller["nieuw"]
+        return {**self.teller, "hergebruik": round(self.teller["hergebruikt"] / totaal, 2) if totaal else None}
+
+
+# --- Eén call voor alle talen ---
+def parse_vertalingen(tekst, talen, aantal):
+    """Leest het antwoord van PROMPT_VERTAAL_STUKKEN: per taal een lijst van 'aantal' strings. Gooit SchemaFout."""
+    begin, eind = tekst.find('{'), tekst.rfind('}')
+    if begin == -1 or eind < begin:
+        raise SchemaFout("geen JSON-object gevonden")
+    try:
+        data = json.loads(tekst[begin:eind + 1])
+    except json.JSONDecodeError as e:
+        raise SchemaFout(f"ongeldige JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise SchemaFout("het antwoord is geen JSON-object")
+    for taal in talen:
+        lijst = data.get(taal)
+        if not isinstance(lijst, list) or len(lijst) != aantal or not all(isinstance(stuk, str) and stuk.strip() for stuk in lijst):
+            raise SchemaFout(f"'{taal}' moet een lijst van {aantal} vertaalde stukken zijn")
+    return {taal: [stuk.strip() for stuk in data[taal]] for taal in talen}
+
+
+def vraag_vertalingen(llm, prompt, stukken, talen, max_pogingen=MAX_SCHEMA_POGINGEN):
+    """
+    Vertaalt de stukken in één call naar alle talen (JSON-modus), met dezelfde herkansing als
+    vraag_json_antwoord. Geeft {taal: [vertaalde stukken]}.
+    """
+    keten = prompt | llm.bind(response_format={"type": "json_object"})
+    inputs = {"talen": ", ".join(talen), "stukken": json.dumps(stukken, ensure_ascii=False, indent=0)}
+    opmerking = ""
+    for poging in range(1, max_pogingen + 1):
+        tekst = keten.invoke({**inputs, "opmerking": opmerking}).content
+        try:
+            return parse_vertalingen(tekst, talen, len(stukken))
+        except SchemaFout as e:
+            print(f"Vertaling voldoet niet aan het schema (poging {poging}/{max_pogingen}): {e}")
+            fout = e
+            opmerking = f"\nLET OP: je vorige antwoord was ongeldig ({e}). Geef voor elke taal precies {len(stukken)} stukken.\n"
+    raise fout
+
+
+def vertaal_samenvatting(samenvatting, talen, llm, prompt, geheugen):
+    """
+    Vertaalt de samenvatting naar alle talen. Stukken die al in het vertaalgeheugen staan worden
+    hergebruikt; de rest gaat in één call naar het model. Geeft {taal: vertaalde samenvatting}.
+    """
+    sjabloon, stukken = splits_samenvatting(samenvatting)
+    vertaald = {taal: [geheugen.zoek(stuk, taal) for stuk in stukken] for taal in talen}
+    ontbrekend = [i for i in range(len(stukken)) if any(vertaald[taal][i] is None for taal in talen)]
+    print(f"Vertaalgeheugen: {len(stukken) - len(ontbrekend)} van {len(stukken)} stukken hergebruikt")
+    if ontbrekend:
+        nieuwe_talen = [taal for taal in talen if any(vertaald[taal][i] is None for i in ontbrekend)]
+        antwoord = vraag_vertalingen(llm, prompt, [stukken[i] for i in ontbrekend], nieuwe_talen)
+        for taal in nieuwe_talen:
+            for i, vertaling in zip(ontbrekend, antwoord[taal]):
+                vertaald[taal][i] = vertaling
+                geheugen.bewaar(stukken[i], taal, vertaling)
+    # Pas tellen als de vertaling gelukt is; een mislukte call wordt op de pagina opnieuw geprobeerd.
+    geheugen.teller["hergebruikt"] += len(stukken) - len(ontbrekend)
+    geheugen.teller["nieuw"] += len(ontbrekend)
+    return {taal: zet_samen(sjabloon, vertaald[taal]) for taal in talen}
+
+
+# --- Start het Script ---
+# Hoeveel stukken van de samenvattingen in metadata.csv komen vaker voor (en hoeven dus maar één keer vertaald te worden)?
+# python vertaling.py
+if __name__ == "__main__":
+    from collections import Counter
+    from corpus import lees_metadata
+
+    parser = argparse.ArgumentParser(description="Telt hoeveel stukken van de samenvattingen herhaald worden.")
+    parser.add_argument("--voorbeeld", action="store_true", help="Laat zien hoe de eerste samenvatting geknipt wordt.")
+    args = parser.parse_args()
+
+    samenvattingen = [meta["a2_samenvatting"] for meta in lees_metadata().values() if meta.get("a2_samenvatting")]
+    if args.voorbeeld and samenvattingen:
+        sjabloon, stukken = splits_samenvatting(samenvattingen[0])
+        print("\n".join(f"[{i}] {stuk}" for i, stuk in enumerate(stukken)))
+        assert zet_samen(sjabloon, stukken) == samenvattingen[0]
+    teller = Counter(stuk for tekst in samenvattingen for stuk in splits_samenvatting(tekst)[1])
+    totaal = sum(teller.values())
+    print(f"{len(samenvattingen)} samenvattingen, {totaal} stukken, waarvan {totaal - len(teller)} herhaald "
+          f"({(totaal - len(teller)) / totaal:.0%} hoeft niet opnieuw vertaald te worden)")
+    print("Vaakst:", ", ".join(f"'{stuk[:40]}' ({aantal}x)" for stuk, aantal in teller.most_common(5)))
@@ -0,0 +1,90 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from tracing import meet
+
+# --- Configuratie ---
+VOORAF_BEREKENEN = os.getenv("VOORAF_BEREKENEN", "1") == "1"  # "0": pas berekenen als de pagina erom vraagt
+VOORAF_MAX_GELIJKTIJDIG = 4
+VOORAF_WACHTTIJD = 60.0  # Seconden dat de pagina hooguit op een taak wacht voordat hij het zelf doet
+
+
+class Voorbereider:
+    """
+    Berekent resultaten (gevolgen, audio, vertalingen) op de achtergrond, zodra de samenvatting er is,
+    en zet ze in een cache. De taken mogen niets uit st.session_state gebruiken: alles wat ze nodig
+    hebben wordt vooraf in de hoofd-thread opgezocht. Eén voorbereider per proces.
+    """
+
+    def __init__(self, max_gelijktijdig=VOORAF_MAX_GELIJKTIJDIG):
+        self._pool = ThreadPoolExecutor(max_workers=max_gelijktijdig, thread_name_prefix="voorbereiden")
+        self._taken = {}  # sleutel -> (sessie, future)
+        self._lock = threading.Lock()
+        self.teller = {"gestart": 0, "klaar": 0, "gebruikt": 0, "geannuleerd": 0, "fouten": 0}
+
+    def start(self, sessie, sleutel, maak, cache, stap="vooraf"):
+        """
+        Start 'maak' op de achtergrond en zet het resultaat onder 'sleutel' in 'cache'.
+        De duur komt in de tracer onder 'stap'.
+        Staat het al in de cache, of loopt er al een taak voor dezelfde sleutel, dan gebeurt er niets.
+        """
+        with self._lock:
+            lopend = self._taken.get(sleutel)
+            if sleutel in cache or (lopend and not lopend[1].done()):
+                return
+            self._taken[sleutel] = (sessie, self._pool.submit(self._voer_uit, sleutel, maak, cache, stap))
+            self.teller["gestart"] += 1
+
+    def _voer_uit(self, sleutel, maak, cache, stap):
+        soort = None
+        try:
+            with meet(stap):
+                waarde = maak()
+        except Exception as e:
+            print(f"Fout bij het vooraf berekenen: {e}")
+            soort, waarde = "fouten", None
+        if waarde is not None:
+            cache.set(sleutel, waarde)
+            soort = "klaar"
+        with self._lock:  # De tellers worden uit meerdere threads bijgewerkt: alleen onder de lock
+            if soort:
+                self.teller[soort] += 1
+            self._taken.pop(sleutel, None)  # Het resultaat staat nu in de cache; niemand hoeft meer te wachten
+        return waarde
+
+    def wacht(self, sleutel, timeout=VOORAF_WACHTTIJD):
+        """
+        Het resultaat van de taak voor deze sleutel. Loopt hij nog, dan wachten we erop in plaats
+        van hetzelfde werk nog een keer te doen. Geen taak (of mislukt): None.
+        """
+        with self._lock:
+            taak = self._taken.pop(sleutel, None)
+        if taak is None or taak[1].cancelled():
+            return None
+        try:
+            waarde = taak[1].result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+        if waarde is not None:
+            with self._lock:
+                self.teller["gebruikt"] += 1
+        return waarde
+
+    def annuleer(self, sessie):
+        """
+        Annuleert de taken van deze sessie die nog niet begonnen zijn (bv. bij 'Begin opnieuw').
+        Een taak die al loopt (een call naar het model) kan niet onderbroken worden; die maakt
+        hij af, en het resultaat komt gewoon in de cache.
+        """
+        with self._lock:
+            for sleutel, (eigenaar, future) in list(self._taken.items()):
+                if eigenaar == sessie:
+                    del self._taken[sleutel]
+                    if future.cancel():
+                        self.teller["geannuleerd"] += 1
+
+    def stats(self):
+        """Tellers en het aantal taken dat nog loopt, voor het debugpaneel."""
+        with self._lock:
+            lopend = sum(not future.done() for _, future in self._taken.values())
+            return {"lopend": lopend, **self.teller}